@@ -10,13 +10,26 @@ class BaseSettings:
     MONGODB_DATABASE_NAME: str = os.getenv("MONGODB_DATABASE_NAME", "rpg_bot_db")
     MONGODB_CHARACTER_COLLECTION: str = os.getenv("MONGODB_CHARACTER_COLLECTION", "characters")
     MONGODB_CLASS_TEMPLATE_COLLECTION: str = os.getenv("MONGODB_CLASS_TEMPLATE_COLLECTION", "class_templates")
+    MONGODB_MAX_POOL_SIZE: int = int(os.getenv("MONGODB_MAX_POOL_SIZE", 50))
+    MONGODB_MIN_POOL_SIZE: int = int(os.getenv("MONGODB_MIN_POOL_SIZE", 0))
 
     # Redis Settings
     REDIS_HOST: str = os.getenv("REDIS_HOST", "localhost")
     REDIS_PORT: int = int(os.getenv("REDIS_PORT", 6379))
     REDIS_DB: int = int(os.getenv("REDIS_DB", 0))
+    REDIS_MAX_CONNECTIONS: int = int(os.getenv("REDIS_MAX_CONNECTIONS", 20))
     REDIS_COMBAT_SESSION_TTL_HOURS: int = int(os.getenv("REDIS_COMBAT_SESSION_TTL_HOURS", 4))
     REDIS_MAX_SESSIONS_PER_USER: int = int(os.getenv("REDIS_MAX_SESSIONS_PER_USER", 3))
+    # Intervalo da limpeza de sessões de combate expiradas dentro do bot (0 desativa)
+    REDIS_SESSION_SWEEP_INTERVAL_SECONDS: float = float(os.getenv("REDIS_SESSION_SWEEP_INTERVAL_SECONDS", 60))
+
+    # In-memory Cache Settings
+    TRANSFORMATION_CATALOG_TTL_SECONDS: int = int(os.getenv("TRANSFORMATION_CATALOG_TTL_SECONDS", 300))
+    PLAYER_PREFERENCES_CACHE_SIZE: int = int(os.getenv("PLAYER_PREFERENCES_CACHE_SIZE", 1024))
+
+    # Instrumentation Settings (!perf)
+    INSTRUMENTATION_ENABLED: bool = os.getenv("INSTRUMENTATION_ENABLED", "true").lower() == "true"
+    PERF_SNAPSHOT_PATH: str = os.getenv("PERF_SNAPSHOT_PATH", "perf_snapshot.json")
 
     # Logging Settings
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
@@ -1,44 +1,180 @@
-import os
-import subprocess
+"""
+Backup do MongoDB e do Redis em Python puro (sem mongodump).
+
+MongoDB: cada coleção é lida por um cursor em lotes (`--batch-size`) como RawBSONDocument, sem
+decodificar os documentos, e gravada em fluxo em `<coleção>.bson.gz` (BSON concatenado + gzip, com
+sha256 calculado durante a escrita). A memória usada não depende do tamanho da coleção. O
+`manifest.json` é gravado por último: um diretório sem manifesto é um backup incompleto.
+
+Modo incremental (`--incremental`): exporta apenas documentos com `updated_at` (ou o campo em
+INCREMENTAL_FIELDS) posterior ao início do último backup do mesmo banco. Coleções sem esse campo
+são exportadas por inteiro. Remoções não aparecem em backups incrementais; restaure o último
+completo e depois os incrementais em ordem.
+
+Redis: as chaves são percorridas com SCAN e exportadas com DUMP + PTTL em pipeline, no mesmo formato
+de arquivo (`redis.bson.gz`), para serem restauradas com RESTORE.
+
+Uso:
+    python scripts/backup/daily_backup.py [--incremental] [--batch-size 1000] [--skip-redis]
+"""
+import argparse
 import datetime
 import logging
+import os
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bson.binary import Binary
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+
+# Ensure project root is on sys.path so `src` package can be imported when running as a script
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.infrastructure.backup.bson_archive import (
+    ARCHIVE_SUFFIX, ArchiveWriter, latest_manifest, new_manifest, write_manifest,
+)
 
 # Configure basic logging for the script
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Campo de data usado no modo incremental, por coleção (padrão: updated_at)
+INCREMENTAL_FIELDS = {"ph_ledger": "data"}
+REDIS_ARCHIVE = f"redis{ARCHIVE_SUFFIX}"
+
+
+def _timestamp() -> str:
+    return datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+
+
+def _parse_iso(value: str) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(value)
+
+
+def incremental_query(field: str, since: datetime.datetime) -> Dict[str, Any]:
+    # characters grava updated_at como string ISO (sempre em UTC); as demais coleções como datetime
+    return {"$or": [{field: {"$gt": since}}, {field: {"$gt": since.isoformat()}}]}
+
+
+def export_collection(collection, directory: str, query: Optional[Dict[str, Any]] = None,
+                      batch_size: int = 1000, raw_documents: bool = True) -> Dict[str, Any]:
+    """Exporta os documentos de uma coleção (filtrados por `query`) para `<coleção>.bson.gz`."""
+    if raw_documents:
+        collection = collection.with_options(codec_options=CodecOptions(document_class=RawBSONDocument))
+    path = os.path.join(directory, f"{collection.name}{ARCHIVE_SUFFIX}")
+    with ArchiveWriter(path) as writer:
+        writer.write_all(collection.find(query or {}).batch_size(batch_size))
+    return writer.summary()
+
+
+def backup_database(db, backup_root: str, incremental: bool = False, batch_size: int = 1000,
+                    collections: Optional[List[str]] = None, raw_documents: bool = True) -> Tuple[str, Dict[str, Any]]:
+    """
+    Gera um backup (completo ou incremental) de `db` em um novo diretório dentro de `backup_root`.
+    Retorna (diretório, manifesto).
+    """
+    previous = latest_manifest(backup_root, kind="mongodb") if incremental else None
+    previous = previous if previous and previous.get("database") == db.name else None
+    if incremental and previous is None:
+        logging.warning("Nenhum backup anterior encontrado; gerando um backup completo.")
+    since = _parse_iso(previous["created_at"]) if previous else None
+
+    mode = "incremental" if since else "full"
+    directory = os.path.join(backup_root, f"{db.name}_backup_{_timestamp()}" + ("_incremental" if since else ""))
+    os.makedirs(directory, exist_ok=True)
+    # created_at do manifesto é o início do backup: o próximo incremental parte daqui
+    manifest = new_manifest("mongodb", mode=mode, since=since, database=db.name,
+                            base=previous["directory"] if previous else None,
+                            directory=os.path.basename(directory))
+
+    names = collections or sorted(name for name in db.list_collection_names() if not name.startswith("system."))
+    for name in names:
+        collection = db[name]
+        query = None
+        if since:
+            field = INCREMENTAL_FIELDS.get(name, "updated_at")
+            if collection.find_one({field: {"$exists": True}}, {"_id": 1}) is not None:
+                query = incremental_query(field, since)
+            else:
+                logging.info(f"Coleção '{name}' não tem '{field}'; exportando por inteiro.")
+        started = time.perf_counter()
+        summary = export_collection(collection, directory, query, batch_size, raw_documents)
+        elapsed = time.perf_counter() - started
+        summary["incremental"] = query is not None
+        manifest["archives"][name] = summary
+        logging.info(f"Coleção '{name}': {summary['documents']} documentos, {summary['bytes'] / 1024:.1f} KB "
+                     f"em {elapsed:.2f}s ({summary['documents'] / elapsed if elapsed else 0:.0f} docs/s).")
+
+    write_manifest(directory, manifest)
+    return directory, manifest
+
+
+def _chunks(iterable: Iterable[Any], size: int) -> Iterable[List[Any]]:
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def backup_redis(client, backup_root: str, match: str = "*", scan_count: int = 1000) -> Tuple[str, Dict[str, Any]]:
+    """
+    Exporta as chaves do Redis (SCAN + DUMP/PTTL em pipeline) para `redis.bson.gz`.
+    O cliente deve trabalhar com bytes (decode_responses=False), pois DUMP é binário.
+    """
+    directory = os.path.join(backup_root, f"redis_backup_{_timestamp()}")
+    os.makedirs(directory, exist_ok=True)
+    manifest = new_manifest("redis", match=match, directory=os.path.basename(directory))
+
+    with ArchiveWriter(os.path.join(directory, REDIS_ARCHIVE)) as writer:
+        for keys in _chunks(client.scan_iter(match=match, count=scan_count), scan_count):
+            pipeline = client.pipeline(transaction=False)
+            for key in keys:
+                pipeline.dump(key)
+                pipeline.pttl(key)
+            replies = pipeline.execute()
+            for key, value, ttl in zip(keys, replies[::2], replies[1::2]):
+                if value is None:
+                    # Chave expirou entre o SCAN e o DUMP
+                    continue
+                writer.write({"key": Binary(key if isinstance(key, bytes) else key.encode()),
+                              "ttl": ttl if ttl and ttl > 0 else 0, "value": Binary(value)})
+    manifest["archives"]["redis"] = writer.summary()
+    write_manifest(directory, manifest)
+    return directory, manifest
+
+
 def run_mongodb_backup(
     db_name: str,
     backup_dir: str,
-    mongo_uri: str = "mongodb://localhost:27017/"
+    mongo_uri: str = "mongodb://localhost:27017/",
+    incremental: bool = False,
+    batch_size: int = 1000,
 ):
     """
-    Executa um backup do MongoDB usando mongodump.
+    Executa um backup do MongoDB em arquivos BSON comprimidos (ver docstring do módulo).
     """
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_path = os.path.join(backup_dir, f"{db_name}_backup_{timestamp}")
+    import pymongo
 
-    # Ensure backup directory exists
-    os.makedirs(output_path, exist_ok=True)
-
-    command = [
-        "mongodump",
-        f"--uri={mongo_uri}",
-        f"--db={db_name}",
-        f"--out={output_path}"
-    ]
-
-    logging.info(f"Iniciando backup do MongoDB para o banco de dados '{db_name}' em '{output_path}'...")
+    logging.info(f"Iniciando backup do MongoDB para o banco de dados '{db_name}' em '{backup_dir}'...")
+    client = pymongo.MongoClient(mongo_uri)
     try:
-        result = subprocess.run(command, check=True, capture_output=True, text=True)
-        logging.info(f"Backup do MongoDB concluído com sucesso para '{db_name}'.")
-        logging.debug(f"Saída do mongodump:\n{result.stdout}")
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Erro ao executar backup do MongoDB para '{db_name}': {e}")
-        logging.error(f"Stderr:\n{e.stderr}")
-        raise
-    except FileNotFoundError:
-        logging.error("Comando 'mongodump' não encontrado. Certifique-se de que o MongoDB está instalado e 'mongodump' está no PATH.")
-        raise
+        started = time.perf_counter()
+        directory, manifest = backup_database(client[db_name], backup_dir, incremental=incremental,
+                                              batch_size=batch_size)
+        total = sum(archive["documents"] for archive in manifest["archives"].values())
+        logging.info(f"Backup do MongoDB ({manifest['mode']}) concluído em '{directory}': {total} documentos "
+                     f"em {time.perf_counter() - started:.1f}s.")
+        return directory
+    finally:
+        client.close()
+
 
 def run_redis_backup(
     redis_host: str = "localhost",
@@ -46,42 +182,43 @@ def run_redis_backup(
     backup_dir: str = "redis_backups"
 ):
     """
-    Executa um backup do Redis usando o comando BGSAVE.
-    Isso salva o estado atual do Redis em um arquivo RDB.
+    Exporta todas as chaves do Redis com SCAN + DUMP (sem depender do RDB no servidor).
     """
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_file = os.path.join(backup_dir, f"redis_dump_{timestamp}.rdb")
-
-    os.makedirs(backup_dir, exist_ok=True)
-
-    # Connect to Redis and execute BGSAVE
     try:
         import redis
-        r = redis.Redis(host=redis_host, port=redis_port)
-        r.bgsave()
-        logging.info(f"Comando BGSAVE do Redis executado com sucesso. O arquivo RDB será salvo no diretório de trabalho do Redis.")
-        logging.warning(f"Para mover o arquivo RDB para '{output_file}', você precisará configurá-lo no redis.conf ou movê-lo manualmente.")
     except ImportError:
         logging.error("A biblioteca 'redis' não está instalada. Por favor, instale-a com 'pip install redis'.")
         raise
+
+    client = redis.Redis(host=redis_host, port=redis_port)
+    try:
+        directory, manifest = backup_redis(client, backup_dir)
+        logging.info(f"Backup do Redis concluído em '{directory}': "
+                     f"{manifest['archives']['redis']['documents']} chaves.")
+        return directory
     except redis.ConnectionError as e:
         logging.error(f"Erro de conexão com o Redis em {redis_host}:{redis_port}: {e}")
         raise
-    except Exception as e:
-        logging.error(f"Erro inesperado ao executar backup do Redis: {e}")
-        raise
+    finally:
+        client.close()
+
 
 if __name__ == "__main__":
-    # Example usage:
-    # Ensure you have mongodump and redis-cli in your PATH or provide full paths
-    
+    parser = argparse.ArgumentParser(description="Backup do MongoDB e do Redis em arquivos BSON comprimidos.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Exporta apenas documentos alterados desde o último backup.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--skip-redis", action="store_true")
+    args = parser.parse_args()
+
     # MongoDB Backup
     mongo_db_name = os.getenv("MONGODB_DATABASE_NAME", "rpg_bot_db")
     mongo_backup_dir = "backups/mongodb"
     mongo_connection_string = os.getenv("MONGODB_CONNECTION_STRING", "mongodb://localhost:27017/")
 
     try:
-        run_mongodb_backup(mongo_db_name, mongo_backup_dir, mongo_connection_string)
+        run_mongodb_backup(mongo_db_name, mongo_backup_dir, mongo_connection_string,
+                           incremental=args.incremental, batch_size=args.batch_size)
     except Exception as e:
         logging.error(f"Falha no backup do MongoDB: {e}")
 
@@ -90,7 +227,8 @@ if __name__ == "__main__":
     redis_port = int(os.getenv("REDIS_PORT", 6379))
     redis_backup_dir = "backups/redis"
 
-    try:
-        run_redis_backup(redis_host, redis_port, redis_backup_dir)
-    except Exception as e:
-        logging.error(f"Falha no backup do Redis: {e}")
\ No newline at end of file
+    if not args.skip_redis:
+        try:
+            run_redis_backup(redis_host, redis_port, redis_backup_dir)
+        except Exception as e:
+            logging.error(f"Falha no backup do Redis: {e}")
@@ -1,96 +1,275 @@
-import os
-import subprocess
+"""
+Restauração dos backups gerados por `daily_backup.py` (sem mongorestore).
+
+- Antes de gravar qualquer coisa, o sha256 de todos os arquivos do backup é conferido com o manifesto.
+- Cada arquivo é lido em fluxo (mmap + gzip) e inserido em lotes com `insert_many(ordered=False)`;
+  documentos já existentes (chave duplicada) são contados e ignorados. Backups incrementais são
+  aplicados com upserts (ReplaceOne por `_id`) para sobrescrever as versões antigas.
+- As coleções são restauradas em paralelo (`--workers`), com progresso e throughput no log.
+- `--chain` restaura o backup completo de base e depois os incrementais até o diretório indicado.
+- Backups do Redis (`redis.bson.gz`) são restaurados com RESTORE ... REPLACE em pipeline, mantendo o TTL.
+
+Uso:
+    python scripts/backup/restore_backup.py backups/mongodb/rpg_bot_db_backup_<timestamp> [--drop]
+        [--workers 4] [--batch-size 1000] [--chain]
+    python scripts/backup/restore_backup.py backups/redis/redis_backup_<timestamp> --redis
+"""
+import argparse
 import logging
-import datetime
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError
+
+# Ensure project root is on sys.path so `src` package can be imported when running as a script
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.infrastructure.backup.bson_archive import ArchiveReader, read_manifest
+from src.utils.exceptions.infrastructure_exceptions import BackupArchiveError
 
 # Configure basic logging for the script
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+DUPLICATE_KEY_ERROR = 11000
+PROGRESS_INTERVAL = 10000
+
+
+class RestoreProgress:
+    """Contadores por coleção, compartilhados entre as threads, com log periódico de progresso."""
+
+    def __init__(self, manifest: Dict[str, Any], interval: int = PROGRESS_INTERVAL, report: Callable = logging.info):
+        self.expected = {name: archive["documents"] for name, archive in manifest["archives"].items()}
+        self.done = {name: 0 for name in self.expected}
+        self.interval = interval
+        self.report = report
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def advance(self, name: str, count: int):
+        with self._lock:
+            before = self.done[name]
+            self.done[name] = before + count
+            total = sum(self.done.values())
+            if before // self.interval != self.done[name] // self.interval:
+                elapsed = time.perf_counter() - self.started
+                self.report(f"[{name}] {self.done[name]}/{self.expected[name]} documentos "
+                            f"(total {total}/{sum(self.expected.values())}, {total / elapsed:.0f} docs/s)")
+
+
+def _insert_batch(collection, batch: List[Any]) -> Dict[str, int]:
+    try:
+        result = collection.insert_many(batch, ordered=False)
+        return {"inserted": len(result.inserted_ids), "duplicates": 0}
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != DUPLICATE_KEY_ERROR for error in errors):
+            raise
+        return {"inserted": e.details.get("nInserted", 0), "duplicates": len(errors)}
+
+
+def _upsert_batch(collection, batch: List[Any]) -> Dict[str, int]:
+    result = collection.bulk_write([ReplaceOne({"_id": document["_id"]}, document, upsert=True)
+                                    for document in batch], ordered=False)
+    return {"inserted": result.upserted_count, "updated": result.matched_count}
+
+
+def restore_archive(collection, path: str, upsert: bool = False, batch_size: int = 1000,
+                    progress: Optional[RestoreProgress] = None, raw_documents: bool = True) -> Dict[str, Any]:
+    """Restaura um arquivo `.bson.gz` em `collection`, em lotes. Retorna os contadores e o tempo gasto."""
+    counts = {"documents": 0, "inserted": 0, "updated": 0, "duplicates": 0}
+    write = _upsert_batch if upsert else _insert_batch
+    started = time.perf_counter()
+
+    def flush(batch):
+        for key, value in write(collection, batch).items():
+            counts[key] += value
+        counts["documents"] += len(batch)
+        if progress is not None:
+            progress.advance(collection.name, len(batch))
+
+    with ArchiveReader(path, raw=raw_documents) as reader:
+        batch = []
+        for document in reader:
+            batch.append(document)
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+
+    counts["elapsed"] = time.perf_counter() - started
+    return counts
+
+
+def verify_backup(directory: str, manifest: Dict[str, Any], workers: int = 4):
+    """Confere o sha256 de todos os arquivos do manifesto (em paralelo). Lança BackupArchiveError."""
+    def verify(archive):
+        path = os.path.join(directory, archive["file"])
+        if not os.path.isfile(path):
+            raise BackupArchiveError(f"Arquivo de backup ausente: '{path}'.")
+        with ArchiveReader(path) as reader:
+            reader.verify(archive.get("sha256"))
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        list(executor.map(verify, manifest["archives"].values()))
+
+
+def restore_backup(db, directory: str, collections: Optional[List[str]] = None, workers: int = 4,
+                   batch_size: int = 1000, drop: bool = False, verify: bool = True,
+                   raw_documents: bool = True) -> Dict[str, Dict[str, Any]]:
+    """
+    Restaura um backup do MongoDB (completo ou incremental) em `db`, uma coleção por thread.
+    Retorna os contadores por coleção.
+    """
+    manifest = read_manifest(directory)
+    if manifest.get("kind") != "mongodb":
+        raise BackupArchiveError(f"'{directory}' não é um backup do MongoDB.")
+    if collections:
+        manifest["archives"] = {name: archive for name, archive in manifest["archives"].items()
+                                if name in collections}
+    if verify:
+        verify_backup(directory, manifest, workers)
+
+    incremental = manifest.get("mode") == "incremental"
+    progress = RestoreProgress(manifest)
+
+    def restore(name: str) -> Dict[str, Any]:
+        collection = db[name]
+        if drop and not incremental:
+            collection.drop()
+        return restore_archive(collection, os.path.join(directory, manifest["archives"][name]["file"]),
+                               upsert=incremental, batch_size=batch_size, progress=progress,
+                               raw_documents=raw_documents)
+
+    # As maiores coleções primeiro, para não deixarem uma thread sozinha no fim
+    names = sorted(manifest["archives"], key=lambda name: manifest["archives"][name]["bytes"], reverse=True)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = dict(zip(names, executor.map(restore, names)))
+    elapsed = time.perf_counter() - started
+
+    for name, counts in sorted(results.items()):
+        if counts["documents"] != manifest["archives"][name]["documents"]:
+            raise BackupArchiveError(f"Coleção '{name}': {counts['documents']} documentos lidos, "
+                                     f"{manifest['archives'][name]['documents']} esperados pelo manifesto.")
+        logging.info(f"Coleção '{name}': {counts['documents']} documentos ({counts['inserted']} inseridos, "
+                     f"{counts['updated']} substituídos, {counts['duplicates']} já existentes) "
+                     f"em {counts['elapsed']:.2f}s.")
+    total = sum(counts["documents"] for counts in results.values())
+    logging.info(f"Restauração concluída: {total} documentos em {elapsed:.1f}s "
+                 f"({total / elapsed if elapsed else 0:.0f} docs/s, {max(1, workers)} workers).")
+    return results
+
+
+def resolve_chain(directory: str) -> List[str]:
+    """Diretórios a restaurar, do backup completo de base até `directory` (seguindo o campo `base`)."""
+    chain = [directory]
+    manifest = read_manifest(directory)
+    while manifest.get("base"):
+        directory = os.path.join(os.path.dirname(os.path.abspath(chain[0])), manifest["base"])
+        chain.insert(0, directory)
+        manifest = read_manifest(directory)
+    return chain
+
+
+def restore_redis(client, directory: str, batch_size: int = 1000, verify: bool = True) -> int:
+    """Restaura as chaves de um backup do Redis com RESTORE ... REPLACE. Retorna a quantidade de chaves."""
+    manifest = read_manifest(directory)
+    archive = manifest["archives"]["redis"]
+    restored = 0
+    with ArchiveReader(os.path.join(directory, archive["file"]), raw=False) as reader:
+        if verify:
+            reader.verify(archive.get("sha256"))
+        pipeline = client.pipeline(transaction=False)
+        pending = 0
+        for record in reader:
+            pipeline.restore(bytes(record["key"]), record["ttl"], bytes(record["value"]), replace=True)
+            pending += 1
+            if pending >= batch_size:
+                pipeline.execute()
+                restored += pending
+                pending = 0
+                pipeline = client.pipeline(transaction=False)
+        if pending:
+            pipeline.execute()
+            restored += pending
+    return restored
+
+
 def restore_mongodb_backup(
     db_name: str,
     backup_path: str,
-    mongo_uri: str = "mongodb://localhost:27017/"
+    mongo_uri: str = "mongodb://localhost:27017/",
+    workers: int = 4,
+    batch_size: int = 1000,
+    drop: bool = False,
+    chain: bool = False,
 ):
     """
-    Restaura um backup do MongoDB usando mongorestore.
-    O backup_path deve ser o diretório que contém os dumps do banco de dados.
+    Restaura um backup do MongoDB gerado por daily_backup.py.
+    O backup_path é o diretório do backup (o que contém o manifest.json).
     """
-    command = [
-        "mongorestore",
-        f"--uri={mongo_uri}",
-        f"--db={db_name}",
-        backup_path
-    ]
-
-    logging.info(f"Iniciando restauração do MongoDB para o banco de dados '{db_name}' do caminho '{backup_path}'...")
+    import pymongo
+
+    client = pymongo.MongoClient(mongo_uri, maxPoolSize=max(workers, 1) + 4)
     try:
-        result = subprocess.run(command, check=True, capture_output=True, text=True)
-        logging.info(f"Restauração do MongoDB concluída com sucesso para '{db_name}'.")
-        logging.debug(f"Saída do mongorestore:\n{result.stdout}")
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Erro ao executar restauração do MongoDB para '{db_name}': {e}")
-        logging.error(f"Stderr:\n{e.stderr}")
-        raise
-    except FileNotFoundError:
-        logging.error("Comando 'mongorestore' não encontrado. Certifique-se de que o MongoDB está instalado e 'mongorestore' está no PATH.")
-        raise
+        directories = resolve_chain(backup_path) if chain else [backup_path]
+        for index, directory in enumerate(directories):
+            logging.info(f"Iniciando restauração do MongoDB para o banco de dados '{db_name}' do caminho '{directory}'...")
+            # drop só faz sentido no backup completo de base
+            restore_backup(client[db_name], directory, workers=workers, batch_size=batch_size,
+                           drop=drop and index == 0)
+    finally:
+        client.close()
+
 
 def restore_redis_backup(
-    rdb_file_path: str,
+    backup_path: str,
     redis_host: str = "localhost",
     redis_port: int = 6379
 ):
     """
-    Restaura um backup do Redis copiando o arquivo RDB para o diretório de trabalho do Redis
-    e reiniciando o servidor Redis.
-    ATENÇÃO: Isso requer acesso ao servidor Redis e pode sobrescrever dados existentes.
+    Restaura um backup do Redis gerado por daily_backup.py (RESTORE com REPLACE: sobrescreve as chaves).
     """
-    logging.info(f"Iniciando restauração do Redis do arquivo '{rdb_file_path}'...")
+    import redis
+
+    client = redis.Redis(host=redis_host, port=redis_port)
     try:
-        # This is a simplified approach. In a production environment,
-        # you would stop Redis, copy the file, and then start Redis.
-        # For demonstration, we'll assume Redis is configured to load from its default dump.rdb
-        # and that the user will manually handle stopping/starting if needed.
-        
-        # Option 1: Copy the RDB file to Redis's data directory (requires knowing the directory)
-        # This is highly dependent on the Redis server's configuration.
-        # For a more robust solution, consider using a Redis client to load data if possible,
-        # or providing clear manual instructions.
-        
-        # For now, we'll just log a warning and suggest manual intervention.
-        logging.warning("A restauração do Redis geralmente requer a substituição manual do arquivo RDB "
-                        "no diretório de dados do Redis e um reinício do servidor. "
-                        "Este script não automatiza o reinício do servidor Redis.")
-        logging.info(f"Por favor, copie o arquivo '{rdb_file_path}' para o diretório de dados do seu servidor Redis "
-                     f"e reinicie o servidor para aplicar a restauração.")
+        logging.info(f"Iniciando restauração do Redis do backup '{backup_path}'...")
+        restored = restore_redis(client, backup_path)
+        logging.info(f"Restauração do Redis concluída: {restored} chaves.")
+    finally:
+        client.close()
 
-    except Exception as e:
-        logging.error(f"Erro inesperado ao restaurar backup do Redis: {e}")
-        raise
 
 if __name__ == "__main__":
-    # Example usage:
-    
-    # MongoDB Restore
-    mongo_db_name = os.getenv("MONGODB_DATABASE_NAME", "rpg_bot_db")
-    # Replace with the actual path to your MongoDB backup directory (e.g., backups/mongodb/rpg_bot_db_backup_20231027_100000)
-    mongo_restore_path = "path/to/your/mongodb/backup/directory" 
-    mongo_connection_string = os.getenv("MONGODB_CONNECTION_STRING", "mongodb://localhost:27017/")
-
-    try:
-        # restore_mongodb_backup(mongo_db_name, mongo_restore_path, mongo_connection_string)
-        logging.info("Restauração do MongoDB comentada. Descomente para usar.")
-    except Exception as e:
-        logging.error(f"Falha na restauração do MongoDB: {e}")
-
-    # Redis Restore
-    # Replace with the actual path to your Redis RDB dump file (e.g., backups/redis/redis_dump_20231027_100000.rdb)
-    redis_rdb_file = "path/to/your/redis/dump.rdb" 
-    redis_host = os.getenv("REDIS_HOST", "localhost")
-    redis_port = int(os.getenv("REDIS_PORT", 6379))
+    parser = argparse.ArgumentParser(description="Restaura backups gerados por daily_backup.py.")
+    parser.add_argument("backup_path", help="Diretório do backup (com manifest.json).")
+    parser.add_argument("--redis", action="store_true", help="O diretório é um backup do Redis.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4,
+                        help="Coleções restauradas em paralelo.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--drop", action="store_true", help="Remove as coleções antes de um restore completo.")
+    parser.add_argument("--chain", action="store_true",
+                        help="Restaura o backup completo de base e os incrementais até o diretório indicado.")
+    args = parser.parse_args()
 
     try:
-        # restore_redis_backup(redis_rdb_file, redis_host, redis_port)
-        logging.info("Restauração do Redis comentada. Descomente para usar.")
+        if args.redis:
+            restore_redis_backup(args.backup_path, os.getenv("REDIS_HOST", "localhost"),
+                                 int(os.getenv("REDIS_PORT", 6379)))
+        else:
+            restore_mongodb_backup(os.getenv("MONGODB_DATABASE_NAME", "rpg_bot_db"), args.backup_path,
+                                   os.getenv("MONGODB_CONNECTION_STRING", "mongodb://localhost:27017/"),
+                                   workers=args.workers, batch_size=args.batch_size, drop=args.drop,
+                                   chain=args.chain)
     except Exception as e:
-        logging.error(f"Falha na restauração do Redis: {e}")
\ No newline at end of file
+        logging.error(f"Falha na restauração: {e}")
+        sys.exit(1)
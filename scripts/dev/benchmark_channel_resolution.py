@@ -0,0 +1,92 @@
+"""
+Benchmark da resolução canal -> sessão de combate no Redis.
+
+Cria uma sessão descartável com N entradas de iniciativa e mede, com a mesma conexão:
+- "2 idas": GET do mapeamento do canal e depois leitura dos hashes da sessão (caminho anterior);
+- "script": RedisRepository.get_combat_session_by_channel (RESOLVE_CHANNEL, uma ida e volta);
+- "só ID": RedisRepository.get_session_id_by_channel (um GET; usado por get_active_session_id).
+
+A diferença entre as duas primeiras colunas é aproximadamente um RTT até o Redis; rode apontando
+para o Redis de produção (ou com latência de rede simulada) para ver o ganho real por comando.
+
+Medianas medidas (Redis 6.2.14 local via loopback, Python 3.11, 1 vCPU, --runs 3000; três
+execuções, valores da intermediária e faixa entre elas):
+
+    entradas | 2 idas (ms)         | script (ms)         | só ID (ms)
+           2 | 0.490 (0.479-0.606) | 0.379 (0.373-0.478) | 0.098
+          10 | 0.600 (0.576-0.610) | 0.467 (0.467-0.597) | 0.098
+          50 | 1.107 (1.107-1.310) | 0.991 (0.991-1.172) | 0.100
+
+No loopback o RTT é ~0.1 ms, e é isso que o script economiza com poucas entradas. Com 50 entradas
+a desserialização domina e a diferença fica dentro do ruído. Em rede real o ganho é um RTT inteiro.
+
+Uso:
+    python scripts/dev/benchmark_channel_resolution.py [--entries 2 10 50] [--runs 500]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from statistics import median
+
+from dotenv import load_dotenv
+
+# Ensure project root is on sys.path so `src` package can be imported when running as a script
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.core.entities.combat_session import CombatSession
+from src.infrastructure.cache.redis_repository import RedisRepository
+
+load_dotenv()
+
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+BENCH_DB = int(os.getenv("REDIS_BENCHMARK_DB", 15))
+
+
+async def _time(coro_factory, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await coro_factory()
+        samples.append((time.perf_counter() - start) * 1000)
+    return median(samples)
+
+
+async def main(entry_counts, runs: int):
+    repo = RedisRepository(host=REDIS_HOST, port=REDIS_PORT, db=BENCH_DB)
+    await repo.connect()
+    try:
+        print(f"{'entradas':>8} | {'2 idas (ms)':>11} | {'script (ms)':>11} | {'só ID (ms)':>10}")
+        for count in entry_counts:
+            session = CombatSession(guild_id="bench", channel_id=f"bench-{count}")
+            for i in range(count):
+                session.add_npc_entry(name=f"NPC{i}", initiative=i)
+            await repo.save_combat_session(session, ttl_seconds=300)
+
+            async def two_round_trips():
+                session_id = await repo.redis_client.get(repo._channel_key(session.channel_id))
+                return await repo.get_combat_session(session_id)
+
+            try:
+                # Aquece o cache de scripts do servidor (o primeiro EVALSHA pode cair no EVAL)
+                await repo.get_combat_session_by_channel(session.channel_id)
+                before_ms = await _time(two_round_trips, runs)
+                script_ms = await _time(lambda: repo.get_combat_session_by_channel(session.channel_id), runs)
+                id_ms = await _time(lambda: repo.get_session_id_by_channel(session.channel_id), runs)
+                print(f"{count:>8} | {before_ms:>11.3f} | {script_ms:>11.3f} | {id_ms:>10.3f}")
+            finally:
+                await repo.delete_combat_session(session.id)
+    finally:
+        await repo.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da resolução canal -> sessão de combate.")
+    parser.add_argument("--entries", type=int, nargs="+", default=[2, 10, 50])
+    parser.add_argument("--runs", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.entries, args.runs))
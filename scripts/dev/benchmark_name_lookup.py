@@ -0,0 +1,100 @@
+"""
+Benchmark da busca de personagem por nome/apelido.
+
+Popula um banco descartável com N personagens (padrão: 1k, 10k e 100k), mede a latência
+da consulta antiga ($regex ancorado com opção "i") e da consulta atual (igualdade com
+collation case-insensitive) e mostra o estágio do plano vencedor (COLLSCAN x IXSCAN).
+
+Uso:
+    python scripts/dev/benchmark_name_lookup.py [--sizes 1000 10000 100000] [--runs 200]
+"""
+import argparse
+import asyncio
+import os
+import re
+import sys
+import time
+from statistics import median
+
+from dotenv import load_dotenv
+
+# Ensure project root is on sys.path so `src` package can be imported when running as a script
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.core.entities.character import Character
+from src.infrastructure.database.mongodb_repository import MongoDBRepository, CASE_INSENSITIVE_COLLATION
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MONGODB_CONNECTION_STRING", "mongodb://localhost:27017/")
+BENCH_DB = os.getenv("MONGODB_BENCHMARK_DATABASE_NAME", "rpg_bot_benchmark")
+
+
+def _winning_stage(plan: dict) -> str:
+    stages = []
+    while plan:
+        stages.append(plan.get("stage", "?"))
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+    return " <- ".join(stages)
+
+
+async def _fill(repo: MongoDBRepository, target: int):
+    current = await repo.characters_collection.count_documents({})
+    batch = []
+    for i in range(current, target):
+        batch.append(Character(name=f"Personagem{i:06d}", alias=f"pj{i:06d}", player_discord_id=str(i % 500)).to_dict())
+        if len(batch) == 5000:
+            await repo.characters_collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await repo.characters_collection.insert_many(batch, ordered=False)
+
+
+async def _time(coro_factory, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await coro_factory()
+        samples.append((time.perf_counter() - start) * 1000)
+    return median(samples)
+
+
+async def main(sizes, runs: int):
+    repo = MongoDBRepository(MONGO_URI, BENCH_DB)
+    await repo.connect()
+    collection = repo.characters_collection
+    try:
+        await collection.delete_many({})
+        print(f"{'docs':>8} | {'regex (ms)':>10} | {'collation (ms)':>14} | plano (collation)")
+        for size in sorted(sizes):
+            await _fill(repo, size)
+            probe = f"personagem{size // 2:06d}"  # nome em caixa diferente da gravada
+
+            def regex_query():
+                escaped = re.escape(probe)
+                return collection.find_one({"$or": [
+                    {"name": {"$regex": f"^{escaped}$", "$options": "i"}},
+                    {"alias": {"$regex": f"^{escaped}$", "$options": "i"}},
+                ]})
+
+            regex_ms = await _time(regex_query, max(1, runs // 10))
+            collation_ms = await _time(lambda: repo.get_character_by_name_or_alias(probe), runs)
+
+            explain = await collection.find(
+                {"$or": [{"name": probe}, {"alias": probe}]}, collation=CASE_INSENSITIVE_COLLATION
+            ).limit(1).explain()
+            stage = _winning_stage(explain.get("queryPlanner", {}).get("winningPlan", {}))
+            print(f"{size:>8} | {regex_ms:>10.2f} | {collation_ms:>14.2f} | {stage}")
+    finally:
+        await repo.client.drop_database(BENCH_DB)
+        await repo.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark da busca por nome/apelido de personagem.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.runs))
@@ -0,0 +1,100 @@
+"""
+Benchmark das estatísticas de uso (!stats).
+
+Popula um banco descartável com N personagens e compara:
+  - streaming: percorre a visão "summary" no Python (implementação anterior);
+  - agregação: pipeline $facet executado no MongoDB (implementação atual).
+
+Uso:
+    python scripts/dev/benchmark_usage_statistics.py [--size 50000] [--runs 5]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from statistics import median
+
+from dotenv import load_dotenv
+
+# Ensure project root is on sys.path so `src` package can be imported when running as a script
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.core.entities.character import Character
+from src.core.entities.class_template import ClassTemplate
+from src.infrastructure.database.mongodb_repository import MongoDBRepository
+
+load_dotenv()
+
+MONGO_URI = os.getenv("MONGODB_CONNECTION_STRING", "mongodb://localhost:27017/")
+BENCH_DB = os.getenv("MONGODB_BENCHMARK_DATABASE_NAME", "rpg_bot_benchmark")
+
+
+async def _seed(repo: MongoDBRepository, size: int):
+    classes = [ClassTemplate(name=name, description="") for name in ("Ninja", "Samurai", "Monge", "Médico")]
+    await repo.classes_collection.insert_many([
+        {**class_template.to_dict(), "_id": class_template.id} for class_template in classes
+    ])
+    batch = []
+    for i in range(size):
+        character = Character(
+            name=f"Personagem{i:06d}",
+            level=random.randint(1, 20),
+            classe_ids=[random.choice(classes).id],
+            hp=random.randint(0, 100), max_hp=100,
+            chakra=random.randint(0, 80), max_chakra=80,
+            fp=random.randint(0, 50), max_fp=50,
+        )
+        batch.append(character.to_dict())
+        if len(batch) == 5000:
+            await repo.characters_collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await repo.characters_collection.insert_many(batch, ordered=False)
+
+
+async def streaming_statistics(repo: MongoDBRepository):
+    """Implementação anterior: percorre todos os personagens no Python."""
+    total, total_levels, class_counts = 0, 0, {}
+    async for char in repo.iter_characters(view="summary"):
+        total += 1
+        total_levels += char.level
+        for class_id in char.classe_ids:
+            class_counts[class_id] = class_counts.get(class_id, 0) + 1
+    return total, total_levels / total if total else 0, class_counts
+
+
+async def _time(coro_factory, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await coro_factory()
+        samples.append((time.perf_counter() - start) * 1000)
+    return median(samples)
+
+
+async def main(size: int, runs: int):
+    repo = MongoDBRepository(MONGO_URI, BENCH_DB)
+    await repo.connect()
+    try:
+        await repo.client.drop_database(BENCH_DB)
+        await _seed(repo, size)
+        streaming_ms = await _time(lambda: streaming_statistics(repo), runs)
+        aggregation_ms = await _time(repo.aggregate_usage_statistics, runs)
+        print(f"{size} personagens, mediana de {runs} execuções")
+        print(f"  streaming no Python: {streaming_ms:10.1f} ms")
+        print(f"  agregação no MongoDB: {aggregation_ms:9.1f} ms ({streaming_ms / aggregation_ms:.1f}x)")
+    finally:
+        await repo.client.drop_database(BENCH_DB)
+        await repo.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark das estatísticas de uso.")
+    parser.add_argument("--size", type=int, default=50_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.size, args.runs))
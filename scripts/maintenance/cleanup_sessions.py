@@ -1,31 +1,47 @@
-import os
+"""
+Limpeza manual das sessões de combate expiradas no Redis.
+
+O bot já faz essa limpeza periodicamente (CombatSessionSweeper); este script serve para rodá-la sob
+demanda. Só os IDs vencidos são lidos do índice de expiração (`combat_sessions:expiry`), sem carregar
+as sessões. `--rebuild-index` registra antes nos índices as sessões criadas antes deles.
+
+Uso:
+    python scripts/maintenance/cleanup_sessions.py [--rebuild-index] [--batch-size 500]
+"""
+import argparse
+import asyncio
 import logging
-from datetime import datetime, timedelta
-from src.utils.helpers.datetime_utils import safe_parse_datetime
+import os
+import sys
+
+# Ensure project root is on sys.path so `src` package can be imported when running as a script
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
 from src.infrastructure.cache.redis_repository import RedisRepository
+from src.infrastructure.cache.session_sweeper import CombatSessionSweeper
 from src.utils.exceptions.infrastructure_exceptions import DatabaseConnectionError, CacheError
 
 # Configure basic logging for the script
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-async def cleanup_expired_combat_sessions(redis_repo: RedisRepository):
+
+async def cleanup_expired_combat_sessions(redis_repo: RedisRepository, rebuild_index: bool = False,
+                                          batch_size: int = 500) -> int:
     """
-    Limpa sessões de combate expiradas do Redis.
+    Limpa sessões de combate expiradas do Redis. Retorna quantas foram removidas.
     """
     logging.info("Iniciando limpeza de sessões de combate expiradas...")
     try:
-        all_sessions = await redis_repo.get_all_combat_sessions()
-        current_time = datetime.utcnow()
-        
-        cleaned_count = 0
-        for session in all_sessions:
-            expires_at_dt = safe_parse_datetime(session.expires_at) or datetime.utcnow()
-            if expires_at_dt <= current_time:
-                await redis_repo.delete_combat_session(session.id)
-                cleaned_count += 1
-                logging.info(f"Sessão de combate expirada '{session.id}' limpa.")
-        
-        logging.info(f"Limpeza de sessões de combate concluída. {cleaned_count} sessões expiradas foram removidas.")
+        if rebuild_index:
+            added = await redis_repo.rebuild_session_index()
+            logging.info(f"Índice de sessões reconstruído: {added} sessões adicionadas.")
+        sweeper = CombatSessionSweeper(redis_repo, batch_size=batch_size)
+        cleaned_count = await sweeper.sweep_once()
+        logging.info(f"Limpeza de sessões de combate concluída. {cleaned_count} sessões expiradas foram removidas "
+                     f"em {sweeper.stats['last_duration_ms']:.1f} ms.")
+        return cleaned_count
     except DatabaseConnectionError as e:
         logging.error(f"Erro de conexão com o Redis durante a limpeza: {e}")
         raise
@@ -36,15 +52,29 @@ async def cleanup_expired_combat_sessions(redis_repo: RedisRepository):
         logging.error(f"Erro inesperado durante a limpeza de sessões de combate: {e}")
         raise
 
+
+async def main(rebuild_index: bool, batch_size: int):
+    redis_repository = RedisRepository(
+        host=os.getenv("REDIS_HOST", "localhost"),
+        port=int(os.getenv("REDIS_PORT", 6379)),
+        db=int(os.getenv("REDIS_DB", 0)),
+    )
+    await redis_repository.connect()
+    try:
+        await cleanup_expired_combat_sessions(redis_repository, rebuild_index, batch_size)
+    finally:
+        await redis_repository.disconnect()
+
+
 if __name__ == "__main__":
-    # Instantiate RedisRepository
-    redis_host = os.getenv("REDIS_HOST", "localhost")
-    redis_port = int(os.getenv("REDIS_PORT", 6379))
-    redis_db = int(os.getenv("REDIS_DB", 0))
+    parser = argparse.ArgumentParser(description="Remove as sessões de combate expiradas do Redis.")
+    parser.add_argument("--rebuild-index", action="store_true",
+                        help="Registra nos índices as sessões criadas antes deles (SCAN) antes da limpeza.")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
 
     try:
-        redis_repository = RedisRepository(host=redis_host, port=redis_port, db=redis_db)
-        await cleanup_expired_combat_sessions(redis_repository)
-        await redis_repository.disconnect() # Adicionar desconexão explícita
+        asyncio.run(main(args.rebuild_index, args.batch_size))
     except Exception as e:
-        logging.critical(f"Falha crítica ao executar o script de limpeza de sessões: {e}")
\ No newline at end of file
+        logging.critical(f"Falha crítica ao executar o script de limpeza de sessões: {e}")
+        sys.exit(1)
@@ -1,34 +1,62 @@
+import argparse
+import asyncio
 import os
+import sys
 import logging
+from dotenv import load_dotenv
+
+# Ensure project root is on sys.path so `src` package can be imported when running as a script
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
 from src.infrastructure.database.mongodb_repository import MongoDBRepository
 from src.utils.exceptions.infrastructure_exceptions import DatabaseConnectionError, RepositoryError
 
+load_dotenv()
+
 # Configure basic logging for the script
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def run_mongodb_maintenance(mongo_repo: MongoDBRepository):
+# Personagens com recurso atual acima do máximo ou negativo
+INCONSISTENT_RESOURCES_FILTER = {
+    "$expr": {
+        "$or": [
+            {"$gt": ["$hp", "$max_hp"]}, {"$lt": ["$hp", 0]},
+            {"$gt": ["$chakra", "$max_chakra"]}, {"$lt": ["$chakra", 0]},
+            {"$gt": ["$fp", "$max_fp"]}, {"$lt": ["$fp", 0]},
+        ]
+    }
+}
+
+
+async def run_mongodb_maintenance(mongo_repo: MongoDBRepository, fix: bool = False, batch_size: int = 500):
     """
-    Executa tarefas de manutenção no MongoDB, como otimização de índices.
+    Executa tarefas de manutenção no MongoDB.
+
+    Os índices são criados/verificados em `connect()`. Aqui percorremos os personagens com recursos
+    inconsistentes (atual > máximo ou negativo) via cursor em lotes, sem carregar a coleção inteira,
+    e opcionalmente corrigimos os valores.
     """
     logging.info("Iniciando manutenção do MongoDB...")
     try:
-        # Example: Ensure indexes are optimized (MongoDB handles this largely automatically,
-        # but explicit calls can be made if needed for specific scenarios).
-        # For this project, we'll ensure the 'id' field is indexed for efficient lookups.
-        
-        # Ensure 'id' field is indexed for characters collection
-        if mongo_repo.collection is not None:
-            mongo_repo.collection.create_index("id", unique=True)
-            logging.info("Índice 'id' criado/verificado na coleção de personagens.")
-        else:
-            logging.warning("Repositório MongoDB não conectado. Não foi possível verificar/criar índices.")
-
-        # Other maintenance tasks could include:
-        # - Compacting collections (use with caution, can be resource intensive)
-        # - Analyzing collection statistics
-        # - Dropping old/unused collections (e.g., old audit logs)
-
-        logging.info("Manutenção do MongoDB concluída.")
+        checked = 0
+        fixed = 0
+        async for character in mongo_repo.iter_characters(INCONSISTENT_RESOURCES_FILTER, batch_size=batch_size):
+            checked += 1
+            logging.warning(
+                f"Recursos inconsistentes em '{character.name}' ({character.id}): "
+                f"HP {character.hp}/{character.max_hp}, Chakra {character.chakra}/{character.max_chakra}, "
+                f"FP {character.fp}/{character.max_fp}"
+            )
+            if fix:
+                character.hp = min(max(character.hp, 0), character.max_hp)
+                character.chakra = min(max(character.chakra, 0), character.max_chakra)
+                character.fp = min(max(character.fp, 0), character.max_fp)
+                if await mongo_repo.update_character(character):
+                    fixed += 1
+
+        logging.info(f"Manutenção do MongoDB concluída. Inconsistentes: {checked}, corrigidos: {fixed}.")
     except DatabaseConnectionError as e:
         logging.error(f"Erro de conexão com o MongoDB durante a manutenção: {e}")
         raise
@@ -39,18 +67,25 @@ def run_mongodb_maintenance(mongo_repo: MongoDBRepository):
         logging.error(f"Erro inesperado durante a manutenção do MongoDB: {e}")
         raise
 
-if __name__ == "__main__":
-    # Instantiate MongoDBRepository
-    mongo_connection_string = os.getenv("MONGODB_CONNECTION_STRING", "mongodb://localhost:27017/")
-    mongo_database_name = os.getenv("MONGODB_DATABASE_NAME", "rpg_bot_db")
-    mongo_collection_name = os.getenv("MONGODB_CHARACTER_COLLECTION", "characters")
 
+async def main(fix: bool, batch_size: int):
+    mongo_repository = MongoDBRepository(
+        connection_string=os.getenv("MONGODB_CONNECTION_STRING", "mongodb://localhost:27017/"),
+        database_name=os.getenv("MONGODB_DATABASE_NAME", "rpg_bot_db"),
+    )
+    await mongo_repository.connect()
+    try:
+        await run_mongodb_maintenance(mongo_repository, fix=fix, batch_size=batch_size)
+    finally:
+        await mongo_repository.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manutenção do banco de dados do RPG Bot.")
+    parser.add_argument("--fix", action="store_true", help="Corrige os recursos inconsistentes encontrados.")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
     try:
-        mongo_repository = MongoDBRepository(
-            connection_string=mongo_connection_string,
-            database_name=mongo_database_name,
-            collection_name=mongo_collection_name
-        )
-        run_mongodb_maintenance(mongo_repository)
+        asyncio.run(main(args.fix, args.batch_size))
     except Exception as e:
-        logging.critical(f"Falha crítica ao executar o script de manutenção do banco de dados: {e}")
\ No newline at end of file
+        logging.critical(f"Falha crítica ao executar o script de manutenção do banco de dados: {e}")
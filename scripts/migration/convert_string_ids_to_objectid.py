@@ -6,72 +6,179 @@ Funcionalidades:
 - Dry-run por padrão: apenas relata quantos documentos seriam convertidos.
 - `--apply` para aplicar as mudanças.
 - `--uri` e `--db` para configurar conexão.
+- Processamento em lotes (`--batch-size`) percorridos por `_id` (sem skip); cada lote é um único
+  `bulk_write` ordenado com, para cada documento, um ReplaceOne (upsert) no novo `_id` seguido do
+  DeleteOne do `_id` antigo. Repetir um lote é seguro: o upsert sobrescreve e o delete é idempotente.
+- `--concurrency` lotes gravados em paralelo (threads) por rodada.
+- Checkpoint (`--checkpoint`, JSON) com o último `_id` processado por coleção, gravado ao fim de cada
+  rodada: se o script for interrompido, a próxima execução continua de onde parou. Quando a coleção
+  termina, a entrada dela é removida; a próxima execução percorre a coleção desde o início.
+- Relata o throughput (documentos/s) por rodada e no total.
 - CUIDADO: operação destrutiva (cria novo documento com ObjectId e remove o antigo). Faça backup antes.
 
 Uso:
-    python convert_string_ids_to_objectid.py --uri "mongodb://localhost:27017" --db mydb --apply
+    python convert_string_ids_to_objectid.py --uri "mongodb://localhost:27017" --db mydb --apply \\
+        [--batch-size 1000] [--concurrency 4] [--checkpoint objectid_checkpoint.json]
 
 """
 import argparse
-import re
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
 from bson.objectid import ObjectId
-from motor.motor_asyncio import AsyncIOMotorClient
-import asyncio
-
-
-HEX24 = re.compile(r"^[0-9a-fA-F]{24}$")
-
-
-async def _find_string_id_docs(collection):
-    # Busca documentos cujo _id seja string e com formato hex de 24 chars
-    cursor = collection.find({"_id": {"$type": "string"}})
-    matches = []
-    async for doc in cursor:
-        _id = doc.get("_id")
-        if isinstance(_id, str) and HEX24.match(_id):
-            matches.append(doc)
-    return matches
-
-
-async def convert_collection(collection, apply_changes=False):
-    docs = await _find_string_id_docs(collection)
-    if not docs:
-        return 0, []
-    converted = []
-    for doc in docs:
-        old_id = doc["_id"]
-        new_id = ObjectId(old_id)
-        # Remove old _id from doc dict and set new one
-        new_doc = dict(doc)
-        new_doc.pop("_id", None)
-        new_doc["_id"] = new_id
-        converted.append((old_id, new_id, new_doc))
+from pymongo import DeleteOne, MongoClient, ReplaceOne
+
+
+HEX24_PATTERN = "^[0-9a-fA-F]{24}$"
+
+
+class Checkpoint:
+    """Último `_id` (string) processado por coleção, persistido em JSON."""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.state: Dict[str, Dict[str, Any]] = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as handle:
+                self.state = json.load(handle)
+
+    def last_id(self, collection_name: str) -> Optional[str]:
+        return self.state.get(collection_name, {}).get("last_id")
+
+    def converted(self, collection_name: str) -> int:
+        return self.state.get(collection_name, {}).get("converted", 0)
+
+    def save(self, collection_name: str, last_id: str, converted: int):
+        self.state[collection_name] = {"last_id": last_id, "converted": converted}
+        self._write()
+
+    def clear(self, collection_name: str):
+        """Remove a entrada de uma coleção que terminou de ser convertida."""
+        if self.state.pop(collection_name, None) is None:
+            return
+        if self.state:
+            self._write()
+        else:
+            self.reset()
+
+    def _write(self):
+        if not self.path:
+            return
+        # Grava em arquivo temporário e renomeia, para não deixar um checkpoint corrompido
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            json.dump(self.state, handle, indent=2)
+        os.replace(temp_path, self.path)
+
+    def reset(self):
+        self.state = {}
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def fetch_batch(collection, after: Optional[str], batch_size: int) -> List[Dict[str, Any]]:
+    """Próximo lote de documentos com `_id` string hex de 24 caracteres, em ordem de `_id`."""
+    id_filter: Dict[str, Any] = {"$type": "string", "$regex": HEX24_PATTERN}
+    if after is not None:
+        id_filter["$gt"] = after
+    return list(collection.find({"_id": id_filter}).sort("_id", 1).limit(batch_size))
+
+
+def build_operations(documents: List[Dict[str, Any]]) -> List[Any]:
+    operations = []
+    for document in documents:
+        old_id = document["_id"]
+        new_document = dict(document)
+        new_document["_id"] = ObjectId(old_id)
+        # Ordem importa: o novo documento existe antes de o antigo ser removido
+        operations.append(ReplaceOne({"_id": new_document["_id"]}, new_document, upsert=True))
+        operations.append(DeleteOne({"_id": old_id}))
+    return operations
+
+
+def write_batch(collection, documents: List[Dict[str, Any]]) -> int:
+    if not documents:
+        return 0
+    collection.bulk_write(build_operations(documents), ordered=True)
+    return len(documents)
+
+
+def convert_collection(collection, apply_changes: bool = False, batch_size: int = 1000, concurrency: int = 4,
+                       checkpoint: Optional[Checkpoint] = None, report=print) -> Dict[str, Any]:
+    """
+    Converte os `_id` string de uma coleção em rodadas de até `concurrency` lotes.
+    Retorna {"documents": convertidos (ou a converter, em dry-run), "elapsed": segundos, "rate": docs/s}.
+    """
+    name = collection.name
+    checkpoint = checkpoint or Checkpoint(None)
+    after = checkpoint.last_id(name) if apply_changes else None
+    total = checkpoint.converted(name) if apply_changes else 0
+    processed = 0
+    started = time.perf_counter()
+    if after is not None:
+        report(f"[{name}] Retomando execução interrompida após o _id {after} ({total} documentos já convertidos).")
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        while True:
+            # Lê a rodada em sequência (paginação por chave) e grava os lotes em paralelo
+            wave = []
+            for _ in range(max(1, concurrency)):
+                batch = fetch_batch(collection, after, batch_size)
+                if not batch:
+                    break
+                wave.append(batch)
+                after = batch[-1]["_id"]
+            if not wave:
+                break
+
+            wave_started = time.perf_counter()
+            if apply_changes:
+                wave_count = sum(executor.map(lambda batch: write_batch(collection, batch), wave))
+            else:
+                wave_count = sum(len(batch) for batch in wave)
+            processed += wave_count
+            total += wave_count
+            if apply_changes:
+                checkpoint.save(name, after, total)
+            wave_elapsed = time.perf_counter() - wave_started
+            report(f"[{name}] +{wave_count} documentos (total {total}, "
+                   f"{wave_count / wave_elapsed if wave_elapsed else 0:.0f} docs/s), último _id: {after}")
+
     if apply_changes:
-        for old_id, new_id, new_doc in converted:
-            # Insert with new ObjectId and remove old
-            await collection.insert_one(new_doc)
-            await collection.delete_one({"_id": old_id})
-    return len(converted), converted
+        # Execução concluída: a próxima começa do início em vez de pular os _id até `after`
+        checkpoint.clear(name)
+    elapsed = time.perf_counter() - started
+    return {"documents": total, "processed": processed, "elapsed": elapsed,
+            "rate": processed / elapsed if elapsed else 0.0}
 
 
-async def main(args):
-    client = AsyncIOMotorClient(args.uri)
+def main(args):
+    client = MongoClient(args.uri)
     db = client[args.db]
-    # Você pode limitar as coleções a serem verificadas; por padrão verifica `characters` e `classes`.
+    checkpoint = Checkpoint(args.checkpoint)
+    if args.reset_checkpoint:
+        checkpoint.reset()
+    # Você pode limitar as coleções a serem verificadas; por padrão verifica `characters`.
     target_collections = args.collections or ["characters"]
     total = 0
-    details = {}
-    for coll_name in target_collections:
-        coll = db[coll_name]
-        count, converted = await convert_collection(coll, apply_changes=args.apply)
-        total += count
-        details[coll_name] = converted
+    try:
+        for coll_name in target_collections:
+            result = convert_collection(
+                db[coll_name], apply_changes=args.apply, batch_size=args.batch_size,
+                concurrency=args.concurrency, checkpoint=checkpoint,
+            )
+            total += result["documents"]
+            print(f"[{coll_name}] {result['processed']} documentos em {result['elapsed']:.1f}s "
+                  f"({result['rate']:.0f} docs/s)")
+    finally:
+        client.close()
     if args.apply:
         print(f"Applied conversion: total documents converted: {total}")
     else:
         print(f"Dry-run: total documents that would be converted: {total}")
-    # AsyncIOMotorClient.close() is synchronous (not awaitable)
-    client.close()
 
 
 if __name__ == "__main__":
@@ -80,5 +187,9 @@ if __name__ == "__main__":
     parser.add_argument("--db", required=True, help="Database name")
     parser.add_argument("--apply", action="store_true", help="Apply changes. Default is dry-run.")
     parser.add_argument("--collections", nargs="*", help="Collections to check (default: characters)")
-    args = parser.parse_args()
-    asyncio.run(main(args))
+    parser.add_argument("--batch-size", type=int, default=1000, help="Documents per bulk_write")
+    parser.add_argument("--concurrency", type=int, default=4, help="Batches written in parallel per round")
+    parser.add_argument("--checkpoint", default="objectid_migration_checkpoint.json",
+                        help="Checkpoint file with the last processed _id per collection")
+    parser.add_argument("--reset-checkpoint", action="store_true", help="Ignore and remove an existing checkpoint")
+    main(parser.parse_args())
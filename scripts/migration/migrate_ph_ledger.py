@@ -0,0 +1,126 @@
+"""
+Move os gastos de PH embutidos em `characters.pontos.ph.gasto` para a coleção `ph_ledger`.
+
+Para cada personagem com o array legado:
+- grava um lançamento por item no ph_ledger (upsert por character_id + legacy_index, então o
+  script pode ser executado de novo sem duplicar lançamentos);
+- soma os custos em `pontos.ph.gasto_total` e remove o array, com compare-and-set na `version`
+  do personagem (personagens alterados durante a migração são pulados e migrados na próxima execução).
+
+Dry-run por padrão: apenas relata o que seria migrado. Use `--apply` para gravar.
+
+Uso:
+    python scripts/migration/migrate_ph_ledger.py [--apply] [--batch-size 500]
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+from dotenv import load_dotenv
+from pymongo import UpdateOne
+
+# Ensure project root is on sys.path so `src` package can be imported when running as a script
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.infrastructure.database.mongodb_repository import MongoDBRepository
+
+load_dotenv()
+
+LEGACY_PH_FILTER = {"pontos.ph.gasto.0": {"$exists": True}}
+
+
+def _parse_date(value: Any, fallback: datetime) -> datetime:
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value)
+            return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+        except ValueError:
+            pass
+    return fallback
+
+
+def build_ledger_entries(character_doc: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], int]:
+    """Converte o array legado em lançamentos do ph_ledger. Retorna (lançamentos, total gasto)."""
+    fallback_date = _parse_date(character_doc.get("created_at"), datetime.now(timezone.utc))
+    entries = []
+    total = 0
+    for index, item in enumerate(character_doc["pontos"]["ph"]["gasto"]):
+        # Mesmas chaves aceitas por Character.from_dict (pt e formatos antigos em inglês)
+        custo = item.get("custo") if item.get("custo") is not None else item.get("points") or 0
+        entries.append({
+            "character_id": character_doc["_id"],
+            "legacy_index": index,
+            "descricao": item.get("descricao") or item.get("description") or item.get("desc") or "",
+            "custo": custo,
+            "tipo": "reembolso" if custo < 0 else "gasto",
+            "data": _parse_date(item.get("data") or item.get("date") or item.get("timestamp"), fallback_date),
+        })
+        total += custo
+    return entries, total
+
+
+async def migrate(repo: MongoDBRepository, apply_changes: bool = False, batch_size: int = 500) -> Dict[str, int]:
+    stats = {"characters": 0, "entries": 0, "migrated": 0, "skipped": 0}
+    cursor = repo.characters_collection.find(
+        LEGACY_PH_FILTER, {"pontos.ph": 1, "version": 1, "created_at": 1}
+    ).batch_size(batch_size)
+    async for doc in cursor:
+        entries, total = build_ledger_entries(doc)
+        stats["characters"] += 1
+        stats["entries"] += len(entries)
+        if not apply_changes:
+            continue
+
+        await repo.ph_ledger_collection.bulk_write([
+            UpdateOne({"character_id": entry["character_id"], "legacy_index": entry["legacy_index"]},
+                      {"$setOnInsert": entry}, upsert=True)
+            for entry in entries
+        ], ordered=False)
+
+        version = doc.get("version") or 0
+        result = await repo.characters_collection.update_one(
+            {"_id": doc["_id"], "version": version if version else {"$in": [0, None]}},
+            {
+                "$set": {"pontos.ph.gasto_total": doc["pontos"]["ph"].get("gasto_total", 0) + total},
+                "$unset": {"pontos.ph.gasto": ""},
+                "$inc": {"version": 1},
+            },
+        )
+        if result.matched_count:
+            stats["migrated"] += 1
+        else:
+            stats["skipped"] += 1
+            print(f"Personagem {doc['_id']} foi alterado durante a migração; execute o script novamente.")
+    return stats
+
+
+async def main(apply_changes: bool, batch_size: int):
+    repo = MongoDBRepository(
+        connection_string=os.getenv("MONGODB_CONNECTION_STRING", "mongodb://localhost:27017/"),
+        database_name=os.getenv("MONGODB_DATABASE_NAME", "rpg_bot_db"),
+    )
+    await repo.connect()
+    try:
+        stats = await migrate(repo, apply_changes=apply_changes, batch_size=batch_size)
+    finally:
+        await repo.disconnect()
+
+    mode = "Aplicado" if apply_changes else "Dry-run"
+    print(f"{mode}: {stats['characters']} personagens com gastos de PH embutidos, {stats['entries']} lançamentos.")
+    if apply_changes:
+        print(f"Migrados: {stats['migrated']}, pulados (alterados durante a migração): {stats['skipped']}.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migra pontos.ph.gasto para a coleção ph_ledger.")
+    parser.add_argument("--apply", action="store_true", help="Grava as alterações (padrão: dry-run).")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.apply, args.batch_size))
@@ -1,15 +1,46 @@
+"""
+Semeia a coleção `classes` com as classes padrão do RPG Bot.
+
+Os registros abaixo ainda usam as chaves legadas (`nome`, `atributos_base`, ...); antes de gravar,
+cada um é normalizado para o esquema canônico do `ClassTemplate` (`name`, `base_attributes` com
+chaves em inglês, ...). Tudo é aplicado em um único `bulk_write` de upserts pela classe (`name` ou
+o legado `nome`), que também remove as chaves legadas de documentos antigos e renova `updated_at`
+quando o documento muda. Executar de novo é seguro: classes já normalizadas e iguais contam como
+inalteradas e mantêm o `updated_at`.
+
+Uso:
+    python scripts/migration/populate_classes.py
+"""
 import os
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
 import pymongo
+from pymongo import UpdateOne
 from pymongo.errors import ConnectionFailure # Import ConnectionFailure directly
-from datetime import datetime
 from dotenv import load_dotenv # Import load_dotenv
 
+# Ensure project root is on sys.path so `src` package can be imported when running as a script
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.core.entities.class_template import ClassTemplate
+
 # Load environment variables from .env file
 load_dotenv()
 
 MONGODB_CONNECTION_STRING = os.environ.get("MONGODB_CONNECTION_STRING")
 MONGODB_DATABASE_NAME = os.environ.get("MONGODB_DATABASE_NAME")
 
+# Chaves legadas -> chaves canônicas do ClassTemplate
+LEGACY_ATTRIBUTE_KEYS = {
+    "forca": "strength", "destreza": "dexterity", "constituicao": "constitution",
+    "inteligencia": "intelligence", "sabedoria": "wisdom", "carisma": "charisma",
+}
+LEGACY_FIELDS = ("nome", "descricao", "atributos_base", "habilidades_iniciais")
+
 # Define the classes for the RPG Bot
 classes_data = [
     {
@@ -68,6 +99,68 @@ classes_data = [
     }
 ]
 
+
+def normalize_class_document(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Converte um registro (legado ou canônico) no documento canônico do ClassTemplate, sem `_id`."""
+    data = dict(data)
+    if "base_attributes" not in data and "atributos_base" in data:
+        data["base_attributes"] = {
+            LEGACY_ATTRIBUTE_KEYS.get(key, key): value for key, value in data["atributos_base"].items()
+        }
+    if "starting_skills" not in data and "habilidades_iniciais" in data:
+        data["starting_skills"] = list(data["habilidades_iniciais"])
+    document = ClassTemplate.from_dict(data).to_dict()
+    document.pop("_id")
+    return document
+
+
+def _is_missing(field: str) -> Dict[str, Any]:
+    return {"$eq": [{"$ifNull": [f"${field}", None]}, None]}
+
+
+def build_operations(classes: List[Dict[str, Any]], now: datetime) -> List[UpdateOne]:
+    """
+    Um upsert por classe, como pipeline de atualização: `updated_at` só recebe `now` quando algum
+    campo canônico difere do gravado, ainda há chaves legadas ou o documento não tinha `updated_at`.
+    Assim uma classe igual não é modificada e continua contando como inalterada.
+    """
+    operations = []
+    for class_data in classes:
+        document = normalize_class_document(class_data)
+        name = document["name"]
+        changed = {"$or": [
+            *({"$ne": [f"${field}", {"$literal": value}]} for field, value in document.items()),
+            *({"$not": [_is_missing(field)]} for field in LEGACY_FIELDS),
+            _is_missing("updated_at"),
+        ]}
+        operations.append(UpdateOne(
+            {"$or": [{"name": name}, {"nome": name}]},
+            [
+                {"$set": {"updated_at": {"$cond": [changed, now, "$updated_at"]}}},
+                {"$set": {
+                    **{field: {"$literal": value} for field, value in document.items()},
+                    "created_at": {"$ifNull": ["$created_at", now]},
+                }},
+                {"$project": {field: 0 for field in LEGACY_FIELDS}},
+            ],
+            upsert=True,
+        ))
+    return operations
+
+
+def seed_classes(classes_collection, classes: List[Dict[str, Any]] = None) -> Dict[str, int]:
+    """Aplica os upserts em um único bulk_write. Retorna as contagens de inseridas/atualizadas/inalteradas."""
+    classes = classes_data if classes is None else classes
+    if not classes:
+        return {"inserted": 0, "updated": 0, "unchanged": 0}
+    result = classes_collection.bulk_write(build_operations(classes, datetime.now(timezone.utc)), ordered=False)
+    return {
+        "inserted": result.upserted_count,
+        "updated": result.modified_count,
+        "unchanged": result.matched_count - result.modified_count,
+    }
+
+
 def populate_classes():
     if not MONGODB_CONNECTION_STRING or not MONGODB_DATABASE_NAME:
         print("Erro: Variáveis de ambiente MONGODB_CONNECTION_STRING e MONGODB_DATABASE_NAME devem ser definidas.")
@@ -77,31 +170,15 @@ def populate_classes():
     try:
         client = pymongo.MongoClient(MONGODB_CONNECTION_STRING)
         db = client[MONGODB_DATABASE_NAME]
-        classes_collection = db.classes
 
         print(f"Conectado ao MongoDB. Banco de dados: {MONGODB_DATABASE_NAME}")
 
-        inserted_count = 0
-        skipped_count = 0
-
-        for class_data in classes_data:
-            class_name = class_data["nome"]
-            existing_class = classes_collection.find_one({"nome": class_name})
-
-            if existing_class:
-                print(f"Classe '{class_name}' já existe. Pulando inserção.")
-                skipped_count += 1
-            else:
-                now = datetime.utcnow()
-                class_data["created_at"] = now
-                class_data["updated_at"] = now
-                insert_result = classes_collection.insert_one(class_data)
-                print(f"Classe '{class_name}' inserida com sucesso. ID: {insert_result.inserted_id}")
-                inserted_count += 1
+        counts = seed_classes(db.classes)
 
         print(f"\nProcesso de população concluído.")
-        print(f"Classes inseridas: {inserted_count}")
-        print(f"Classes puladas (já existentes): {skipped_count}")
+        print(f"Classes inseridas: {counts['inserted']}")
+        print(f"Classes atualizadas: {counts['updated']}")
+        print(f"Classes inalteradas: {counts['unchanged']}")
 
     except ConnectionFailure as e: # Use the directly imported ConnectionFailure
         print(f"Erro de conexão com o MongoDB: {e}")
@@ -113,4 +190,4 @@ def populate_classes():
             print("Conexão com o MongoDB fechada.")
 
 if __name__ == "__main__":
-    populate_classes()
\ No newline at end of file
+    populate_classes()
@@ -8,15 +8,14 @@ import shlex
 from src.core.services.character_service import CharacterService
 from src.core.services.levelup_service import LevelUpService
 from src.infrastructure.database.player_preferences_repository import PlayerPreferencesRepository
-from src.infrastructure.database.transformation_repository import TransformationRepository
-from src.infrastructure.database.class_repository import ClassRepository
 from src.core.entities.player_preferences import PlayerPreferences
 from src.application.dtos.character_dto import CreateCharacterDTO, UpdateCharacterDTO, CharacterResponseDTO
 from src.utils.exceptions.application_exceptions import CharacterNotFoundError, InvalidInputError, CharacterError, PlayerPreferencesError, LevelUpError
-from src.infrastructure.database.mongodb_repository import MongoDBRepository # For instantiation
 from src.utils.helpers.character_parser import parse_character_sheet
+from src.utils.helpers.page_cursors import PageCursors
 from discord import Embed, Color
 from src.utils.logging.logger import get_logger # Import the logger
+from src.infrastructure.container import get_container
 
 logger = get_logger(__name__) # Initialize logger
 
@@ -26,13 +25,15 @@ class CharacterCommands(commands.Cog):
         self.character_service = character_service
         self.levelup_service = levelup_service
         self.player_preferences_repository = player_preferences_repository
+        # Cursor da próxima página de "!ficha listar" por jogador
+        self._list_cursors = PageCursors()
 
     @commands.group(name="ficha", invoke_without_command=True)
     async def ficha(self, ctx: commands.Context):
         """Comandos para gerenciar fichas de personagens."""
         if ctx.invoked_subcommand is None:
             # Updated help message
-            await ctx.send("Use `!ficha criar`, `!ficha ver`, `!ficha atualizar`, `!ficha excluir` ou `!ficha levelup`.")
+            await ctx.send("Use `!ficha criar`, `!ficha ver`, `!ficha listar`, `!ficha atualizar`, `!ficha excluir` ou `!ficha levelup`.")
 
     @ficha.command(name="criar")
     async def create_character(self, ctx: commands.Context, name: str, class_name: str, *, args: str = ""):
@@ -121,6 +122,44 @@ class CharacterCommands(commands.Cog):
         except Exception as e:
             await ctx.send(f"Ocorreu um erro inesperado: {e}")
 
+    @ficha.command(name="listar")
+    async def list_characters(self, ctx: commands.Context, pagina: Optional[str] = None):
+        """
+        Lista seus personagens em ordem alfabética, 10 por página.
+        Ex: !ficha listar
+        Ex: !ficha listar mais
+        """
+        try:
+            player_id = str(ctx.author.id)
+            next_page = bool(pagina) and pagina.lower() == "mais"
+            after = self._list_cursors.get(player_id) if next_page else None
+            if next_page and after is None:
+                await ctx.send("Não há mais personagens para listar.")
+                return
+
+            characters, next_cursor = await self.character_service.list_characters_by_player(
+                player_id, after=after, limit=10
+            )
+            self._list_cursors.store(player_id, next_cursor)
+
+            if not characters:
+                await ctx.send("Você não tem personagens cadastrados.")
+                return
+            embed = Embed(
+                title=f"Personagens de {ctx.author.display_name}",
+                description="\n".join(
+                    f"- **{c.name}**" + (f" ({c.alias})" if c.alias else "") + f" — Nível {c.level} | ID: `{c.id}`"
+                    for c in characters
+                ),
+                color=Color.blue(),
+            )
+            if next_cursor:
+                embed.set_footer(text="Use !ficha listar mais para a próxima página.")
+            await ctx.send(embed=embed)
+        except Exception as e:
+            logger.error(f"Erro ao listar personagens: {e}")
+            await ctx.send(f"Ocorreu um erro inesperado: {e}")
+
     @ficha.command(name="atualizar")
     async def update_character_command(self, ctx: commands.Context, identifier: str, field_name: str, *, value: str):
         """
@@ -303,31 +342,10 @@ class CharacterCommands(commands.Cog):
             await ctx.send(f"Erro ao limpar personagens: {e}")
 
 async def setup(bot: commands.Bot):
-    connection_string = os.getenv("MONGODB_CONNECTION_STRING", "mongodb://localhost:27017/")
-    database_name = os.getenv("MONGODB_DATABASE_NAME", "rpg_bot_db")
-
-    # Instanciar o MongoDBRepository e conectar
-    mongodb_repo = MongoDBRepository(
-        connection_string=connection_string,
-        database_name=database_name
-    )
-    await mongodb_repo.connect() # Conectar assincronamente
-
-    # Passar a instância conectada para os repositórios específicos
-    character_repo = mongodb_repo
-    transformation_repo = TransformationRepository(mongodb_repo)
-    class_repo = ClassRepository(mongodb_repo)
-    player_preferences_repo = PlayerPreferencesRepository(mongodb_repository=mongodb_repo)
-
-    character_service = CharacterService(
-        character_repository=character_repo,
-        transformation_repository=transformation_repo,
-        class_repository=class_repo
-    )
-    levelup_service = LevelUpService(
-        character_service=character_service,
-        class_repository=class_repo
-    )
-    
-    await bot.add_cog(CharacterCommands(bot, character_service, levelup_service, player_preferences_repo))
-
+    container = await get_container(bot)
+    await bot.add_cog(CharacterCommands(
+        bot,
+        container.character_service,
+        container.levelup_service,
+        container.player_preferences_repository
+    ))
@@ -6,8 +6,6 @@ from typing import Optional, Dict, Any
 from src.core.entities.character import Character
 from src.core.entities.class_template import ClassTemplate
 from src.core.services.character_service import CharacterService
-from src.infrastructure.database.mongodb_repository import MongoDBRepository
-from src.infrastructure.database.transformation_repository import TransformationRepository
 from src.infrastructure.database.class_repository import ClassRepository
 from src.utils.exceptions.application_exceptions import CharacterNotFoundError, InvalidInputError
 
@@ -21,13 +19,12 @@ from typing import Optional, Dict, Any
 from src.core.entities.character import Character
 from src.core.entities.class_template import ClassTemplate
 from src.core.services.character_service import CharacterService
-from src.infrastructure.database.mongodb_repository import MongoDBRepository
-from src.infrastructure.database.transformation_repository import TransformationRepository
-from src.infrastructure.database.class_repository import ClassRepository
+from src.infrastructure.cache.class_registry import ClassRegistry
 from src.utils.exceptions.application_exceptions import CharacterNotFoundError, InvalidInputError
+from src.infrastructure.container import get_container
 
 class ClassCommands(commands.Cog):
-    def __init__(self, bot: commands.Bot, character_service: CharacterService, class_repository: ClassRepository):
+    def __init__(self, bot: commands.Bot, character_service: CharacterService, class_repository: ClassRegistry):
         self.bot = bot
         self.character_service = character_service
         self.class_repository = class_repository
@@ -70,24 +67,20 @@ class ClassCommands(commands.Cog):
             print(f"An unexpected error occurred in multiclasse command: {e}")
             await ctx.send("Ocorreu um erro inesperado ao tentar adicionar a nova classe.")
 
-async def setup(bot: commands.Bot):
-    mongo_connection_string = os.getenv("MONGODB_CONNECTION_STRING", "mongodb://localhost:27017/")
-    mongo_database_name = os.getenv("MONGODB_DATABASE_NAME", "rpg_bot_db")
-
-    # Repositórios
-    mongodb_repo = MongoDBRepository(
-        connection_string=mongo_connection_string,
-        database_name=mongo_database_name
-    )
-    await mongodb_repo.connect() # Conectar assincronamente
-    transformation_repo = TransformationRepository(mongodb_repo)
-    class_repo = ClassRepository(mongodb_repo)
-
-    # Serviços
-    character_service = CharacterService(
-        character_repository=mongodb_repo,
-        transformation_repository=transformation_repo,
-        class_repository=class_repo
-    )
+    @commands.command(name='recarregar_classes', help='Recarrega o registro de classes do banco de dados (apenas para administradores).')
+    @commands.has_permissions(administrator=True)
+    async def recarregar_classes(self, ctx: commands.Context):
+        """
+        Recarrega o registro de classes em memória, ex.: após editar classes direto no banco
+        ou rodar o script de população de classes.
+        """
+        try:
+            await self.class_repository.reload()
+            await ctx.send(f"Registro de classes recarregado: {len(self.class_repository.classes)} classes.")
+        except Exception as e:
+            print(f"An unexpected error occurred in recarregar_classes command: {e}")
+            await ctx.send("Ocorreu um erro inesperado ao recarregar as classes.")
 
-    await bot.add_cog(ClassCommands(bot, character_service, class_repo))
+async def setup(bot: commands.Bot):
+    container = await get_container(bot)
+    await bot.add_cog(ClassCommands(bot, container.character_service, container.class_repository))
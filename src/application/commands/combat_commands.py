@@ -17,9 +17,7 @@ from src.utils.exceptions.application_exceptions import (
     CharacterError, AppPermissionError
 )
 from src.utils.exceptions.infrastructure_exceptions import RepositoryError
-from src.infrastructure.database.mongodb_repository import MongoDBRepository # For instantiation
-from src.infrastructure.database.player_preferences_repository import PlayerPreferencesRepository
-from src.infrastructure.cache.redis_repository import RedisRepository # For instantiation
+from src.infrastructure.container import get_container
 import os
 
 # Helper function to create embeds
@@ -165,12 +163,11 @@ class CombatCommands(commands.Cog):
         self.logger.debug(f"[{command_name}] - Participantes parseados: {participants}")
         
         initiative_entries_to_add: List[InitiativeEntryDTO] = []
+        parsed_participants: List[Tuple[str, int]] = []
         
         for participant_name_raw in participants:
             name = participant_name_raw.strip()
             modifier = 0
-            character_id = None # For player characters
-            is_npc = False
             self.logger.debug(f"[{command_name}] - Processando participante: {participant_name_raw}")
 
             if '+' in name:
@@ -183,32 +180,37 @@ class CombatCommands(commands.Cog):
                     self.logger.warning(f"[{command_name}] - Modificador inválido para '{participant_name_raw}'.")
                     await context.send(embed=create_embed("Entrada Inválida", f"Modificador inválido para '{participant_name_raw}'. Use o formato 'Nome+Modificador'.", discord.Color.red()))
                     return
-            
-            try:
-                self.logger.debug(f"[{command_name}] - Tentando obter dados do personagem para '{name}'")
-                character = await self.get_character_data(name, context)
-                if character:
-                    character_id = character.id
-                    self.logger.debug(f"[{command_name}] - Personagem encontrado: {character.name} ({character.id})")
+            if name:
+                parsed_participants.append((name, modifier))
+
+        # Resolve todo o grupo de uma vez; quem não for encontrado entra como NPC
+        try:
+            self.logger.debug(f"[{command_name}] - Resolvendo {len(parsed_participants)} participantes em lote.")
+            characters, missing_names = await self.combat_service.resolve_participants([name for name, _ in parsed_participants])
+        except Exception as e:
+            self.logger.critical(f"[{command_name}] - Erro inesperado ao buscar participantes: {e}", exc_info=True)
+            await context.send(embed=create_embed("Erro Inesperado", f"Erro ao buscar participantes: {e}", discord.Color.red()))
+            return
+
+        for name, modifier in parsed_participants:
+            character = characters.get(name)
+            if character:
+                self.logger.debug(f"[{command_name}] - Personagem encontrado: {character.name} ({character.id})")
                 # Use dexterity modifier from character.
-                dex_modifier = character.modifiers.get("dexterity", 0) if character and character.modifiers else 0
+                dex_modifier = character.modifiers.get("dexterity", 0) if character.modifiers else 0
                 initiative_modifier = dex_modifier + modifier # Add explicit modifier from command
                 self.logger.debug(f"[{command_name}] - Modificador de iniciativa calculado para {name}: {initiative_modifier} (Dex: {dex_modifier}, Extra: {modifier})")
-                
                 initiative_entries_to_add.append(InitiativeEntryDTO(
                     session_id=session_id,
-                    character_id=str(character_id) if character_id else None,
+                    character_id=str(character.id),
                     character_name=name,
                     player_id=player_id,
                     modifier=initiative_modifier,
                     is_npc=False
                 ))
                 self.logger.debug(f"[{command_name}] - Adicionado PC '{name}' à lista de iniciativa.")
-                
-            except (CharacterNotFoundError, InvalidCharacterError):
+            else:
                 self.logger.debug(f"[{command_name}] - Personagem '{name}' não encontrado como PC, tratando como NPC.")
-                # If not found as a player character, treat as NPC
-                is_npc = True
                 initiative_entries_to_add.append(InitiativeEntryDTO(
                     session_id=session_id,
                     character_name=name,
@@ -217,10 +219,13 @@ class CombatCommands(commands.Cog):
                     is_npc=True
                 ))
                 self.logger.debug(f"[{command_name}] - Adicionado NPC '{name}' à lista de iniciativa.")
-            except Exception as e:
-                self.logger.critical(f"[{command_name}] - Erro inesperado ao processar participante '{participant_name_raw}': {e}", exc_info=True)
-                await context.send(embed=create_embed("Erro Inesperado", f"Erro ao processar participante '{participant_name_raw}': {e}", discord.Color.red()))
-                continue
+
+        if missing_names:
+            await context.send(embed=create_embed(
+                "Participantes como NPC",
+                "Nenhum personagem encontrado para: " + ", ".join(f"**{name}**" for name in missing_names) + ". Eles foram adicionados como NPCs.",
+                discord.Color.orange()
+            ))
 
         if not initiative_entries_to_add:
             self.logger.warning(f"[{command_name}] - Nenhum participante válido foi fornecido para adicionar à iniciativa.")
@@ -379,7 +384,7 @@ class CombatCommands(commands.Cog):
             # Assuming damage is always to HP for now. This might need to be a parameter.
             attribute_type = "hp" 
             
-            updated_session = await self.combat_service.apply_damage(
+            target_entry = await self.combat_service.apply_damage(
                 session_id=session_id,
                 target_character_id=str(target_character_id) if target_character_id else None,
                 target_name=actual_target_name or "",
@@ -388,11 +393,8 @@ class CombatCommands(commands.Cog):
                 player_id=player_id
             )
             
-            # Get updated attribute value from the returned CombatSession object
-            current_value = "N/A"
-            target_entry = next((entry for entry in updated_session.turn_order if (target_character_id and entry.get("id") == target_character_id) or (not target_character_id and entry.get("name") == actual_target_name)), None)
-            if target_entry:
-                current_value = target_entry.get(attribute_type, "N/A")
+            # O serviço retorna a entrada do alvo já atualizada
+            current_value = target_entry.get(attribute_type, "N/A")
 
             embed = create_embed(
                 "Dano Aplicado",
@@ -472,7 +474,7 @@ class CombatCommands(commands.Cog):
             # Assuming healing is always to HP for now.
             attribute_type = "hp"
             
-            updated_session = await self.combat_service.apply_healing(
+            target_entry = await self.combat_service.apply_healing(
                 session_id=session_id,
                 target_character_id=str(target_character_id) if target_character_id else None,
                 target_name=actual_target_name or "",
@@ -481,10 +483,7 @@ class CombatCommands(commands.Cog):
                 player_id=player_id
             )
             
-            current_value = "N/A"
-            target_entry = next((entry for entry in updated_session.turn_order if (target_character_id and entry.get("id") == target_character_id) or (not target_character_id and entry.get("name") == actual_target_name)), None)
-            if target_entry:
-                current_value = target_entry.get(attribute_type, "N/A")
+            current_value = target_entry.get(attribute_type, "N/A")
 
             embed = create_embed(
                 "Cura Aplicada",
@@ -543,28 +542,9 @@ class CombatCommands(commands.Cog):
             await context.send(embed=create_embed("Erro Inesperado", f"Ocorreu um erro inesperado ao finalizar o combate: {e}", discord.Color.red()))
 
 async def setup(bot: commands.Bot):
-    # Ensure environment variables are set or provide defaults
-    mongo_connection_string = os.getenv("MONGODB_CONNECTION_STRING", "mongodb://localhost:27017/")
-    mongo_database_name = os.getenv("MONGODB_DATABASE_NAME", "rpg_bot_db")
-    redis_host = os.getenv("REDIS_HOST", "localhost")
-    redis_port = int(os.getenv("REDIS_PORT", 6379))
-    redis_db = int(os.getenv("REDIS_DB", 0))
-
-    # Instantiate repositories
-    mongo_repo = MongoDBRepository(
-        connection_string=mongo_connection_string,
-        database_name=mongo_database_name,
-    )
-    await mongo_repo.connect() # Conectar assincronamente
-    redis_repo = RedisRepository(
-        host=redis_host,
-        port=redis_port,
-        db=redis_db
-    )
-    await redis_repo.connect() # Conectar assincronamente
-    
-    player_preferences_repository = PlayerPreferencesRepository(mongodb_repository=mongo_repo)
-
-    # Instantiate CombatService with repositories
-    combat_service = CombatService(character_repository=mongo_repo, session_repository=redis_repo, player_preferences_repository=player_preferences_repository)
-    await bot.add_cog(CombatCommands(bot, combat_service))
\ No newline at end of file
+    container = await get_container(bot)
+    # Sem Redis o contêiner não monta o serviço de combate; os demais cogs seguem carregando
+    if container.combat_service is None:
+        logging.getLogger(__name__).warning("Serviço de combate indisponível (Redis não conectado); comandos de combate não carregados.")
+        return
+    await bot.add_cog(CombatCommands(bot, container.combat_service))
@@ -5,13 +5,11 @@ from typing import Optional
 # Import necessary components
 # Import necessary components and services
 from src.core.calculators.attribute_roller import roll_attribute # This function will return (d20_roll, total_roll)
-from src.infrastructure.database.mongodb_repository import MongoDBRepository
-from src.infrastructure.database.transformation_repository import TransformationRepository
-from src.infrastructure.database.class_repository import ClassRepository
 # Assuming PlayerPreferences or a similar entity/service is used to store/retrieve favorite character
 from src.core.services.character_service import CharacterService
 from src.infrastructure.database.player_preferences_repository import PlayerPreferencesRepository
 from src.utils.logging.logger import get_logger # Import the logger
+from src.infrastructure.container import get_container
 
 logger = get_logger(__name__) # Initialize logger
 
@@ -91,7 +89,7 @@ class DiceCommands(commands.Cog):
 
         favorite_character_id = preferences.favorite_character_id
         logger.info(f"[{player_discord_id}] ID do personagem favorito encontrado: {favorite_character_id}. Buscando dados do personagem.")
-        favorite_character_data = await self.character_service.get_character_with_effective_stats(favorite_character_id)
+        favorite_character_data = await self.character_service.get_roll_stats(favorite_character_id)
 
         if not favorite_character_data:
             logger.error(f"[{player_discord_id}] Personagem favorito com ID '{favorite_character_id}' não encontrado no banco de dados.")
@@ -189,24 +187,6 @@ class DiceCommands(commands.Cog):
     # This is a standard way to add a Cog to a Discord bot.
     # It assumes the bot is set up to load cogs.
 async def setup(bot: commands.Bot):
-    # Database connection details
-    MONGODB_CONNECTION_STRING = os.getenv("MONGODB_CONNECTION_STRING", "mongodb://localhost:27017/")
-    MONGODB_DATABASE_NAME = os.getenv("MONGODB_DATABASE_NAME", "rpg_bot_db")
-
-    mongo_repo = MongoDBRepository(connection_string=MONGODB_CONNECTION_STRING, database_name=MONGODB_DATABASE_NAME)
-    await mongo_repo.connect() # Conectar assincronamente
-
-    # Instantiate repositories
-    transformation_repo = TransformationRepository(mongodb_repository=mongo_repo)
-    class_repo = ClassRepository(mongodb_repository=mongo_repo)
-    player_preferences_repo = PlayerPreferencesRepository(mongodb_repository=mongo_repo)
-
-    # Instantiate CharacterService with dependencies
-    character_service = CharacterService(
-        character_repository=mongo_repo,
-        transformation_repository=transformation_repo,
-        class_repository=class_repo
-    )
-    
+    container = await get_container(bot)
     # Pass all required dependencies to the Cog
-    await bot.add_cog(DiceCommands(bot, character_service, player_preferences_repo))
\ No newline at end of file
+    await bot.add_cog(DiceCommands(bot, container.character_service, container.player_preferences_repository))
@@ -3,11 +3,8 @@ from typing import Optional, Dict
 from src.core.services.levelup_service import LevelUpService
 from src.application.dtos.levelup_dto import ApplyLevelUpDTO, LevelUpResponseDTO
 from src.utils.exceptions.application_exceptions import LevelUpError, InvalidInputError, CharacterNotFoundError
-from src.infrastructure.database.mongodb_repository import MongoDBRepository
-from src.infrastructure.database.transformation_repository import TransformationRepository
-from src.infrastructure.database.class_repository import ClassRepository
 from src.core.services.character_service import CharacterService
-import os
+from src.infrastructure.container import get_container
 import json # For parsing JSON strings for points
 import ast # For safely evaluating string literals
 
@@ -117,17 +114,5 @@ class LevelUpCommands(commands.Cog):
             await context.send(f"Ocorreu um erro inesperado: {e}")
 
 async def setup(bot: commands.Bot):
-    connection_string = os.getenv("MONGODB_CONNECTION_STRING", "mongodb://localhost:27017/")
-    database_name = os.getenv("MONGODB_DATABASE_NAME", "rpg_bot_db")
-
-    mongo_repo = MongoDBRepository(connection_string=connection_string, database_name=database_name)
-    await mongo_repo.connect() # Conectar assincronamente
-    transformation_repository = TransformationRepository(mongo_repo)
-    class_repository = ClassRepository(mongodb_repository=mongo_repo)
-    character_service = CharacterService(
-        character_repository=mongo_repo,
-        transformation_repository=transformation_repository,
-        class_repository=class_repository
-    )
-    levelup_service = LevelUpService(character_service=character_service, class_repository=class_repository)
-    await bot.add_cog(LevelUpCommands(bot, levelup_service))
\ No newline at end of file
+    container = await get_container(bot)
+    await bot.add_cog(LevelUpCommands(bot, container.levelup_service))
@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+import discord
+from discord.ext import commands
+
+from config.settings.base_settings import BaseSettings
+from src.infrastructure.cache.session_sweeper import CombatSessionSweeper
+from src.infrastructure.container import get_container
+from src.infrastructure.monitoring.instrumentation import MetricsRegistry
+
+
+class PerfCommands(commands.Cog):
+    """Consulta das métricas de latência dos repositórios, MongoDB e Redis (apenas o dono do bot)."""
+
+    def __init__(self, bot: commands.Bot, metrics: MetricsRegistry, sweeper: Optional[CombatSessionSweeper] = None):
+        self.bot = bot
+        self.metrics = metrics
+        self.sweeper = sweeper
+
+    async def cog_check(self, ctx: commands.Context) -> bool:
+        if not await self.bot.is_owner(ctx.author):
+            raise commands.NotOwner()
+        return True
+
+    @commands.group(name="perf", invoke_without_command=True)
+    async def perf(self, ctx: commands.Context, prefixo: Optional[str] = None):
+        """
+        Mostra as operações que mais consumiram tempo desde o último reset.
+        Ex: !perf | !perf mongo | !perf redis | !perf repo
+        Subcomandos: !perf json, !perf reset, !perf limpeza
+        """
+        top = self.metrics.top(limit=15, prefix=prefixo)
+        if not top:
+            await ctx.send("Nenhuma métrica registrada ainda.")
+            return
+        lines = [f"{'operação':<48} {'n':>6} {'p50':>6} {'p95':>6} {'máx':>8} {'erros':>5} {'KB':>8}"]
+        for name, data in top:
+            lines.append(
+                f"{name[-48:]:<48} {data['count']:>6} {data['p50_ms']:>6.0f} {data['p95_ms']:>6.0f} "
+                f"{data['max_ms']:>8.1f} {data['errors']:>5} {data['payload_bytes'] / 1024:>8.1f}"
+            )
+        since = datetime.fromtimestamp(self.metrics.started_at, timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+        message = f"Latências em ms desde {since}:\n```\n" + "\n".join(lines) + "\n```"
+        await ctx.send(message[:2000])
+
+    @perf.command(name="json")
+    async def perf_json(self, ctx: commands.Context):
+        """Grava o snapshot completo (com os baldes dos histogramas) em JSON e envia como anexo."""
+        path = self.metrics.dump_json(BaseSettings.PERF_SNAPSHOT_PATH)
+        await ctx.send(f"Snapshot gravado em `{path}`.", file=discord.File(path))
+
+    @perf.command(name="limpeza")
+    async def perf_sweeper(self, ctx: commands.Context):
+        """Mostra os contadores da limpeza de sessões de combate expiradas."""
+        if self.sweeper is None:
+            await ctx.send("Limpeza de sessões de combate desativada.")
+            return
+        stats = self.sweeper.stats
+        last_run = "nunca"
+        if stats["last_run_at"] is not None:
+            last_run = datetime.fromtimestamp(stats["last_run_at"], timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+        await ctx.send(
+            f"Limpeza de sessões (a cada {self.sweeper.interval_seconds:g}s): {stats['runs']} rodadas, "
+            f"{stats['swept_total']} sessões removidas, {stats['errors']} erros. "
+            f"Última rodada: {last_run}, {stats['last_swept']} removidas em {stats['last_duration_ms']:.1f} ms."
+        )
+
+    @perf.command(name="reset")
+    async def perf_reset(self, ctx: commands.Context):
+        """Zera os histogramas."""
+        self.metrics.reset()
+        await ctx.send("Métricas zeradas.")
+
+
+async def setup(bot: commands.Bot):
+    container = await get_container(bot)
+    # Com INSTRUMENTATION_ENABLED=false não há métricas para consultar
+    if container.metrics is not None:
+        await bot.add_cog(PerfCommands(bot, container.metrics, container.session_sweeper))
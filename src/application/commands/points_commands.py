@@ -16,15 +16,73 @@ from datetime import datetime, timezone
 
 from src.core.services.character_service import CharacterService
 from src.utils.exceptions.application_exceptions import CharacterNotFoundError, InvalidInputError
+from src.infrastructure.container import get_container
+from src.infrastructure.database.ph_ledger_repository import CANCELLED, CONFIRMED, PENDING, PHLedgerRepository
+from src.utils.exceptions.infrastructure_exceptions import ConcurrentUpdateError
+from src.utils.helpers.page_cursors import PageCursors
+
+# Lançamentos de PH exibidos por página em !pontos pontos / !pontos historico
+PH_HISTORY_PAGE_SIZE = 10
+# Tentativas de confirmar/cancelar um lançamento de PH depois da atualização do personagem
+PH_ENTRY_STATUS_ATTEMPTS = 3
 
-from src.infrastructure.database.mongodb_repository import MongoDBRepository
-from src.infrastructure.database.transformation_repository import TransformationRepository
-from src.infrastructure.database.class_repository import ClassRepository
 
 class PointsCommands(commands.Cog):
-    def __init__(self, bot: commands.Bot, character_service: CharacterService):
+    def __init__(self, bot: commands.Bot, character_service: CharacterService, ph_ledger_repository: PHLedgerRepository):
         self.bot = bot
         self.character_service = character_service
+        self.ph_ledger_repository = ph_ledger_repository
+        # Cursor da próxima página do histórico de PH por (autor, personagem), usado por "!pontos historico <nome> mais"
+        self._history_cursors = PageCursors()
+
+    async def _set_ph_entry_status(self, entry, status: str):
+        for attempt in range(PH_ENTRY_STATUS_ATTEMPTS):
+            try:
+                await self.ph_ledger_repository.set_entry_status(entry["_id"], status)
+                return
+            except Exception as e:
+                error = e
+        # O lançamento fica pendente: não conta como gasto para reembolsos até ser corrigido
+        print(f"Erro ao marcar lançamento de PH {entry['_id']} como '{status}': {error}")
+
+    async def _apply_ph_change(self, character_name: str, description: str, custo: int, apply):
+        """
+        Registra o lançamento de PH como pendente, aplica `apply` ao personagem (com retry) e então
+        confirma o lançamento. Ele só é cancelado quando a atualização certamente não foi gravada
+        (entrada inválida, personagem inexistente ou conflito de versão); em qualquer outra falha
+        (rede, cancelamento da tarefa) a gravação pode ter ocorrido, então o lançamento fica
+        pendente, sem contar como gasto reembolsável, até ser conferido. Em reembolsos
+        (custo negativo) o limite é conferido no próprio ph_ledger depois de gravar o pendente,
+        o que também barra reembolsos simultâneos do mesmo gasto.
+        """
+        character = await self.character_service.get_character(character_name)
+        entry = await self.ph_ledger_repository.append_entry(character.id, description, custo, status=PENDING)
+        try:
+            if custo < 0:
+                spent = await self.ph_ledger_repository.get_spent_by_description(character.id, description)
+                remaining = spent.get(description, 0)
+                if remaining < 0:
+                    raise InvalidInputError(f"Não é possível reembolsar {-custo} pontos de PH ('{description}'). "
+                                            f"Gastos com essa descrição: {max(remaining - custo, 0)}")
+            character = await self.character_service.update_with_retry(character_name, apply)
+        except (InvalidInputError, CharacterNotFoundError, ConcurrentUpdateError):
+            await self._set_ph_entry_status(entry, CANCELLED)
+            raise
+        except Exception as e:
+            print(f"Lançamento de PH {entry['_id']} ('{description}', {custo:+d}) mantido pendente: "
+                  f"não foi possível confirmar se o personagem '{character_name}' foi atualizado ({e}).")
+            raise
+        await self._set_ph_entry_status(entry, CONFIRMED)
+        return character
+
+    @staticmethod
+    def _format_ph_entries(entries) -> str:
+        lines = []
+        for entry in entries:
+            data = entry.get("data")
+            when = data.strftime("%d/%m/%Y") if isinstance(data, datetime) else "-"
+            lines.append(f"\n    - {when} '{entry.get('descricao', 'Sem descrição')}' ({entry.get('custo', 0):+d} pontos)")
+        return "".join(lines)
 
     async def is_character_owner(self, ctx: commands.Context, character_name: str) -> bool:
         """
@@ -49,7 +107,7 @@ class PointsCommands(commands.Cog):
     async def points_group(self, ctx: commands.Context):
         """Comandos para gerenciar pontos de status, maestria e PH."""
         if ctx.invoked_subcommand is None:
-            await ctx.send("Use `!pontos pontos <nome_personagem>` para ver seus pontos, ou `!pontos gastar` / `!pontos refund`.")
+            await ctx.send("Use `!pontos pontos <nome_personagem>` para ver seus pontos, `!pontos historico <nome_personagem>` para o histórico de PH, ou `!pontos gastar` / `!pontos refund`.")
 
     @points_group.command(name='pontos')
     async def show_points(self, ctx: commands.Context, character_name: str):
@@ -62,25 +120,28 @@ class PointsCommands(commands.Cog):
 
             status_points_data = character.pontos.get("status", {"total": 0, "gasto": 0})
             mastery_points_data = character.pontos.get("mastery", {"total": 0, "gasto": 0})
-            ph_points_data = character.pontos.get("ph", {"total": 0, "gasto": []})
+            ph_points_data = character.pontos.get("ph", {"total": 0, "gasto_total": 0})
 
             status_available = status_points_data.get("total", 0)
             status_spent = status_points_data.get("gasto", 0)
             mastery_available = mastery_points_data.get("total", 0)
             mastery_spent = mastery_points_data.get("gasto", 0)
             ph_available = ph_points_data.get("total", 0)
-            ph_spent_list = ph_points_data.get("gasto", [])
+            ph_spent = ph_points_data.get("gasto_total", 0)
 
             message = (
                 f"**Pontos de '{character_name}':**\n"
                 f"- **Status:** Disponíveis: {status_available}, Gastos: {status_spent}\n"
                 f"- **Maestria:** Disponíveis: {mastery_available}, Gastos: {mastery_spent}\n"
-                f"- **PH:** Disponíveis: {ph_available}, Gastos: {len(ph_spent_list)} entradas"
+                f"- **PH:** Disponíveis: {ph_available}, Gastos: {ph_spent}"
+            )
+            recent_entries, next_cursor = await self.ph_ledger_repository.get_history(
+                character.id, limit=PH_HISTORY_PAGE_SIZE
             )
-            if ph_spent_list:
-                message += "\n  - Detalhes de PH Gasto:"
-                for ph_entry in ph_spent_list:
-                    message += f"\n    - '{ph_entry.get('description', 'Sem descrição')}' ({ph_entry.get('points', 0)} pontos)"
+            if recent_entries:
+                message += "\n  - Últimos lançamentos de PH:" + self._format_ph_entries(recent_entries)
+                if next_cursor:
+                    message += f"\n  Use `!pontos historico \"{character_name}\"` para ver o histórico completo."
 
             await ctx.send(message)
 
@@ -92,6 +153,43 @@ class PointsCommands(commands.Cog):
             print(f"Erro ao exibir pontos do personagem: {e}")
             await ctx.send("Ocorreu um erro ao buscar os pontos do personagem.")
 
+    @points_group.command(name='historico')
+    async def ph_history(self, ctx: commands.Context, character_name: str, pagina: Optional[str] = None):
+        """
+        Exibe o histórico de gastos e reembolsos de PH, do mais recente para o mais antigo.
+        Exemplos:
+        !pontos historico "Nome"
+        !pontos historico "Nome" mais
+        """
+        if not await self.is_character_owner(ctx, character_name):
+            return
+
+        try:
+            character = await self.character_service.get_character(character_name)
+            cursor_key = (ctx.author.id, str(character.id))
+            before = self._history_cursors.get(cursor_key) if pagina and pagina.lower() == "mais" else None
+            if pagina and pagina.lower() == "mais" and before is None:
+                await ctx.send(f"Não há mais lançamentos de PH para '{character_name}'.")
+                return
+
+            entries, next_cursor = await self.ph_ledger_repository.get_history(
+                character.id, limit=PH_HISTORY_PAGE_SIZE, before=before
+            )
+            self._history_cursors.store(cursor_key, next_cursor)
+
+            if not entries:
+                await ctx.send(f"Nenhum lançamento de PH para '{character_name}'.")
+                return
+            message = f"**Histórico de PH de '{character_name}':**" + self._format_ph_entries(entries)
+            if next_cursor:
+                message += f"\nUse `!pontos historico \"{character_name}\" mais` para a próxima página."
+            await ctx.send(message)
+        except CharacterNotFoundError:
+            await ctx.send(f"Personagem '{character_name}' não encontrado.")
+        except Exception as e:
+            print(f"Erro ao exibir histórico de PH: {e}")
+            await ctx.send("Ocorreu um erro ao buscar o histórico de PH.")
+
     @points_group.command(name='gastar')
     async def spend_points(self, ctx: commands.Context, point_type: str, *args):
         """
@@ -155,20 +253,21 @@ class PointsCommands(commands.Cog):
                 # ownership and fetch
                 if not await self.is_character_owner(ctx, character_name):
                     return
-                character = await self.character_service.get_character(character_name)
-                character.pontos.setdefault("status", {"total": 0, "gasto": 0})
-                status_data = character.pontos["status"]
-                if status_data["total"] < amount:
-                    raise InvalidInputError(f"Pontos de status insuficientes. Disponíveis: {status_data['total']}, Necessários: {amount}")
-
-                # apply points
-                current_val = character.attributes.get(attr, 0)
-                character.attributes[attr] = current_val + amount
-                status_data["total"] -= amount
-                status_data["gasto"] = status_data.get("gasto", 0) + amount
-                # Recalculate modifiers on the in-memory object and persist atomically
-                character.calculate_modifiers()
-                await self.character_service.character_repository.update_character(character)
+                def apply_status(character):
+                    character.pontos.setdefault("status", {"total": 0, "gasto": 0})
+                    status_data = character.pontos["status"]
+                    if status_data["total"] < amount:
+                        raise InvalidInputError(f"Pontos de status insuficientes. Disponíveis: {status_data['total']}, Necessários: {amount}")
+
+                    # apply points
+                    current_val = character.attributes.get(attr, 0)
+                    character.attributes[attr] = current_val + amount
+                    status_data["total"] -= amount
+                    status_data["gasto"] = status_data.get("gasto", 0) + amount
+                    # Recalculate modifiers; the write is a compare-and-set retried on concurrent updates
+                    character.calculate_modifiers()
+
+                await self.character_service.update_with_retry(character_name, apply_status)
                 await ctx.send(f"Gastos {amount} pontos de status em '{attr}' para '{character_name}'.")
 
             elif point_type.lower() == 'maestria':
@@ -179,18 +278,19 @@ class PointsCommands(commands.Cog):
                     raise InvalidInputError("Uso: !gastar maestria <nome_personagem> <quantidade> <nome_maestria>")
                 if not await self.is_character_owner(ctx, character_name):
                     return
-                character = await self.character_service.get_character(character_name)
-                character.pontos.setdefault("mastery", {"total": 0, "gasto": 0})
-                mastery_data = character.pontos["mastery"]
-                if mastery_data["total"] < amount:
-                    raise InvalidInputError(f"Pontos de maestria insuficientes. Disponíveis: {mastery_data['total']}, Necessários: {amount}")
-                mastery_data["total"] -= amount
-                mastery_data["gasto"] = mastery_data.get("gasto", 0) + amount
-                # Record the mastery in the character.masteries mapping for display
-                description_key = description
-                character.masteries = getattr(character, 'masteries', {}) or {}
-                character.masteries[description_key] = character.masteries.get(description_key, 0) + amount
-                await self.character_service.character_repository.update_character(character)
+                def apply_mastery(character):
+                    character.pontos.setdefault("mastery", {"total": 0, "gasto": 0})
+                    mastery_data = character.pontos["mastery"]
+                    if mastery_data["total"] < amount:
+                        raise InvalidInputError(f"Pontos de maestria insuficientes. Disponíveis: {mastery_data['total']}, Necessários: {amount}")
+                    mastery_data["total"] -= amount
+                    mastery_data["gasto"] = mastery_data.get("gasto", 0) + amount
+                    # Record the mastery in the character.masteries mapping for display
+                    description_key = description
+                    character.masteries = getattr(character, 'masteries', {}) or {}
+                    character.masteries[description_key] = character.masteries.get(description_key, 0) + amount
+
+                await self.character_service.update_with_retry(character_name, apply_mastery)
                 await ctx.send(f"Gastos {amount} pontos de maestria ('{description}') para '{character_name}'.")
 
             elif point_type.lower() == 'ph':
@@ -200,28 +300,16 @@ class PointsCommands(commands.Cog):
                     raise InvalidInputError("Uso: !gastar ph <nome_personagem> <quantidade> <nome_tecnica>")
                 if not await self.is_character_owner(ctx, character_name):
                     return
-                character = await self.character_service.get_character(character_name)
-                character.pontos.setdefault("ph", {"total": 0, "gasto": []})
-                ph_data = character.pontos["ph"]
-                if ph_data["total"] < amount:
-                    raise InvalidInputError(f"Pontos de PH insuficientes. Disponíveis: {ph_data['total']}, Necessários: {amount}")
-                ph_data["total"] -= amount
-                found = False
-                now = datetime.now(timezone.utc)
-                for entry in ph_data["gasto"]:
-                    # support both 'descricao' (pt) and 'description' (en) stored historically
-                    existing_desc = entry.get("descricao") or entry.get("description")
-                    if existing_desc == description:
-                        # update both common keys for compatibility
-                        entry["custo"] = entry.get("custo", entry.get("points", 0)) + amount
-                        entry["points"] = entry.get("points", 0) + amount
-                        # set or update timestamp
-                        entry["data"] = entry.get("data") or now
-                        found = True
-                        break
-                if not found:
-                    ph_data["gasto"].append({"descricao": description, "custo": amount, "data": now})
-                await self.character_service.character_repository.update_character(character)
+                def apply_ph(character):
+                    character.pontos.setdefault("ph", {"total": 0, "gasto_total": 0})
+                    ph_data = character.pontos["ph"]
+                    if ph_data["total"] < amount:
+                        raise InvalidInputError(f"Pontos de PH insuficientes. Disponíveis: {ph_data['total']}, Necessários: {amount}")
+                    ph_data["total"] -= amount
+                    ph_data["gasto_total"] = ph_data.get("gasto_total", 0) + amount
+
+                # O histórico vai para o ph_ledger; o personagem guarda só o total gasto
+                await self._apply_ph_change(character_name, description, amount, apply_ph)
                 await ctx.send(f"Gastos {amount} pontos de PH ('{description}') para '{character_name}'.")
 
             else:
@@ -254,58 +342,48 @@ class PointsCommands(commands.Cog):
             return
 
         try:
-            character = await self.character_service.get_character(character_name)
-            
-            character.pontos.setdefault("status", {"total": 0, "gasto": 0})
-            character.pontos.setdefault("mastery", {"total": 0, "gasto": 0})
-            character.pontos.setdefault("ph", {"total": 0, "gasto": []})
+            def apply_refund(character):
+                character.pontos.setdefault("status", {"total": 0, "gasto": 0})
+                character.pontos.setdefault("mastery", {"total": 0, "gasto": 0})
+                character.pontos.setdefault("ph", {"total": 0, "gasto_total": 0})
 
-            if point_type.lower() == 'status':
-                if description:
-                    raise InvalidInputError("O tipo 'status' não aceita descrição para reembolso.")
+                if point_type.lower() == 'status':
+                    if description:
+                        raise InvalidInputError("O tipo 'status' não aceita descrição para reembolso.")
                 
-                status_data = character.pontos["status"]
-                if status_data["gasto"] < amount:
-                     raise InvalidInputError(f"Não é possível reembolsar {amount} pontos de status. Gastos totais: {status_data['gasto']}")
+                    status_data = character.pontos["status"]
+                    if status_data["gasto"] < amount:
+                         raise InvalidInputError(f"Não é possível reembolsar {amount} pontos de status. Gastos totais: {status_data['gasto']}")
                 
-                status_data["total"] += amount
-                status_data["gasto"] = status_data.get("gasto", 0) - amount
+                    status_data["total"] += amount
+                    status_data["gasto"] = status_data.get("gasto", 0) - amount
 
-            elif point_type.lower() == 'maestria':
-                if not description:
-                    raise InvalidInputError("O tipo 'maestria' requer uma descrição (ex: nome da maestria) para reembolso.")
+                elif point_type.lower() == 'maestria':
+                    if not description:
+                        raise InvalidInputError("O tipo 'maestria' requer uma descrição (ex: nome da maestria) para reembolso.")
                 
-                mastery_data = character.pontos["mastery"]
-                if mastery_data["gasto"] < amount:
-                     raise InvalidInputError(f"Não é possível reembolsar {amount} pontos de maestria ('{description}'). Gastos totais: {mastery_data['gasto']}")
+                    mastery_data = character.pontos["mastery"]
+                    if mastery_data["gasto"] < amount:
+                         raise InvalidInputError(f"Não é possível reembolsar {amount} pontos de maestria ('{description}'). Gastos totais: {mastery_data['gasto']}")
 
-                mastery_data["total"] += amount
-                mastery_data["gasto"] = mastery_data.get("gasto", 0) - amount
+                    mastery_data["total"] += amount
+                    mastery_data["gasto"] = mastery_data.get("gasto", 0) - amount
 
-            elif point_type.lower() == 'ph':
+                elif point_type.lower() == 'ph':
+                    # O limite (líquido gasto com a mesma descrição) é conferido no ph_ledger
+                    ph_data = character.pontos["ph"]
+                    ph_data["total"] += amount
+                    ph_data["gasto_total"] = ph_data.get("gasto_total", 0) - amount
+
+                else:
+                    raise InvalidInputError(f"Tipo de ponto inválido: '{point_type}'. Use 'status', 'maestria' ou 'ph'.")
+
+            if point_type.lower() == 'ph':
                 if not description:
                     raise InvalidInputError("O tipo 'ph' requer uma descrição para reembolso.")
-                
-                ph_data = character.pontos["ph"]
-                ph_entry_to_refund = None
-                ph_index_to_remove = -1
-                for i, entry in enumerate(ph_data["gasto"]):
-                    if entry.get("description") == description and entry.get("points") == amount:
-                        ph_entry_to_refund = entry
-                        ph_index_to_remove = i
-                        break
-                
-                if ph_entry_to_refund is None:
-                    raise InvalidInputError(f"Registro de gasto de PH não encontrado para '{description}' com {amount} pontos.")
-                
-                ph_data["total"] += amount
-                if ph_index_to_remove != -1:
-                    del ph_data["gasto"][ph_index_to_remove]
-
+                await self._apply_ph_change(character_name, description, -amount, apply_refund)
             else:
-                raise InvalidInputError(f"Tipo de ponto inválido: '{point_type}'. Use 'status', 'maestria' ou 'ph'.")
-
-            await self.character_service.update_character(str(character.id), 'pontos', character.pontos)
+                await self.character_service.update_with_retry(character_name, apply_refund)
             await ctx.send(f"Reembolsados {amount} pontos de {point_type.lower()} para '{character_name}'.")
         except CharacterNotFoundError:
             await ctx.send("Personagem não encontrado.")
@@ -321,21 +399,5 @@ class PointsCommands(commands.Cog):
         await self.refund_points(ctx, point_type, character_name, amount, description=description)
 
 async def setup(bot: commands.Bot):
-    mongo_connection_string = os.getenv("MONGODB_CONNECTION_STRING", "mongodb://localhost:27017/")
-    mongo_database_name = os.getenv("MONGODB_DATABASE_NAME", "rpg_bot_db")
-
-    mongodb_repo = MongoDBRepository(
-        connection_string=mongo_connection_string,
-        database_name=mongo_database_name
-    )
-    await mongodb_repo.connect() # Conectar assincronamente
-    transformation_repo = TransformationRepository(mongodb_repo)
-    class_repo = ClassRepository(mongodb_repo)
-
-    character_service = CharacterService(
-        character_repository=mongodb_repo,
-        transformation_repository=transformation_repo,
-        class_repository=class_repo
-    )
-
-    await bot.add_cog(PointsCommands(bot, character_service))
\ No newline at end of file
+    container = await get_container(bot)
+    await bot.add_cog(PointsCommands(bot, container.character_service, container.ph_ledger_repository))
@@ -2,11 +2,8 @@ from discord.ext import commands
 from typing import Optional
 from src.core.services.report_service import ReportService
 from src.core.services.character_service import CharacterService
-from src.infrastructure.database.mongodb_repository import MongoDBRepository # For instantiation
 from src.infrastructure.database.player_preferences_repository import PlayerPreferencesRepository
-from src.infrastructure.database.transformation_repository import TransformationRepository
-from src.infrastructure.database.class_repository import ClassRepository
-import os
+from src.infrastructure.container import get_container
 
 class ReportCommands(commands.Cog):
     def __init__(self, bot: commands.Bot, report_service: ReportService, character_service: CharacterService, player_preferences_repository: PlayerPreferencesRepository):
@@ -68,6 +65,8 @@ class ReportCommands(commands.Cog):
             stats = await self.report_service.get_usage_statistics()
             
             class_distribution_str = "\n".join([f"- {cls}: {count}" for cls, count in stats['class_distribution'].items()]) if stats['class_distribution'] else "Nenhuma classe registrada."
+            level_histogram_str = "\n".join([f"- Nível {level}: {count}" for level, count in stats.get('level_histogram', {}).items()]) or "Nenhum personagem registrado."
+            resource_totals_str = "\n".join([f"- {resource.upper()}: {totals['atual']}/{totals['maximo']}" for resource, totals in stats.get('resource_totals', {}).items()])
 
             response_message = (
                 f"**Estatísticas de Uso do RPG Bot**\n\n"
@@ -75,31 +74,20 @@ class ReportCommands(commands.Cog):
                 f"Nível Médio dos Personagens: {stats['average_character_level']}\n\n"
                 f"**Distribuição de Classes:**\n"
                 f"{class_distribution_str}\n\n"
-                f"*(Mais estatísticas em breve!)*"
+                f"**Personagens por Nível:**\n"
+                f"{level_histogram_str}\n\n"
+                f"**Recursos Totais (atual/máximo):**\n"
+                f"{resource_totals_str}"
             )
             await context.send(response_message)
         except Exception as e:
             await context.send(f"Erro ao gerar estatísticas de uso: {e}")
 
 async def setup(bot: commands.Bot):
-    connection_string = os.getenv("MONGODB_CONNECTION_STRING", "mongodb://localhost:27017/")
-    database_name = os.getenv("MONGODB_DATABASE_NAME", "rpg_bot_db")
-
-    mongodb_repo = MongoDBRepository(
-        connection_string=connection_string,
-        database_name=database_name
-    )
-    await mongodb_repo.connect()
-
-    character_repo = mongodb_repo
-    transformation_repo = TransformationRepository(mongodb_repo)
-    class_repo = ClassRepository(mongodb_repo)
-    player_preferences_repo = PlayerPreferencesRepository(mongodb_repository=mongodb_repo)
-
-    character_service = CharacterService(
-        character_repository=character_repo,
-        transformation_repository=transformation_repo,
-        class_repository=class_repo
-    )
-    report_service = ReportService(character_repository=mongodb_repo)
-    await bot.add_cog(ReportCommands(bot, report_service, character_service, player_preferences_repo))
\ No newline at end of file
+    container = await get_container(bot)
+    await bot.add_cog(ReportCommands(
+        bot,
+        container.report_service,
+        container.character_service,
+        container.player_preferences_repository
+    ))
@@ -5,12 +5,10 @@ import os
 import asyncio
 
 from src.core.services.character_service import CharacterService
-from src.infrastructure.database.mongodb_repository import MongoDBRepository
 from src.infrastructure.database.player_preferences_repository import PlayerPreferencesRepository
-from src.infrastructure.database.transformation_repository import TransformationRepository
-from src.infrastructure.database.class_repository import ClassRepository
 from src.core.entities.player_preferences import PlayerPreferences
 from src.utils.exceptions.application_exceptions import CharacterNotFoundError, InvalidInputError
+from src.infrastructure.container import get_container
 
 class TestCommands(commands.Cog):
     def __init__(self, bot: commands.Bot, character_service: CharacterService, player_preferences_repository: PlayerPreferencesRepository):
@@ -256,23 +254,5 @@ class TestCommands(commands.Cog):
         return {"command_name": command_name, "status": status, "details": details}
 
 async def setup(bot: commands.Bot):
-    connection_string = os.getenv("MONGODB_CONNECTION_STRING", "mongodb://localhost:27017/")
-    database_name = os.getenv("MONGODB_DATABASE_NAME", "rpg_bot_db")
-
-    mongodb_repo = MongoDBRepository(
-        connection_string=connection_string,
-        database_name=database_name
-    )
-    await mongodb_repo.connect()
-
-    character_repo = mongodb_repo
-    transformation_repo = TransformationRepository(mongodb_repo)
-    class_repo = ClassRepository(mongodb_repo)
-    player_preferences_repo = PlayerPreferencesRepository(mongodb_repository=mongodb_repo)
-
-    character_service = CharacterService(
-        character_repository=character_repo,
-        transformation_repository=transformation_repo,
-        class_repository=class_repo
-    )
-    await bot.add_cog(TestCommands(bot, character_service, player_preferences_repo))
\ No newline at end of file
+    container = await get_container(bot)
+    await bot.add_cog(TestCommands(bot, container.character_service, container.player_preferences_repository))
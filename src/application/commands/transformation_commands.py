@@ -3,16 +3,13 @@
 import json
 from typing import Dict, Any
 from discord.ext import commands
-import os
 
 # --- Service Imports ---
 from src.core.services.character_service import CharacterService
 from src.core.services.transformation_service import TransformationService
+from src.infrastructure.container import get_container
 
 # --- Repository Imports ---
-from src.infrastructure.database.mongodb_repository import MongoDBRepository
-from src.infrastructure.database.transformation_repository import TransformationRepository
-from src.infrastructure.database.class_repository import ClassRepository
 
 # --- Helper Functions ---
 def create_embed(title: str, description: str, color):
@@ -114,17 +111,5 @@ class TransformationCommands(commands.Cog):
             await ctx.send(embed=create_embed("Erro", f"Ocorreu um erro ao desativar a transformação: {e}", 0xFF0000))
 
 async def setup(bot: commands.Bot):
-    mongo_connection_string = os.getenv("MONGODB_CONNECTION_STRING", "mongodb://localhost:27017/")
-    mongo_database_name = os.getenv("MONGODB_DATABASE_NAME", "rpg_bot_db")
-
-    # Repositories
-    character_repo = MongoDBRepository(mongo_connection_string, mongo_database_name)
-    await character_repo.connect() # Conectar assincronamente
-    transformation_repo = TransformationRepository(character_repo)
-    class_repo = ClassRepository(character_repo)
-
-    # Services
-    character_service = CharacterService(character_repo, transformation_repo, class_repo)
-    transformation_service = TransformationService(transformation_repo)
-
-    await bot.add_cog(TransformationCommands(bot, character_service, transformation_service))
\ No newline at end of file
+    container = await get_container(bot)
+    await bot.add_cog(TransformationCommands(bot, container.character_service, container.transformation_service))
@@ -1,19 +1,25 @@
 from typing import Dict, cast
-from src.core.calculators.dice_roller import DiceRoller
+from src.core.calculators.dice_roller import DiceFormula, DiceRoller
 from src.core.entities.class_template import ClassTemplate # Import ClassTemplate
 
 class AttributeCalculator:
+    @staticmethod
+    def class_formula(class_template: ClassTemplate, formula_field: str) -> DiceFormula:
+        """Fórmula compilada do template (ClassRegistry); compila na hora se faltar ou estiver desatualizada."""
+        notation = getattr(class_template, formula_field)
+        compiled = class_template.compiled_formulas.get(formula_field)
+        if compiled is None or compiled.notation != notation:
+            compiled = DiceRoller.compile(notation)
+        return compiled
+
     @staticmethod
     def roll_class_attributes(class_template: ClassTemplate) -> tuple[int, int, int]:
         """
         Rola HP, Chakra e FP com base nas fórmulas definidas no template da classe.
+        Templates vindos do ClassRegistry já trazem as fórmulas compiladas, sem parsing na rolagem.
         """
-        hp_formula = class_template.hp_formula
-        chakra_formula = class_template.chakra_formula
-        fp_formula = class_template.fp_formula
-
-        hp_roll, _ = DiceRoller.roll_dice(hp_formula)
-        chakra_roll, _ = DiceRoller.roll_dice(chakra_formula)
-        fp_roll, _ = DiceRoller.roll_dice(fp_formula)
+        hp_roll, _ = AttributeCalculator.class_formula(class_template, "hp_formula").roll()
+        chakra_roll, _ = AttributeCalculator.class_formula(class_template, "chakra_formula").roll()
+        fp_roll, _ = AttributeCalculator.class_formula(class_template, "fp_formula").roll()
 
         return hp_roll, chakra_roll, fp_roll
\ No newline at end of file
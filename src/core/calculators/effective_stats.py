@@ -0,0 +1,156 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, FrozenSet, Hashable, List, Mapping, Optional, Tuple
+
+from src.core.calculators.modifier_calc import ModifierCalculator
+from src.core.entities.character import Character
+from src.core.entities.transformation import Transformation
+
+
+@dataclass(frozen=True)
+class ModifierVector:
+    """Bônus de transformações já interpretados: somas (+N) e fatores multiplicativos ('N%')."""
+    additive: Mapping[str, float]
+    multiplicative: Mapping[str, float]
+
+    @staticmethod
+    def compile(attribute_modifiers: Mapping[str, Any]) -> "ModifierVector":
+        additive: Dict[str, float] = {}
+        multiplicative: Dict[str, float] = {}
+        for attr, mod in attribute_modifiers.items():
+            if isinstance(mod, (int, float)):
+                additive[attr] = additive.get(attr, 0) + mod
+            elif isinstance(mod, str) and mod.endswith('%'):
+                multiplicative[attr] = multiplicative.get(attr, 1) * (1 + float(mod[:-1]) / 100)
+        return ModifierVector(additive, multiplicative)
+
+    @staticmethod
+    def combine(vectors: List["ModifierVector"]) -> "ModifierVector":
+        """Soma os bônus aditivos e multiplica os percentuais de várias transformações."""
+        additive: Dict[str, float] = {}
+        multiplicative: Dict[str, float] = {}
+        for vector in vectors:
+            for attr, value in vector.additive.items():
+                additive[attr] = additive.get(attr, 0) + value
+            for attr, value in vector.multiplicative.items():
+                multiplicative[attr] = multiplicative.get(attr, 1) * value
+        return ModifierVector(additive, multiplicative)
+
+
+@dataclass(frozen=True)
+class _EffectiveStats:
+    attributes: Mapping[str, int]
+    maxima: Mapping[str, float]
+    modifiers: Mapping[str, int]
+    valid_until: Optional[datetime]
+
+
+class EffectiveStatsEngine:
+    """
+    Calcula os status efetivos de um personagem (atributos, máximos de recursos e modificadores)
+    a partir das transformações ativas.
+
+    Os `attribute_modifiers` de cada transformação são compilados uma vez em um ModifierVector.
+    O resultado é memorizado por (id do personagem, updated_at, conjunto de transformações ativas,
+    geração do catálogo de transformações) e a entrada expira no menor `expires_at` entre as ativas.
+    """
+
+    def __init__(self, transformation_repository, max_entries: int = 2048,
+                 clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc)):
+        self.transformation_repository = transformation_repository
+        self.max_entries = max_entries
+        self._clock = clock
+        self._memo: "OrderedDict[Hashable, _EffectiveStats]" = OrderedDict()
+        self._vectors: Dict[str, Optional[ModifierVector]] = {}
+        self._vectors_generation: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self):
+        """Descarta resultados e vetores compilados (ex.: após editar uma transformação)."""
+        self._memo.clear()
+        self._vectors.clear()
+
+    def _catalog_generation(self) -> Optional[int]:
+        return getattr(self.transformation_repository, "generation", None)
+
+    async def _vector_for(self, transformation_id: str) -> Optional[ModifierVector]:
+        if transformation_id not in self._vectors:
+            transformation: Optional[Transformation] = await self.transformation_repository.get_transformation(transformation_id)
+            self._vectors[transformation_id] = (
+                ModifierVector.compile(transformation.attribute_modifiers) if transformation else None
+            )
+        return self._vectors[transformation_id]
+
+    async def _compute(self, character: Character, active_ids: FrozenSet[str],
+                       valid_until: Optional[datetime]) -> _EffectiveStats:
+        vectors = [vector for vector in [await self._vector_for(tid) for tid in sorted(active_ids)] if vector]
+        bonuses = ModifierVector.combine(vectors)
+
+        effective_attributes: Dict[str, float] = character.attributes.copy()
+        maxima: Dict[str, float] = {}
+        for attr, value in bonuses.additive.items():
+            if attr in effective_attributes:
+                effective_attributes[attr] += value
+            elif f"max_{attr}" in character.__dict__:
+                maxima[f"max_{attr}"] = maxima.get(f"max_{attr}", getattr(character, f"max_{attr}", 0)) + value
+        for attr, value in bonuses.multiplicative.items():
+            if attr in effective_attributes:
+                effective_attributes[attr] *= value
+            elif f"max_{attr}" in character.__dict__:
+                maxima[f"max_{attr}"] = maxima.get(f"max_{attr}", getattr(character, f"max_{attr}", 0)) * value
+
+        attributes = {k: int(v) for k, v in effective_attributes.items()}
+        return _EffectiveStats(
+            attributes=attributes,
+            maxima=maxima,
+            modifiers=ModifierCalculator.calculate_all_modifiers(attributes),
+            valid_until=valid_until,
+        )
+
+    async def apply(self, character: Character) -> Character:
+        """
+        Remove as transformações expiradas e aplica os status efetivos ao próprio personagem,
+        reaproveitando o resultado memorizado quando nada relevante mudou.
+        """
+        now = self._clock()
+        character.transformacoes_ativas = [
+            t for t in character.transformacoes_ativas if t.get("expires_at") and t["expires_at"] > now
+        ]
+
+        generation = self._catalog_generation()
+        if generation != self._vectors_generation:
+            self._vectors.clear()
+            self._vectors_generation = generation
+
+        active_ids = frozenset(str(t["transformacao_id"]) for t in character.transformacoes_ativas)
+        key: Tuple[Hashable, ...] = (str(character.id), character.updated_at, active_ids, generation)
+
+        stats = self._memo.get(key)
+        if stats is not None and (stats.valid_until is None or stats.valid_until > now):
+            self.hits += 1
+            self._memo.move_to_end(key)
+        else:
+            self.misses += 1
+            valid_until = min((t["expires_at"] for t in character.transformacoes_ativas), default=None)
+            stats = await self._compute(character, active_ids, valid_until)
+            self._memo[key] = stats
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.max_entries:
+                self._memo.popitem(last=False)
+
+        character.attributes = dict(stats.attributes)
+        for field_name, value in stats.maxima.items():
+            setattr(character, field_name, value)
+        character.modifiers = dict(stats.modifiers)
+        return character
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._memo),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
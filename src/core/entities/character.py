@@ -1,9 +1,37 @@
+import copy
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timezone
 from bson.objectid import ObjectId
 from src.core.entities.class_template import ClassTemplate # Importar ClassTemplate
 
+# Subdocumentos comparados campo a campo ao gerar updates parciais; os demais campos
+# (listas como inventory e pontos.ph.gasto) são regravados inteiros quando mudam.
+_NESTED_DIFF_PATHS = {"attributes", "modifiers", "pontos", "pontos.ph", "pontos.status", "pontos.mastery"}
+# Campos que nunca entram no $set: o _id é imutável; updated_at e version são definidos pelo repositório.
+_DIFF_IGNORED_FIELDS = {"_id", "updated_at", "version"}
+
+
+def _diff_documents(old: Dict[str, Any], new: Dict[str, Any], prefix: str,
+                    set_fields: Dict[str, Any], unset_fields: Dict[str, str]):
+    for key, value in new.items():
+        path = f"{prefix}{key}"
+        if not prefix and key in _DIFF_IGNORED_FIELDS:
+            continue
+        if key not in old:
+            set_fields[path] = value
+            continue
+        old_value = old[key]
+        if (path in _NESTED_DIFF_PATHS and isinstance(value, dict) and isinstance(old_value, dict)
+                and all("." not in k and not k.startswith("$") for k in value)):
+            _diff_documents(old_value, value, f"{path}.", set_fields, unset_fields)
+        elif old_value != value:
+            set_fields[path] = value
+    for key in old:
+        if key not in new and not (not prefix and key in _DIFF_IGNORED_FIELDS):
+            unset_fields[f"{prefix}{key}"] = ""
+
+
 @dataclass
 class Character:
     name: str
@@ -31,8 +59,10 @@ class Character:
     fp: int = 0
     max_fp: int = 0
     masteries: Dict[str, int] = field(default_factory=dict)
+    # pontos.ph.gasto_total é o total líquido gasto; o histórico fica na coleção ph_ledger.
+    # pontos.ph.gasto só existe em documentos ainda não migrados (scripts/migration/migrate_ph_ledger.py).
     pontos: Dict[str, Dict] = field(default_factory=lambda: {
-        "ph": {"total": 0, "gasto": []},
+        "ph": {"total": 0, "gasto_total": 0},
         "status": {"total": 0},
         "mastery": {"total": 0}
     })
@@ -44,6 +74,26 @@ class Character:
     transformacoes_ativas: List[Dict] = field(default_factory=list)
     created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    # Versão do documento no banco; incrementada a cada gravação e usada como compare-and-set.
+    version: int = 0
+    # Estado serializado da última leitura/gravação; usado para gerar updates parciais.
+    _loaded_state: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+
+    def mark_clean(self):
+        """Registra o estado atual como o persistido no banco."""
+        self._loaded_state = copy.deepcopy(self.to_dict())
+
+    def get_changes(self) -> Optional[Tuple[Dict[str, Any], Dict[str, str]]]:
+        """
+        Retorna (campos para $set, campos para $unset) desde o último mark_clean().
+        Retorna None quando o personagem não foi carregado do banco (sem estado de referência).
+        """
+        if self._loaded_state is None:
+            return None
+        set_fields: Dict[str, Any] = {}
+        unset_fields: Dict[str, str] = {}
+        _diff_documents(self._loaded_state, self.to_dict(), "", set_fields, unset_fields)
+        return set_fields, unset_fields
 
     def calculate_modifiers(self):
         from src.core.calculators.modifier_calc import ModifierCalculator
@@ -86,6 +136,17 @@ class Character:
             self.fp = min(self.max_fp, self.fp + value)
         self.updated_at = datetime.now(timezone.utc)
 
+    def _ph_points_to_dict(self) -> Dict[str, Any]:
+        ph = self.pontos.get("ph", {})
+        ph_dict: Dict[str, Any] = {"total": ph.get("total", 0), "gasto_total": ph.get("gasto_total", 0)}
+        # Array legado: mantido apenas até a migração para o ph_ledger
+        if ph.get("gasto"):
+            ph_dict["gasto"] = [
+                {"descricao": item.get("descricao"), "custo": item.get("custo"), "data": item.get("data").isoformat() if isinstance(item.get("data"), datetime) else item.get("data")}
+                for item in ph["gasto"]
+            ]
+        return ph_dict
+
     def to_dict(self):
         """
         Converts the character object to a dictionary compatible with MongoDB (BSON).
@@ -110,13 +171,7 @@ class Character:
             "max_fp": self.max_fp,
             "masteries": self.masteries,
             "pontos": {
-                "ph": {
-                    "total": self.pontos.get("ph", {}).get("total", 0),
-                    "gasto": [
-                        {"descricao": item.get("descricao"), "custo": item.get("custo"), "data": item.get("data").isoformat() if isinstance(item.get("data"), datetime) else item.get("data")}
-                        for item in self.pontos.get("ph", {}).get("gasto", [])
-                    ]
-                },
+                "ph": self._ph_points_to_dict(),
                 "status": {"total": self.pontos.get("status", {}).get("total", 0)},
                 "mastery": {"total": self.pontos.get("mastery", {}).get("total", 0)}
             },
@@ -136,6 +191,7 @@ class Character:
             ],
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
+            "version": self.version,
         }
 
     @staticmethod
@@ -195,7 +251,8 @@ class Character:
             pontos={
                 "ph": {
                     "total": data.get("pontos", {}).get("ph", {}).get("total", 0),
-                    "gasto": pontos_ph_gasto
+                    "gasto_total": data.get("pontos", {}).get("ph", {}).get("gasto_total", 0),
+                    **({"gasto": pontos_ph_gasto} if pontos_ph_gasto else {}),
                 },
                 "status": {"total": data.get("pontos", {}).get("status", {}).get("total", 0)},
                 "mastery": {"total": data.get("pontos", {}).get("mastery", {}).get("total", 0)}
@@ -219,5 +276,7 @@ class Character:
             ],
             created_at=_parse_datetime(data.get("created_at")) or datetime.now(timezone.utc),
             updated_at=_parse_datetime(data.get("updated_at")) or datetime.now(timezone.utc),
+            version=data.get("version") or 0,
         )
+        character.mark_clean()
         return character
@@ -0,0 +1,86 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+from bson.objectid import ObjectId
+
+# Projeções nomeadas: cada visão busca apenas os campos que os comandos correspondentes leem.
+CHARACTER_VIEWS: Dict[str, Dict[str, int]] = {
+    # Listagens e relatórios
+    "summary": {"name": 1, "alias": 1, "player_discord_id": 1, "level": 1, "classe_ids": 1},
+    # Montagem da iniciativa e sessões de combate
+    "combat": {
+        "name": 1, "player_discord_id": 1, "modifiers": 1,
+        "hp": 1, "max_hp": 1, "chakra": 1, "max_chakra": 1, "fp": 1, "max_fp": 1,
+    },
+    # !rodar: transformações ativas são necessárias para saber se os atributos base bastam
+    "roll": {"name": 1, "player_discord_id": 1, "attributes": 1, "modifiers": 1, "transformacoes_ativas": 1},
+}
+
+
+def get_view_projection(view: str) -> Dict[str, int]:
+    try:
+        return CHARACTER_VIEWS[view]
+    except KeyError:
+        raise ValueError(f"Visão de personagem desconhecida: '{view}'. Use uma de: {', '.join(CHARACTER_VIEWS)}")
+
+
+@dataclass(frozen=True)
+class CharacterView:
+    """
+    Representação parcial e somente leitura de um personagem, montada a partir de uma projeção.
+    Campos fora da visão ficam com o valor padrão; use `Character` quando precisar alterar e salvar.
+    """
+    id: ObjectId
+    view: str
+    name: str = ""
+    alias: Optional[str] = None
+    player_discord_id: Optional[str] = None
+    level: int = 1
+    classe_ids: Tuple[ObjectId, ...] = ()
+    attributes: Mapping[str, int] = field(default_factory=lambda: MappingProxyType({}))
+    modifiers: Mapping[str, int] = field(default_factory=lambda: MappingProxyType({}))
+    hp: int = 0
+    max_hp: int = 0
+    chakra: int = 0
+    max_chakra: int = 0
+    fp: int = 0
+    max_fp: int = 0
+    active_transformation_expirations: Tuple[Optional[datetime], ...] = ()
+
+    def has_active_transformations(self, now: Optional[datetime] = None) -> bool:
+        now = now or datetime.now(timezone.utc)
+        return any(expires_at is not None and expires_at > now for expires_at in self.active_transformation_expirations)
+
+    @staticmethod
+    def from_document(data: Dict[str, Any], view: str) -> "CharacterView":
+        def _parse_datetime(value):
+            if isinstance(value, str):
+                try:
+                    value = datetime.fromisoformat(value)
+                except ValueError:
+                    return None
+            if isinstance(value, datetime) and value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            return value if isinstance(value, datetime) else None
+
+        return CharacterView(
+            id=ObjectId(data["_id"]),
+            view=view,
+            name=data.get("name", ""),
+            alias=data.get("alias"),
+            player_discord_id=data.get("player_discord_id"),
+            level=data.get("level", 1),
+            classe_ids=tuple(data.get("classe_ids", [])),
+            attributes=MappingProxyType(dict(data.get("attributes", {}))),
+            modifiers=MappingProxyType(dict(data.get("modifiers", {}))),
+            hp=data.get("hp", 0),
+            max_hp=data.get("max_hp", 0),
+            chakra=data.get("chakra", 0),
+            max_chakra=data.get("max_chakra", 0),
+            fp=data.get("fp", 0),
+            max_fp=data.get("max_fp", 0),
+            active_transformation_expirations=tuple(
+                _parse_datetime(t.get("expires_at")) for t in data.get("transformacoes_ativas", [])
+            ),
+        )
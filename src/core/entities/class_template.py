@@ -2,6 +2,10 @@ from dataclasses import dataclass, field
 from typing import Dict, List, Any
 from bson.objectid import ObjectId
 
+from src.core.calculators.dice_roller import DiceFormula
+
+FORMULA_FIELDS = ("hp_formula", "chakra_formula", "fp_formula")
+
 @dataclass
 class ClassTemplate:
     name: str
@@ -22,6 +26,8 @@ class ClassTemplate:
         "mastery_points": 2,
         "ph_points": 1
     })
+    # Fórmulas já compiladas por campo (preenchidas pelo ClassRegistry na carga); não são persistidas
+    compiled_formulas: Dict[str, DiceFormula] = field(default_factory=dict, compare=False, repr=False)
 
     def to_dict(self):
         return {
@@ -1,8 +1,17 @@
+import json
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from src.utils.helpers.datetime_utils import safe_parse_datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+
+# Campos da sessão guardados no hash `combat_session:<id>:meta` (valores em JSON).
+# A ordem de iniciativa fica em "turn_order" como lista de chaves de entradas; cada entrada
+# é um campo próprio do hash `combat_session:<id>:entries`.
+REDIS_META_FIELDS = (
+    "id", "character_id", "guild_id", "channel_id", "player_id", "start_time", "last_activity",
+    "expires_at", "temporary_attributes", "is_active", "current_turn_index", "turn_number", "started_at",
+)
 
 @dataclass
 class CombatSession:
@@ -69,6 +78,8 @@ class CombatSession:
     # --- Combat flow helpers ---
     def add_initiative_entry(self, name: str, initiative: int, owner_id: Optional[str] = None, entry_id: Optional[str] = None, hp: Optional[int] = None, max_hp: Optional[int] = None, chakra: Optional[int] = None, fp: Optional[int] = None, is_npc: bool = False):
         entry = {
+            # Identifica a entrada no hash de entradas do Redis (nomes de NPC podem se repetir)
+            "key": uuid.uuid4().hex[:12],
             "type": "npc" if is_npc else "player",
             "name": name,
             "id": entry_id,
@@ -122,6 +133,27 @@ class CombatSession:
         )
         return cs
 
+    def to_redis_hash(self) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """
+        Serializa a sessão em dois hashes do Redis: (meta, entradas). Entradas sem chave
+        (sessões antigas) recebem uma, para poderem ser atualizadas individualmente.
+        """
+        for entry in self.turn_order:
+            if not entry.get("key"):
+                entry["key"] = uuid.uuid4().hex[:12]
+        data = self.to_dict()
+        meta = {name: json.dumps(data[name]) for name in REDIS_META_FIELDS}
+        meta["turn_order"] = json.dumps([entry["key"] for entry in self.turn_order])
+        entries = {entry["key"]: json.dumps(entry) for entry in self.turn_order}
+        return meta, entries
+
+    @staticmethod
+    def from_redis_hash(meta: Dict[str, str], entries: Dict[str, str]) -> "CombatSession":
+        data = {name: json.loads(value) for name, value in meta.items()}
+        keys = data.pop("turn_order", None) or []
+        data["turn_order"] = [json.loads(entries[key]) for key in keys if key in entries]
+        return CombatSession.from_dict(data)
+
     def start_battle(self) -> Optional[Dict[str, Any]]:
         if not self.turn_order:
             raise ValueError("Cannot start battle with empty turn order")
@@ -147,6 +179,9 @@ class CombatSession:
         self.current_turn_index = (self.current_turn_index + 1) % len(self.turn_order)
         return self.get_current_turn_entry()
 
+    def advance_turn(self) -> Optional[Dict[str, Any]]:
+        return self.next_turn_entry()
+
     def _find_target(self, target_id: Optional[str], target_name: Optional[str]) -> Optional[Dict[str, Any]]:
         """Finds a target by ID first, then by name."""
         if target_id:
@@ -1,26 +1,34 @@
-from typing import Dict, Any, List, Optional
+import inspect
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 from datetime import datetime, timezone, timedelta
 import random
 
 from src.core.entities.character import Character
+from src.core.entities.character_view import CharacterView
 from src.core.entities.transformation import Transformation
 from src.core.entities.class_template import ClassTemplate
 from src.infrastructure.database.mongodb_repository import MongoDBRepository
 from src.infrastructure.database.transformation_repository import TransformationRepository
 from src.infrastructure.database.class_repository import ClassRepository
-from src.core.calculators.dice_roller import DiceRoller
+from src.infrastructure.database.ph_ledger_repository import PHLedgerRepository
+from src.core.calculators.attribute_calc import AttributeCalculator
+from src.core.calculators.effective_stats import EffectiveStatsEngine
 from src.utils.helpers.character_parser import parse_character_sheet
 from src.utils.exceptions.application_exceptions import CharacterNotFoundError, InvalidInputError
+from src.utils.exceptions.infrastructure_exceptions import ConcurrentUpdateError
 from bson.errors import InvalidId
 from bson import ObjectId
 
 class CharacterService:
     def __init__(self, character_repository: MongoDBRepository, 
                  transformation_repository: TransformationRepository,
-                 class_repository: ClassRepository):
+                 class_repository: ClassRepository, ph_ledger_repository: Optional[PHLedgerRepository] = None):
         self.character_repository = character_repository
         self.transformation_repository = transformation_repository
         self.class_repository = class_repository
+        # Lançamentos de PH são removidos junto com o personagem
+        self.ph_ledger_repository = ph_ledger_repository
+        self.effective_stats = EffectiveStatsEngine(transformation_repository)
 
     def _roll_initial_attributes(self) -> Dict[str, int]:
         # Simple attribute roll logic for now, can be expanded
@@ -40,9 +48,7 @@ class CharacterService:
 
         attributes = self._roll_initial_attributes()
         
-        hp_roll, _ = DiceRoller.roll_dice(class_template.hp_formula)
-        chakra_roll, _ = DiceRoller.roll_dice(class_template.chakra_formula)
-        fp_roll, _ = DiceRoller.roll_dice(class_template.fp_formula)
+        hp_roll, chakra_roll, fp_roll = AttributeCalculator.roll_class_attributes(class_template)
 
         character = Character(
             name=name,
@@ -57,7 +63,7 @@ class CharacterService:
             fp=fp_roll,
             classe_ids=[class_template.id],
             pontos={
-                "ph": {"total": 0, "gasto": []},
+                "ph": {"total": 0, "gasto_total": 0},
                 "status": {"total": 0},
                 "mastery": {"total": 0}
             }
@@ -72,7 +78,7 @@ class CharacterService:
         
         class_info = char_data.get("classes", [{}])[0]
         class_name = class_info.get("name")
-        class_template = await self.class_repository.get_class(class_name)
+        class_template = await self.class_repository.get_class_by_name(class_name)
         if not class_template:
             raise InvalidInputError(f"Class '{class_name}' not found.")
 
@@ -90,7 +96,7 @@ class CharacterService:
             max_fp=char_data.get("fortitude_max", 1),
             classe_ids=[class_template.id],
             pontos={
-                "ph": {"total": 0, "gasto": []},
+                "ph": {"total": 0, "gasto_total": 0},
                 "status": {"total": 0},
                 "mastery": {"total": 0}
             }
@@ -101,102 +107,95 @@ class CharacterService:
         return character
 
     async def add_multiclass(self, character_id: str, new_class_name: str) -> Character:
-        character = await self.get_character(character_id)
-        
-        
-        new_class_template = await self.class_repository.get_class(new_class_name)
+        new_class_template = await self.class_repository.get_class_by_name(new_class_name)
         if not new_class_template:
             raise InvalidInputError(f"Class '{new_class_name}' not found.")
-        if new_class_template.id in character.classe_ids:
-            raise InvalidInputError("Character already has this class.")
 
-        character.classe_ids.append(new_class_template.id)
+        def apply(character: Character):
+            if new_class_template.id in character.classe_ids:
+                raise InvalidInputError("Character already has this class.")
 
-        hp_roll, _ = DiceRoller.roll_dice(new_class_template.hp_formula)
-        chakra_roll, _ = DiceRoller.roll_dice(new_class_template.chakra_formula)
-        fp_roll, _ = DiceRoller.roll_dice(new_class_template.fp_formula)
+            character.classe_ids.append(new_class_template.id)
 
-        character.max_hp += hp_roll
-        character.max_chakra += chakra_roll
-        character.max_fp += fp_roll
-        
-        await self.character_repository.update_character(character)
-        return character
+            hp_roll, chakra_roll, fp_roll = AttributeCalculator.roll_class_attributes(new_class_template)
+
+            character.max_hp += hp_roll
+            character.max_chakra += chakra_roll
+            character.max_fp += fp_roll
+
+        return await self.update_with_retry(character_id, apply)
+
+    async def update_with_retry(self, identifier: str,
+                                mutator: Callable[[Character], Optional[Awaitable[None]]],
+                                max_attempts: int = 3) -> Character:
+        """
+        Lê o personagem do banco, aplica `mutator` (síncrono ou assíncrono) e grava com compare-and-set
+        na versão lida. Se outra operação gravou o personagem nesse intervalo, recarrega e reaplica o
+        `mutator`, até `max_attempts` tentativas; depois disso propaga ConcurrentUpdateError.
+        O `mutator` pode levantar exceções (ex.: InvalidInputError) para abortar sem gravar.
+        """
+        for attempt in range(1, max_attempts + 1):
+            character = await self.character_repository.get_character_by_id_or_name(identifier)
+            if not character:
+                raise CharacterNotFoundError(f"Personagem com identificador '{identifier}' não encontrado.")
+            # Nas próximas tentativas busca pelo id, mesmo que o nome tenha mudado
+            identifier = str(character.id)
+
+            result = mutator(character)
+            if inspect.isawaitable(result):
+                await result
+            try:
+                await self.character_repository.update_character(character)
+                return character
+            except ConcurrentUpdateError:
+                if attempt == max_attempts:
+                    raise
 
     async def get_character(self, identifier: str) -> Character:
         character = await self.character_repository.get_character_by_id_or_name(identifier)
         if not character:
             raise CharacterNotFoundError(f"Personagem com identificador '{identifier}' não encontrado.")
 
-        # Apply transformations
-        now = datetime.now(timezone.utc)
-
-        character.transformacoes_ativas = [
-            t for t in character.transformacoes_ativas if t.get("expires_at") and t["expires_at"] > now
-        ]
-
-        effective_attributes = character.attributes.copy()
-        add_bonuses = {}
-        mult_bonuses = {}
-
-        for active_trans in character.transformacoes_ativas:
-            trans_id = active_trans["transformacao_id"]
-            transformation = await self.transformation_repository.get_transformation(str(trans_id))
-            if not transformation:
-                continue
-
-            for attr, mod in transformation.attribute_modifiers.items():
-                if isinstance(mod, (int, float)):
-                    add_bonuses[attr] = add_bonuses.get(attr, 0) + mod
-                elif isinstance(mod, str) and mod.endswith('%'):
-                    mult_bonuses[attr] = mult_bonuses.get(attr, 1) * (1 + float(mod[:-1]) / 100)
-
-        for attr, value in add_bonuses.items():
-            if attr in effective_attributes:
-                effective_attributes[attr] += value
-            elif f"max_{attr}" in character.__dict__:
-                setattr(character, f"max_{attr}", getattr(character, f"max_{attr}", 0) + value)
-
-        for attr, value in mult_bonuses.items():
-            if attr in effective_attributes:
-                effective_attributes[attr] *= value
-            elif f"max_{attr}" in character.__dict__:
-                setattr(character, f"max_{attr}", getattr(character, f"max_{attr}", 0) * value)
-        
-        effective_character = character
-        effective_character.attributes = {k: int(v) for k, v in effective_attributes.items()}
-        effective_character.calculate_modifiers()
-        
-        return effective_character
+        return await self.effective_stats.apply(character)
 
     async def update_character(self, character_id: str, field_name: str, value: Any) -> Character:
-        character = await self.get_character(character_id)
-        
-        if hasattr(character, field_name):
-            setattr(character, field_name, value)
-        else:
-            raise InvalidInputError(f"Campo '{field_name}' não pode ser atualizado diretamente.")
+        def apply(character: Character):
+            if hasattr(character, field_name):
+                setattr(character, field_name, value)
+            else:
+                raise InvalidInputError(f"Campo '{field_name}' não pode ser atualizado diretamente.")
 
-        # Recalculate modifiers to ensure persisted document has up-to-date modifiers
-        try:
-            character.calculate_modifiers()
-        except Exception:
-            print(f"Aviso: falha ao recalcular modificadores para personagem {character_id}.")
+            # Recalculate modifiers to ensure persisted document has up-to-date modifiers
+            try:
+                character.calculate_modifiers()
+            except Exception:
+                print(f"Aviso: falha ao recalcular modificadores para personagem {character_id}.")
 
-        await self.character_repository.update_character(character)
-        return character
+        return await self.update_with_retry(character_id, apply)
 
     async def delete_all_characters(self) -> int:
-        return await self.character_repository.delete_all_characters()
+        deleted = await self.character_repository.delete_all_characters()
+        if self.ph_ledger_repository is not None:
+            await self.ph_ledger_repository.delete_all_entries()
+        return deleted
 
     async def delete_character(self, character_id: str) -> bool:
-        return await self.character_repository.delete_character(character_id)
-        character = await self.get_character(character_id)
-        return await self.character_repository.delete_character(str(character.id))
+        deleted = await self.character_repository.delete_character(character_id)
+        if deleted and self.ph_ledger_repository is not None:
+            await self.ph_ledger_repository.delete_character_entries(character_id)
+        return deleted
 
     async def get_all_characters(self) -> List[Character]:
         return await self.character_repository.get_all_characters()
 
+    async def list_characters_by_player(self, player_id: str, after: Optional[Tuple[str, ObjectId]] = None,
+                                        limit: int = 10) -> Tuple[List[CharacterView], Optional[Tuple[str, ObjectId]]]:
+        """
+        Uma página dos personagens do jogador em ordem alfabética.
+        Retorna (personagens, cursor da próxima página ou None).
+        """
+        return await self.character_repository.list_characters_by_player(str(player_id), after=after, limit=limit)
+
     async def get_character_with_effective_stats(self, identifier: str) -> Optional[Character]:
         """
         Busca um personagem por ID, nome ou alias e calcula seus status efetivos.
@@ -218,45 +217,19 @@ class CharacterService:
         if not character:
             return None # Retorna None se não encontrar de nenhuma forma
 
-        now = datetime.now(timezone.utc)
-
-        character.transformacoes_ativas = [
-            t for t in character.transformacoes_ativas if t.get("expires_at") and t["expires_at"] > now
-        ]
-
-        effective_attributes = character.attributes.copy()
-        add_bonuses = {}
-        mult_bonuses = {}
-
-        for active_trans in character.transformacoes_ativas:
-            trans_id = active_trans["transformacao_id"]
-            transformation = await self.transformation_repository.get_transformation(str(trans_id))
-            if not transformation:
-                continue
-
-            for attr, mod in transformation.attribute_modifiers.items():
-                if isinstance(mod, (int, float)):
-                    add_bonuses[attr] = add_bonuses.get(attr, 0) + mod
-                elif isinstance(mod, str) and mod.endswith('%'):
-                    mult_bonuses[attr] = mult_bonuses.get(attr, 1) * (1 + float(mod[:-1]) / 100)
-
-        for attr, value in add_bonuses.items():
-            if attr in effective_attributes:
-                effective_attributes[attr] += value
-            elif f"max_{attr}" in character.__dict__:
-                setattr(character, f"max_{attr}", getattr(character, f"max_{attr}", 0) + value)
-
-        for attr, value in mult_bonuses.items():
-            if attr in effective_attributes:
-                effective_attributes[attr] *= value
-            elif f"max_{attr}" in character.__dict__:
-                setattr(character, f"max_{attr}", getattr(character, f"max_{attr}", 0) * value)
-        
-        effective_character = character
-        effective_character.attributes = {k: int(v) for k, v in effective_attributes.items()}
-        effective_character.calculate_modifiers()
-        
-        return effective_character
+        return await self.effective_stats.apply(character)
+
+    async def get_roll_stats(self, identifier: str) -> Optional[Union[CharacterView, Character]]:
+        """
+        Retorna nome, atributos e modificadores para rolagens usando a visão "roll".
+        Só carrega a ficha completa (com status efetivos) quando há transformações ativas.
+        """
+        view = await self.character_repository.get_character_view(identifier, "roll")
+        if not view:
+            return None
+        if view.has_active_transformations():
+            return await self.get_character_with_effective_stats(str(view.id))
+        return view
 
     async def edit_transformation(self, transformation_id: str, updates: Dict[str, Any]) -> Transformation:
         transformation = await self.transformation_repository.get_transformation(transformation_id)
@@ -268,38 +241,37 @@ class CharacterService:
                 setattr(transformation, key, value)
 
         await self.transformation_repository.update_transformation(transformation)
+        self.effective_stats.invalidate()
         return transformation
 
     async def activate_transformation(self, character_id: str, transformation_id: str, duration_seconds: int) -> Character:
-        character = await self.get_character(character_id)
         transformation = await self.transformation_repository.get_transformation(transformation_id)
         if not transformation:
             raise InvalidInputError("Transformation not found")
 
-        expires_at = datetime.now(timezone.utc) + timedelta(seconds=duration_seconds)
-        
-        active_transformation = {
-            "transformacao_id": transformation.id,
-            "expires_at": expires_at,
-            "nome": transformation.name
-        }
+        def apply(character: Character):
+            now = datetime.now(timezone.utc)
+            character.transformacoes_ativas = [
+                t for t in character.transformacoes_ativas if t.get("expires_at") and t["expires_at"] > now
+            ]
+            character.transformacoes_ativas.append({
+                "transformacao_id": transformation.id,
+                "expires_at": now + timedelta(seconds=duration_seconds),
+                "nome": transformation.name
+            })
 
-        character.transformacoes_ativas.append(active_transformation)
-        await self.character_repository.update_character(character)
-        return character
+        return await self.update_with_retry(character_id, apply)
 
     # This was a duplicated method. Removing it.
 
     async def deactivate_transformation(self, character_id: str, transformation_id: str) -> Character:
-        character = await self.get_character(character_id)
-        
-        initial_len = len(character.transformacoes_ativas)
-        character.transformacoes_ativas = [
-            t for t in character.transformacoes_ativas if str(t["transformacao_id"]) != transformation_id
-        ]
+        def apply(character: Character):
+            initial_len = len(character.transformacoes_ativas)
+            character.transformacoes_ativas = [
+                t for t in character.transformacoes_ativas if str(t["transformacao_id"]) != transformation_id
+            ]
 
-        if len(character.transformacoes_ativas) == initial_len:
-            raise InvalidInputError("Active transformation not found on character")
+            if len(character.transformacoes_ativas) == initial_len:
+                raise InvalidInputError("Active transformation not found on character")
 
-        await self.character_repository.update_character(character)
-        return character
\ No newline at end of file
+        return await self.update_with_retry(character_id, apply)
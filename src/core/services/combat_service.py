@@ -1,5 +1,6 @@
 import logging
 from typing import Any, Optional, List, Dict, Tuple
+from bson.objectid import ObjectId
 from src.core.entities.character import Character
 from src.core.entities.combat_session import CombatSession
 from src.core.calculators.dice_roller import DiceRoller
@@ -44,15 +45,16 @@ class CombatService:
             raise CombatSessionNotFoundError(f"Nenhuma sessão de combate ativa encontrada para o ID '{session_id}'.")
 
         if persist_changes:
+            # Um único bulk_write com os recursos finais de todos os jogadores.
+            # As entradas guardam o id do personagem em 'id' (add_player_entry).
+            resources = {}
             for entry in session.turn_order:
-                if entry['type'] == 'player':
-                    character_id = entry['character_id']
-                    character = await self.character_repository.get_character(character_id)
-                    if character:
-                        character.hp = entry['hp']
-                        character.chakra = entry['chakra']
-                        character.fp = entry['fp']
-                        await self.character_repository.update_character(character)
+                character_id = entry.get('id') or entry.get('character_id')
+                if entry['type'] == 'player' and character_id:
+                    resources[character_id] = {
+                        resource: entry[resource] for resource in ("hp", "chakra", "fp") if entry.get(resource) is not None
+                    }
+            await self.character_repository.bulk_update_resources(resources)
         
         await self.session_repository.delete_combat_session(session.id)
         return True
@@ -67,14 +69,19 @@ class CombatService:
                 self.logger.warning(f"CombatSessionNotFoundError em add_characters_to_initiative: Nenhuma sessão de combate ativa encontrada para o ID '{session_id}'.")
                 raise CombatSessionNotFoundError(f"Nenhuma sessão de combate ativa encontrada para o ID '{session_id}'.")
 
+            # Busca todos os personagens jogadores de uma vez (uma única consulta $in)
+            player_ids = [entry.character_id for entry in entries if not entry.is_npc]
+            self.logger.debug(f"Chamando character_repository.get_characters_by_ids para {len(player_ids)} personagens.")
+            characters = await self.character_repository.get_characters_by_ids(player_ids, view="combat") if player_ids else {}
+            missing_ids = [character_id for character_id in player_ids if str(character_id) not in characters]
+            if missing_ids:
+                self.logger.warning(f"CharacterNotFoundError em add_characters_to_initiative: Personagens com ID {missing_ids} não encontrados.")
+                raise CharacterNotFoundError(f"Personagem(ns) com ID {', '.join(map(str, missing_ids))} não encontrado(s).")
+
             for entry in entries:
                 self.logger.debug(f"Processando entrada: {entry.character_name} (NPC: {entry.is_npc})")
                 if not entry.is_npc:
-                    self.logger.debug(f"Chamando character_repository.get_character para character_id: {entry.character_id}")
-                    character = await self.character_repository.get_character(entry.character_id)
-                    if not character:
-                        self.logger.warning(f"CharacterNotFoundError em add_characters_to_initiative: Personagem com ID '{entry.character_id}' não encontrado.")
-                        raise CharacterNotFoundError(f"Personagem com ID '{entry.character_id}' não encontrado.")
+                    character = characters[str(entry.character_id)]
                     
                     initiative_roll = DiceRoller.roll_dice("1d20")[0] + entry.modifier
                     self.logger.debug(f"Iniciativa rolada para {character.name}: {initiative_roll} (Modificador: {entry.modifier})")
@@ -114,7 +121,15 @@ class CombatService:
             raise CombatSessionNotFoundError(f"Nenhuma sessão de combate ativa encontrada para o ID '{session_id}'.")
         
         session.start_battle()
-        await self.session_repository.update_combat_session(session)
+        updated = await self.session_repository.update_session_fields(
+            session.id,
+            current_turn_index=session.current_turn_index,
+            turn_number=session.turn_number,
+            started_at=session.started_at.isoformat(),
+            is_active=session.is_active,
+        )
+        if not updated:
+            raise CombatSessionNotFoundError(f"Nenhuma sessão de combate ativa encontrada para o ID '{session_id}'.")
         
         current_entry = session.get_current_turn_entry()
         return {
@@ -124,19 +139,19 @@ class CombatService:
         }
 
     async def next_turn(self, session_id: str) -> Dict[str, Any]:
-        """Avança para o próximo turno na ordem de iniciativa."""
-        session = await self.session_repository.get_combat_session(session_id)
-        if not session:
+        """Avança para o próximo turno na ordem de iniciativa (atomicamente, no Redis)."""
+        try:
+            turn = await self.session_repository.advance_turn(session_id)
+        except ValueError as e:
+            raise CombatError(f"Erro ao avançar o turno: {e}")
+        if turn is None:
             raise CombatSessionNotFoundError(f"Nenhuma sessão de combate ativa encontrada para o ID '{session_id}'.")
-        
-        session.advance_turn()
-        await self.session_repository.update_combat_session(session)
-        
-        current_entry = session.get_current_turn_entry()
+
+        current_entry = turn["entry"] or {}
         return {
-            "current_character_name": current_entry['name'],
+            "current_character_name": current_entry.get('name'),
             "current_character_id": current_entry.get('character_id'),
-            "turn_number": session.turn_number
+            "turn_number": turn["turn_number"]
         }
 
     def _verify_ownership(self, player_id: str, target_character_id: Optional[str], target_name: str, session: CombatSession):
@@ -150,26 +165,25 @@ class CombatService:
             # Se o target_character_id é None, significa que o alvo é um NPC ou o nome foi usado para identificar.
             pass # A verificação de NPC ou alvo por nome será feita em apply_damage_to_target
 
-    async def apply_damage(self, session_id: str, target_character_id: Optional[str], target_name: Optional[str], damage_amount: int, attribute_type: str, player_id: str) -> CombatSession:
-        """Aplica dano a um alvo na ordem de iniciativa."""
-        session = await self.session_repository.get_combat_session(session_id)
-        if not session:
-            raise CombatSessionNotFoundError(f"Nenhuma sessão de combate ativa encontrada para o ID '{session_id}'.")
-
+    async def apply_damage(self, session_id: str, target_character_id: Optional[str], target_name: Optional[str], damage_amount: int, attribute_type: str, player_id: str) -> Dict[str, Any]:
+        """
+        Aplica dano a um alvo na ordem de iniciativa. A leitura, o cálculo e a gravação acontecem em um
+        script no Redis, então danos simultâneos no mesmo canal não se sobrescrevem. Retorna a entrada atualizada.
+        """
         # A verificação de propriedade deve ser mais robusta, considerando NPCs e personagens favoritos.
-        # Por enquanto, vamos focar em passar os parâmetros corretos para a sessão.
         # self._verify_ownership(player_id, target_character_id, target_name, session)
-        
         try:
-            # Passa target_id e target_name para o método da sessão
-            session.apply_damage_to_target(amount=damage_amount, target_id=target_character_id, target_name=target_name)
+            entry = await self.session_repository.apply_hp_change(
+                session_id, "damage", damage_amount, target_id=target_character_id, target_name=target_name
+            )
         except KeyError as e:
             raise CombatError(f"Erro ao aplicar dano: {e}")
         except ValueError as e:
             raise CombatError(f"Erro de validação ao aplicar dano: {e}")
 
-        await self.session_repository.update_combat_session(session)
-        return session
+        if entry is None:
+            raise CombatSessionNotFoundError(f"Nenhuma sessão de combate ativa encontrada para o ID '{session_id}'.")
+        return entry
 
     async def get_initiative_order(self, session_id: str) -> List[Dict[str, Any]]:
         """Retorna a ordem de iniciativa da sessão de combate."""
@@ -186,6 +200,23 @@ class CombatService:
         """Retorna um personagem pelo seu nome ou apelido."""
         return await self.character_repository.get_character_by_name_or_alias(name)
 
+    async def resolve_participants(self, names: List[str]) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Resolve vários participantes de uma vez: primeiro por nome/apelido (uma consulta $in) e,
+        para os que parecem ser um ID, por _id (outra consulta $in, só se necessário).
+        Retorna (personagens encontrados por nome informado, nomes não encontrados).
+        """
+        found = dict(await self.character_repository.get_characters_by_names(names, view="combat"))
+        pending = [name for name in dict.fromkeys(names) if name not in found]
+        id_like = [name for name in pending if ObjectId.is_valid(name)]
+        if id_like:
+            by_id = await self.character_repository.get_characters_by_ids(id_like, view="combat")
+            for name in id_like:
+                if str(ObjectId(name)) in by_id:
+                    found[name] = by_id[str(ObjectId(name))]
+        missing = [name for name in pending if name not in found]
+        return found, missing
+
     async def get_player_character_session(self, player_id: str, guild_id: str, channel_id: str) -> Tuple[str, str]:
         """
         Encontra a sessão ativa do jogador no canal/guilda e retorna o session_id e o character_id
@@ -223,31 +254,30 @@ class CombatService:
         """Retorna o ID da sessão de combate ativa para o canal, se existir."""
         self.logger.debug(f"Iniciando get_active_session_id para guild_id: {guild_id}, channel_id: {channel_id}")
         try:
-            self.logger.debug(f"Chamando session_repository.get_combat_session_by_channel para channel_id: {channel_id}")
-            session = await self.session_repository.get_combat_session_by_channel(channel_id)
-            if session:
-                self.logger.info(f"Sessão ativa encontrada para channel_id: {channel_id}. Session_id: {session.id}")
-                return str(session.id)
+            # Só o ID é necessário: um GET no mapeamento do canal, sem carregar a sessão
+            self.logger.debug(f"Chamando session_repository.get_session_id_by_channel para channel_id: {channel_id}")
+            session_id = await self.session_repository.get_session_id_by_channel(channel_id)
+            if session_id:
+                self.logger.info(f"Sessão ativa encontrada para channel_id: {channel_id}. Session_id: {session_id}")
+                return str(session_id)
             self.logger.info(f"Nenhuma sessão ativa encontrada para channel_id: {channel_id}.")
             return None
         except Exception as e:
             self.logger.critical(f"Erro inesperado em get_active_session_id: {e}", exc_info=True)
             raise CombatError(f"Erro ao obter ID da sessão ativa: {e}")
 
-    async def apply_healing(self, session_id: str, target_character_id: Optional[str], target_name: Optional[str], heal_amount: int, attribute_type: str, player_id: str) -> CombatSession:
-        """Aplica cura a um alvo na ordem de iniciativa."""
-        session = await self.session_repository.get_combat_session(session_id)
-        if not session:
-            raise CombatSessionNotFoundError(f"Nenhuma sessão de combate ativa encontrada para o ID '{session_id}'.")
-
+    async def apply_healing(self, session_id: str, target_character_id: Optional[str], target_name: Optional[str], heal_amount: int, attribute_type: str, player_id: str) -> Dict[str, Any]:
+        """Aplica cura a um alvo na ordem de iniciativa (atomicamente, no Redis). Retorna a entrada atualizada."""
         # self._verify_ownership(player_id, target_character_id, target_name, session)
-
         try:
-            session.apply_healing_to_target(amount=heal_amount, target_id=target_character_id, target_name=target_name)
+            entry = await self.session_repository.apply_hp_change(
+                session_id, "heal", heal_amount, target_id=target_character_id, target_name=target_name
+            )
         except KeyError as e:
             raise CombatError(f"Erro ao aplicar cura: {e}")
         except ValueError as e:
             raise CombatError(f"Erro de validação ao aplicar cura: {e}")
 
-        await self.session_repository.update_combat_session(session)
-        return session
\ No newline at end of file
+        if entry is None:
+            raise CombatSessionNotFoundError(f"Nenhuma sessão de combate ativa encontrada para o ID '{session_id}'.")
+        return entry
@@ -1,9 +1,10 @@
-import asyncio
+from typing import Union
+
 from src.core.entities.character import Character
 from src.core.services.character_service import CharacterService
 from src.infrastructure.database.class_repository import ClassRepository
 from src.core.calculators.levelup_calculator import calculate_bonuses_for_level
-from src.core.calculators.dice_roller import DiceRoller
+from src.core.calculators.attribute_calc import AttributeCalculator
 from src.utils.exceptions.application_exceptions import LevelUpError, CharacterNotFoundError
 
 class LevelUpService:
@@ -12,68 +13,66 @@ class LevelUpService:
         self.class_repository = class_repository
         self.character_repository = character_service.character_repository
 
-    async def level_up_character(self, character: Character, levels_to_gain: int) -> Character:
+    async def level_up_character(self, character: Union[Character, str], levels_to_gain: int) -> Character:
         """
-        Aplica o level up direto a um personagem, calculando bônus dinâmicos
+        Aplica o level up a um personagem (objeto ou id), calculando bônus dinâmicos
         e rolando recursos para todas as suas classes (suporte a multiclasse).
-        Não busca o personagem novamente, opera no objeto recebido.
+        A gravação usa CharacterService.update_with_retry: o personagem é relido do banco e,
+        se outro comando o alterar no meio do caminho, o level up é recalculado sobre a versão nova.
         """
         if not character:
             raise CharacterNotFoundError("Objeto de personagem inválido fornecido para level up.")
 
-        total_hp_gained = 0
-        total_chakra_gained = 0
-        total_fp_gained = 0
-        total_status_points_gained = 0
-        total_mastery_points_gained = 0
-        total_ph_points_gained = 0
-
-        # Busca todas as classes do personagem para a rolagem multiclasse
-        class_tasks = [self.class_repository.get_class(str(cid)) for cid in character.classe_ids]
-        character_classes = await asyncio.gather(*class_tasks)
-
-        if not all(character_classes):
-            raise LevelUpError("Uma ou mais classes do personagem não foram encontradas no banco de dados.")
-
-        # Calcula bônus e rola recursos para cada nível ganho
-        for i in range(levels_to_gain):
-            new_level = character.level + 1 + i
-            bonuses = calculate_bonuses_for_level(new_level)
-            
-            total_status_points_gained += bonuses.get("status", 0)
-            total_mastery_points_gained += bonuses.get("maestria", 0)
-            total_ph_points_gained += bonuses.get("ph", 0)
-
-            # Rola recursos para cada classe e soma os resultados
-            for char_class in character_classes:
-                if not char_class: continue
-                
-                hp_roll, _ = DiceRoller.roll_dice(char_class.hp_formula)
-                chakra_roll, _ = DiceRoller.roll_dice(char_class.chakra_formula)
-                fp_roll, _ = DiceRoller.roll_dice(char_class.fp_formula)
-                
-                total_hp_gained += hp_roll
-                total_chakra_gained += chakra_roll
-                total_fp_gained += fp_roll
-
-        # Atualiza os atributos e recursos do personagem
-        character.level += levels_to_gain
-
-        character.max_hp += total_hp_gained
-        character.hp += total_hp_gained
-        character.max_chakra += total_chakra_gained
-        character.chakra += total_chakra_gained
-        character.max_fp += total_fp_gained
-        character.fp += total_fp_gained
-
-        # Adiciona os pontos ganhos aos totais disponíveis
-        character.pontos["status"]["total"] += total_status_points_gained
-        character.pontos["mastery"]["total"] += total_mastery_points_gained
-        character.pontos["ph"]["total"] += total_ph_points_gained
-        
-        # Recalcula modificadores, caso algum bônus futuro altere atributos base
-        character.calculate_modifiers()
-        
-        await self.character_repository.update_character(character)
-        return character
+        async def apply(current: Character):
+            total_hp_gained = 0
+            total_chakra_gained = 0
+            total_fp_gained = 0
+            total_status_points_gained = 0
+            total_mastery_points_gained = 0
+            total_ph_points_gained = 0
+
+            # Busca todas as classes do personagem para a rolagem multiclasse (servidas pelo ClassRegistry)
+            character_classes = [await self.class_repository.get_class(str(cid)) for cid in current.classe_ids]
+
+            if not all(character_classes):
+                raise LevelUpError("Uma ou mais classes do personagem não foram encontradas no banco de dados.")
+
+            # Calcula bônus e rola recursos para cada nível ganho
+            for i in range(levels_to_gain):
+                new_level = current.level + 1 + i
+                bonuses = calculate_bonuses_for_level(new_level)
+
+                total_status_points_gained += bonuses.get("status", 0)
+                total_mastery_points_gained += bonuses.get("maestria", 0)
+                total_ph_points_gained += bonuses.get("ph", 0)
+
+                # Rola recursos para cada classe e soma os resultados
+                for char_class in character_classes:
+                    if not char_class: continue
+
+                    hp_roll, chakra_roll, fp_roll = AttributeCalculator.roll_class_attributes(char_class)
+
+                    total_hp_gained += hp_roll
+                    total_chakra_gained += chakra_roll
+                    total_fp_gained += fp_roll
+
+            # Atualiza os atributos e recursos do personagem
+            current.level += levels_to_gain
+
+            current.max_hp += total_hp_gained
+            current.hp += total_hp_gained
+            current.max_chakra += total_chakra_gained
+            current.chakra += total_chakra_gained
+            current.max_fp += total_fp_gained
+            current.fp += total_fp_gained
+
+            # Adiciona os pontos ganhos aos totais disponíveis
+            current.pontos["status"]["total"] += total_status_points_gained
+            current.pontos["mastery"]["total"] += total_mastery_points_gained
+            current.pontos["ph"]["total"] += total_ph_points_gained
+
+            # Recalcula modificadores, caso algum bônus futuro altere atributos base
+            current.calculate_modifiers()
 
+        identifier = str(character.id) if isinstance(character, Character) else str(character)
+        return await self.character_service.update_with_retry(identifier, apply)
@@ -32,23 +32,15 @@ class ReportService:
         return report
 
     async def get_usage_statistics(self) -> Dict[str, Any]:
-        all_characters = await self.character_repository.get_all_characters()
-        
-        total_characters = len(all_characters)
-        
-        # Example statistics (can be expanded)
-        class_distribution = {}
-        total_levels = 0
-        for char in all_characters:
-            class_distribution[char.class_name] = class_distribution.get(char.class_name, 0) + 1
-            total_levels += char.level
-
-        avg_level = total_levels / total_characters if total_characters > 0 else 0
+        # Agregado no MongoDB: nenhum personagem é trazido para o Python.
+        aggregated = await self.character_repository.aggregate_usage_statistics()
 
         stats = {
-            "total_characters": total_characters,
-            "class_distribution": class_distribution,
-            "average_character_level": round(avg_level, 2),
+            "total_characters": aggregated["total_characters"],
+            "class_distribution": aggregated["class_distribution"],
+            "average_character_level": round(aggregated["average_level"], 2),
+            "level_histogram": aggregated["level_histogram"],
+            "resource_totals": aggregated["resource_totals"],
             # Add more statistics as needed, e.g., most used commands (requires logging integration)
         }
-        return stats
\ No newline at end of file
+        return stats
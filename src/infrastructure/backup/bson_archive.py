@@ -0,0 +1,253 @@
+"""
+Formato de arquivo de backup do RPG Bot, sem depender de mongodump/mongorestore.
+
+Cada coleção vira um `<coleção>.bson.gz`: documentos BSON concatenados (cada documento BSON já começa
+com seu tamanho em int32 little-endian, como nos .bson do mongodump), comprimidos com gzip. O
+`manifest.json` do diretório do backup guarda, por arquivo, a quantidade de documentos, os bytes
+BSON e o sha256 do arquivo comprimido, que é calculado durante a escrita.
+
+Escrita e leitura são em fluxo: um documento por vez, com memória constante independente do tamanho
+da coleção. A leitura mapeia o arquivo comprimido em memória (mmap) quando possível, de modo que a
+verificação do checksum e a descompressão leem direto do cache de páginas, sem cópias intermediárias.
+"""
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import struct
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import bson
+from bson.raw_bson import RawBSONDocument
+
+from src.utils.exceptions.infrastructure_exceptions import BackupArchiveError
+
+ARCHIVE_FORMAT = "rpg-bot-bson-archive"
+ARCHIVE_VERSION = 1
+ARCHIVE_SUFFIX = ".bson.gz"
+MANIFEST_NAME = "manifest.json"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class _HashingWriter:
+    """Arquivo de saída que calcula o sha256 dos bytes gravados (os bytes já comprimidos)."""
+
+    def __init__(self, handle):
+        self._handle = handle
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.sha256.update(data)
+        self.size += len(data)
+        return self._handle.write(data)
+
+    def flush(self):
+        self._handle.flush()
+
+
+class ArchiveWriter:
+    """
+    Grava documentos BSON em um arquivo gzip. Aceita RawBSONDocument (os bytes vindos do cursor são
+    gravados sem decodificar) ou dicts comuns.
+
+        with ArchiveWriter(path) as writer:
+            for document in cursor:
+                writer.write(document)
+        writer.summary()  # {"file", "documents", "bytes", "sha256"}
+    """
+
+    def __init__(self, path: str, compresslevel: int = 6):
+        self.path = path
+        self.documents = 0
+        self.bytes = 0
+        self._handle = open(path, "wb")
+        self._hashing = _HashingWriter(self._handle)
+        # mtime=0 deixa o arquivo determinístico para o mesmo conteúdo
+        self._gzip = gzip.GzipFile(filename="", mode="wb", fileobj=self._hashing,
+                                   compresslevel=compresslevel, mtime=0)
+
+    def write(self, document: Any):
+        raw = document.raw if isinstance(document, RawBSONDocument) else bson.encode(document)
+        self._gzip.write(raw)
+        self.documents += 1
+        self.bytes += len(raw)
+
+    def write_all(self, documents: Iterable[Any]) -> int:
+        for document in documents:
+            self.write(document)
+        return self.documents
+
+    def close(self):
+        if self._gzip is not None:
+            self._gzip.close()
+            self._handle.close()
+            self._gzip = None
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "file": os.path.basename(self.path),
+            "documents": self.documents,
+            "bytes": self.bytes,
+            "sha256": self._hashing.sha256.hexdigest(),
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def iter_raw_documents(fileobj) -> Iterator[bytes]:
+    """Lê documentos BSON (bytes) de um fluxo já descomprimido, usando o prefixo de tamanho de cada um."""
+    while True:
+        header = fileobj.read(4)
+        if not header:
+            return
+        if len(header) < 4:
+            raise BackupArchiveError("Arquivo de backup truncado (cabeçalho de documento incompleto).")
+        (length,) = struct.unpack("<i", header)
+        if length < 5:
+            raise BackupArchiveError(f"Tamanho de documento BSON inválido no backup: {length}.")
+        body = fileobj.read(length - 4)
+        if len(body) < length - 4:
+            raise BackupArchiveError("Arquivo de backup truncado (documento incompleto).")
+        yield header + body
+
+
+class ArchiveReader:
+    """
+    Leitor de um arquivo `.bson.gz`. Usa mmap do arquivo comprimido (com fallback para leitura comum,
+    ex.: arquivos vazios ou sistemas sem mmap) tanto para o sha256 quanto para a descompressão.
+
+        with ArchiveReader(path) as reader:
+            reader.verify(manifest["archives"]["characters"]["sha256"])
+            for document in reader:
+                ...
+    """
+
+    def __init__(self, path: str, raw: bool = True):
+        self.path = path
+        self.raw = raw
+        self._handle = open(path, "rb")
+        try:
+            self._buffer = mmap.mmap(self._handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            self._buffer = None
+
+    def sha256(self) -> str:
+        if self._buffer is None:
+            return file_sha256(self.path)
+        digest = hashlib.sha256()
+        view = memoryview(self._buffer)
+        try:
+            for offset in range(0, len(view), HASH_CHUNK_SIZE):
+                digest.update(view[offset:offset + HASH_CHUNK_SIZE])
+        finally:
+            view.release()
+        return digest.hexdigest()
+
+    def verify(self, expected_sha256: Optional[str]):
+        if expected_sha256 is None:
+            raise BackupArchiveError(f"Manifesto sem checksum para '{self.path}'.")
+        actual = self.sha256()
+        if actual != expected_sha256:
+            raise BackupArchiveError(
+                f"Checksum divergente em '{self.path}': esperado {expected_sha256}, obtido {actual}."
+            )
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._buffer is not None:
+            self._buffer.seek(0)
+            source = self._buffer
+        else:
+            self._handle.seek(0)
+            source = self._handle
+        try:
+            with gzip.GzipFile(fileobj=source, mode="rb") as fileobj:
+                for raw in iter_raw_documents(fileobj):
+                    yield RawBSONDocument(raw) if self.raw else bson.decode(raw)
+        except (OSError, EOFError, zlib.error) as e:
+            raise BackupArchiveError(f"Arquivo de backup corrompido '{self.path}': {e}")
+
+    def close(self):
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer = None
+        self._handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def iter_archive(path: str, raw: bool = True) -> Iterator[Any]:
+    """Itera os documentos de um arquivo `.bson.gz` como RawBSONDocument (ou dicts, com raw=False)."""
+    with ArchiveReader(path, raw=raw) as reader:
+        yield from reader
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def new_manifest(kind: str, mode: str = "full", since: Optional[datetime] = None, **extra) -> Dict[str, Any]:
+    return {
+        "format": ARCHIVE_FORMAT,
+        "version": ARCHIVE_VERSION,
+        "kind": kind,
+        "mode": mode,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "since": since.isoformat() if since else None,
+        **extra,
+        "archives": {},
+    }
+
+
+def write_manifest(directory: str, manifest: Dict[str, Any]) -> str:
+    path = os.path.join(directory, MANIFEST_NAME)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2)
+    os.replace(temp_path, path)
+    return path
+
+
+def read_manifest(directory: str) -> Dict[str, Any]:
+    path = os.path.join(directory, MANIFEST_NAME)
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            manifest = json.load(handle)
+    except (OSError, ValueError) as e:
+        raise BackupArchiveError(f"Manifesto de backup ilegível em '{path}': {e}")
+    if manifest.get("format") != ARCHIVE_FORMAT:
+        raise BackupArchiveError(f"'{path}' não é um manifesto de backup do RPG Bot.")
+    return manifest
+
+
+def latest_manifest(root: str, kind: str) -> Optional[Dict[str, Any]]:
+    """Manifesto mais recente (por created_at) de um tipo de backup dentro de `root`, se houver."""
+    if not os.path.isdir(root):
+        return None
+    latest = None
+    for entry in os.listdir(root):
+        directory = os.path.join(root, entry)
+        if not os.path.isfile(os.path.join(directory, MANIFEST_NAME)):
+            continue
+        try:
+            manifest = read_manifest(directory)
+        except BackupArchiveError:
+            continue
+        if manifest.get("kind") == kind and (latest is None or manifest["created_at"] > latest["created_at"]):
+            latest = manifest
+    return latest
@@ -0,0 +1,90 @@
+import asyncio
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional
+
+from src.core.calculators.dice_roller import DiceRoller
+from src.core.entities.class_template import FORMULA_FIELDS, ClassTemplate
+from src.infrastructure.database.class_repository import ClassRepository
+from src.utils.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ClassRegistry:
+    """
+    Registro imutável dos ClassTemplates, carregado na inicialização e indexado por id e por nome.
+
+    Tem a mesma interface do ClassRepository. Cada carga monta índices novos (MappingProxyType)
+    e os troca de uma vez, então leitores nunca veem um estado parcial. As fórmulas de HP, Chakra e
+    FP de cada classe são compiladas uma vez por carga e guardadas no próprio template
+    (`compiled_formulas`), de modo que as rolagens de criação, multiclasse e level up não fazem
+    parsing; fórmulas inválidas vão para o log.
+    Escritas passam pelo repositório e recarregam o registro.
+    """
+
+    def __init__(self, repository: ClassRepository):
+        self.repository = repository
+        self._by_id: Mapping[str, ClassTemplate] = MappingProxyType({})
+        self._by_name: Mapping[str, ClassTemplate] = MappingProxyType({})
+        self._lock = asyncio.Lock()
+        self.loaded = False
+
+    async def load(self):
+        """(Re)carrega todas as classes do banco e recompila suas fórmulas."""
+        async with self._lock:
+            templates = await self.repository.get_all_classes()
+            by_id: Dict[str, ClassTemplate] = {}
+            by_name: Dict[str, ClassTemplate] = {}
+            for template in templates:
+                by_id[str(template.id)] = template
+                # ClassTemplate.from_dict já normaliza 'nome' (legado) para name
+                by_name[template.name] = template
+                compiled = {}
+                for formula_field in FORMULA_FIELDS:
+                    try:
+                        compiled[formula_field] = DiceRoller.compile(getattr(template, formula_field))
+                    except ValueError as e:
+                        logger.warning(f"Fórmula inválida na classe '{template.name}': {e}")
+                template.compiled_formulas = compiled
+            self._by_id = MappingProxyType(by_id)
+            self._by_name = MappingProxyType(by_name)
+            self.loaded = True
+            logger.info(f"Registro de classes carregado: {len(by_id)} classes.")
+
+    async def reload(self):
+        await self.load()
+
+    @property
+    def classes(self) -> Mapping[str, ClassTemplate]:
+        return self._by_id
+
+    async def _ensure_loaded(self):
+        if not self.loaded:
+            await self.load()
+
+    async def get_class(self, class_id: str) -> Optional[ClassTemplate]:
+        await self._ensure_loaded()
+        return self._by_id.get(str(class_id))
+
+    async def get_class_by_name(self, class_name: str) -> Optional[ClassTemplate]:
+        await self._ensure_loaded()
+        return self._by_name.get(class_name)
+
+    async def get_all_classes(self) -> List[ClassTemplate]:
+        await self._ensure_loaded()
+        return list(self._by_id.values())
+
+    async def save_class(self, class_template: ClassTemplate) -> str:
+        inserted_id = await self.repository.save_class(class_template)
+        await self.reload()
+        return inserted_id
+
+    async def update_class(self, class_template: ClassTemplate) -> bool:
+        modified = await self.repository.update_class(class_template)
+        await self.reload()
+        return modified
+
+    async def delete_class(self, class_id: str) -> bool:
+        deleted = await self.repository.delete_class(class_id)
+        await self.reload()
+        return deleted
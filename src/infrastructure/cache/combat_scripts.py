@@ -0,0 +1,206 @@
+"""
+Scripts Lua das mutações de combate. Cada script lê e grava os hashes da sessão (ver RedisRepository)
+dentro do Redis, de forma atômica e em uma única ida e volta (EVALSHA; o redis-py reenvia o script
+com EVAL se o servidor ainda não o tiver em cache). Comandos concorrentes no mesmo canal, como dois
+!dano ao mesmo tempo, são serializados pelo Redis e nenhuma atualização se perde.
+
+Além da mutação, os scripts atualizam `last_activity` e renovam o TTL da sessão (meta, entradas e
+o mapeamento do canal), junto com o score da sessão no índice de expiração. A chave do canal é montada dentro do script a partir do `channel_id`
+guardado no meta, o que pressupõe um Redis sem cluster (como o do bot).
+
+A resolução canal -> sessão (RESOLVE_CHANNEL) também é um script: o GET do mapeamento e a leitura
+dos hashes da sessão acontecem em uma única ida e volta. Na limpeza das sessões expiradas,
+RELEASE_CHANNELS compara e apaga os mapeamentos de canal atomicamente, para não apagar o de uma
+sessão nova criada no mesmo canal.
+
+Erros de domínio voltam como respostas de erro com um código no início da mensagem
+(SESSION_NOT_FOUND, TARGET_NOT_FOUND, EMPTY_TURN_ORDER).
+"""
+from redis.commands.core import AsyncScript
+
+# KEYS: meta, entradas, índice de expiração. ARGV: modo ("damage" | "heal"), quantidade, id do alvo,
+# nome do alvo, ttl em segundos, prefixo da chave do canal, last_activity (JSON), id da sessão,
+# instante de expiração (epoch).
+APPLY_HP_CHANGE = """
+local order_json = redis.call('HGET', KEYS[1], 'turn_order')
+if not order_json then
+  return redis.error_reply('SESSION_NOT_FOUND')
+end
+local order = cjson.decode(order_json)
+local raw_entries = redis.call('HGETALL', KEYS[2])
+local entries = {}
+for i = 1, #raw_entries, 2 do
+  entries[raw_entries[i]] = raw_entries[i + 1]
+end
+
+local function find(field, value)
+  for _, key in ipairs(order) do
+    if entries[key] then
+      local entry = cjson.decode(entries[key])
+      if entry[field] == value then
+        return key, entry
+      end
+    end
+  end
+  return nil, nil
+end
+
+local target_key, target = nil, nil
+if ARGV[3] ~= '' then
+  target_key, target = find('id', ARGV[3])
+end
+if not target and ARGV[4] ~= '' then
+  target_key, target = find('name', ARGV[4])
+end
+if not target then
+  return redis.error_reply('TARGET_NOT_FOUND')
+end
+
+local amount = tonumber(ARGV[2])
+local hp = tonumber(target['hp'])
+if ARGV[1] == 'damage' then
+  -- NPCs sem HP começam com 1000 no primeiro golpe
+  if hp == nil and (target['hp'] == nil or target['hp'] == cjson.null) and target['type'] == 'npc' then
+    target['hp'] = 1000
+    target['max_hp'] = 1000
+    hp = 1000
+  end
+  if hp ~= nil then
+    target['hp'] = math.max(0, hp - amount)
+  end
+elseif hp ~= nil then
+  local healed = hp + amount
+  local max_hp = tonumber(target['max_hp'])
+  if max_hp ~= nil then
+    healed = math.min(max_hp, healed)
+  end
+  target['hp'] = healed
+end
+
+local encoded = cjson.encode(target)
+redis.call('HSET', KEYS[2], target_key, encoded)
+redis.call('HSET', KEYS[1], 'last_activity', ARGV[7])
+local ttl = tonumber(ARGV[5])
+redis.call('EXPIRE', KEYS[1], ttl)
+redis.call('EXPIRE', KEYS[2], ttl)
+redis.call('ZADD', KEYS[3], ARGV[9], ARGV[8])
+local channel_json = redis.call('HGET', KEYS[1], 'channel_id')
+if channel_json then
+  local channel_id = cjson.decode(channel_json)
+  if type(channel_id) == 'string' then
+    redis.call('EXPIRE', ARGV[6] .. channel_id, ttl)
+  end
+end
+return encoded
+"""
+
+# KEYS: meta, entradas, índice de expiração. ARGV: ttl em segundos, prefixo da chave do canal,
+# last_activity (JSON), id da sessão, instante de expiração (epoch).
+ADVANCE_TURN = """
+local order_json = redis.call('HGET', KEYS[1], 'turn_order')
+if not order_json then
+  return redis.error_reply('SESSION_NOT_FOUND')
+end
+local order = cjson.decode(order_json)
+local count = #order
+if count == 0 then
+  return redis.error_reply('EMPTY_TURN_ORDER')
+end
+local index = tonumber(redis.call('HGET', KEYS[1], 'current_turn_index')) or -1
+local turn = tonumber(redis.call('HGET', KEYS[1], 'turn_number')) or 0
+-- Voltar ao primeiro da ordem inicia uma nova rodada
+if index == count - 1 then
+  turn = turn + 1
+end
+index = (index + 1) % count
+redis.call('HSET', KEYS[1], 'current_turn_index', index, 'turn_number', turn, 'last_activity', ARGV[3])
+
+local ttl = tonumber(ARGV[1])
+redis.call('EXPIRE', KEYS[1], ttl)
+redis.call('EXPIRE', KEYS[2], ttl)
+redis.call('ZADD', KEYS[3], ARGV[5], ARGV[4])
+local channel_json = redis.call('HGET', KEYS[1], 'channel_id')
+if channel_json then
+  local channel_id = cjson.decode(channel_json)
+  if type(channel_id) == 'string' then
+    redis.call('EXPIRE', ARGV[2] .. channel_id, ttl)
+  end
+end
+
+local entry = redis.call('HGET', KEYS[2], order[index + 1])
+return cjson.encode({
+  entry = entry and cjson.decode(entry) or cjson.null,
+  current_turn_index = index,
+  turn_number = turn,
+})
+"""
+
+# KEYS: meta, entradas, índice de expiração. ARGV: ttl em segundos, prefixo da chave do canal,
+# id da sessão, instante de expiração (epoch), seguidos dos pares campo/valor (JSON) a gravar no meta.
+UPDATE_FIELDS = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+  return redis.error_reply('SESSION_NOT_FOUND')
+end
+local fields = {}
+for i = 5, #ARGV do
+  fields[#fields + 1] = ARGV[i]
+end
+if #fields > 0 then
+  redis.call('HSET', KEYS[1], unpack(fields))
+end
+
+local ttl = tonumber(ARGV[1])
+redis.call('EXPIRE', KEYS[1], ttl)
+redis.call('EXPIRE', KEYS[2], ttl)
+redis.call('ZADD', KEYS[3], ARGV[4], ARGV[3])
+local channel_json = redis.call('HGET', KEYS[1], 'channel_id')
+if channel_json then
+  local channel_id = cjson.decode(channel_json)
+  if type(channel_id) == 'string' then
+    redis.call('EXPIRE', ARGV[2] .. channel_id, ttl)
+  end
+end
+return cjson.encode(#fields / 2)
+"""
+
+# KEYS: mapeamento do canal. ARGV: prefixo das chaves de sessão.
+# Retorna nil (canal sem sessão) ou {session_id, meta, entradas}; para sessões no formato antigo,
+# {session_id, "legacy"} (a conversão fica a cargo do repositório).
+RESOLVE_CHANNEL = """
+local session_id = redis.call('GET', KEYS[1])
+if not session_id then
+  return nil
+end
+local meta = redis.call('HGETALL', ARGV[1] .. session_id .. ':meta')
+if #meta == 0 then
+  if redis.call('EXISTS', ARGV[1] .. session_id) == 1 then
+    return {session_id, 'legacy'}
+  end
+  return nil
+end
+return {session_id, meta, redis.call('HGETALL', ARGV[1] .. session_id .. ':entries')}
+"""
+
+# KEYS: mapeamentos de canal. ARGV: id da sessão expirada de cada mapeamento (na mesma ordem).
+# Apaga só os mapeamentos que ainda apontam para a sessão expirada; retorna quantos foram apagados.
+RELEASE_CHANNELS = """
+local released = 0
+for i, key in ipairs(KEYS) do
+  if redis.call('GET', key) == ARGV[i] then
+    redis.call('DEL', key)
+    released = released + 1
+  end
+end
+return released
+"""
+
+
+class CombatScripts:
+    """Scripts de combate registrados em um cliente redis.asyncio (SHA calculado uma única vez)."""
+
+    def __init__(self, client):
+        self.apply_hp_change: AsyncScript = client.register_script(APPLY_HP_CHANGE)
+        self.advance_turn: AsyncScript = client.register_script(ADVANCE_TURN)
+        self.update_fields: AsyncScript = client.register_script(UPDATE_FIELDS)
+        self.resolve_channel: AsyncScript = client.register_script(RESOLVE_CHANNEL)
+        self.release_channels: AsyncScript = client.register_script(RELEASE_CHANNELS)
@@ -0,0 +1,75 @@
+import dataclasses
+from collections import OrderedDict
+from typing import Dict, Optional, Union
+
+from src.core.entities.player_preferences import PlayerPreferences
+from src.infrastructure.database.player_preferences_repository import PlayerPreferencesRepository
+
+# Marca jogadores sem preferências salvas (cache negativo)
+_MISSING = object()
+
+
+class CachedPlayerPreferencesRepository:
+    """
+    Cache LRU read-through na frente do PlayerPreferencesRepository, com a mesma interface.
+
+    Guarda até `max_entries` jogadores, inclusive os que não têm preferências (cache negativo),
+    então um `!rodar` repetido não consulta o MongoDB. Como as preferências só mudam por este
+    repositório (`!favorito`), save/delete atualizam a entrada do jogador no cache.
+    As leituras devolvem cópias, para que alterações feitas pelo chamador antes de salvar
+    não vazem para o cache.
+    """
+
+    def __init__(self, repository: PlayerPreferencesRepository, max_entries: int = 1024):
+        self.repository = repository
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Union[PlayerPreferences, object]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _store(self, player_discord_id: str, value: Union[PlayerPreferences, object]):
+        self._entries[player_discord_id] = value
+        self._entries.move_to_end(player_discord_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_preferences(self, player_discord_id: str) -> Optional[PlayerPreferences]:
+        cached = self._entries.get(player_discord_id)
+        if cached is not None:
+            self.hits += 1
+            self._entries.move_to_end(player_discord_id)
+            return None if cached is _MISSING else dataclasses.replace(cached)
+
+        self.misses += 1
+        preferences = await self.repository.get_preferences(player_discord_id)
+        self._store(player_discord_id, dataclasses.replace(preferences) if preferences else _MISSING)
+        return preferences
+
+    async def save_preferences(self, preferences: PlayerPreferences) -> None:
+        # Invalida antes de gravar: se a escrita falhar, a próxima leitura vai ao banco
+        self.invalidate(preferences.player_discord_id)
+        await self.repository.save_preferences(preferences)
+        self._store(preferences.player_discord_id, dataclasses.replace(preferences))
+
+    async def delete_preferences(self, player_discord_id: str) -> bool:
+        self.invalidate(player_discord_id)
+        deleted = await self.repository.delete_preferences(player_discord_id)
+        self._store(player_discord_id, _MISSING)
+        return deleted
+
+    def invalidate(self, player_discord_id: Optional[str] = None):
+        """Remove um jogador do cache, ou todos quando nenhum id é informado."""
+        if player_discord_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(player_discord_id, None)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
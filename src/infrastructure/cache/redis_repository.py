@@ -1,20 +1,58 @@
 import json
+import time
+from datetime import datetime, timezone
+
 import redis.asyncio as redis
-from typing import Optional, Dict, Any, List
+from redis.exceptions import ResponseError
+from typing import Optional, Dict, Any, List, AsyncIterator
 from src.core.entities.combat_session import CombatSession
+from src.infrastructure.cache.combat_scripts import CombatScripts
+from src.infrastructure.monitoring.instrumentation import MetricsRegistry, instrument_redis_client
 from src.utils.exceptions.infrastructure_exceptions import CacheError
+from src.utils.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+SESSION_KEY_PREFIX = "combat_session:"
+# Conjunto com os IDs das sessões existentes (enumeração sem KEYS)
+ACTIVE_SESSIONS_KEY = "combat_sessions:active"
+# Conjunto ordenado com os IDs das sessões pontuados pelo instante de expiração (epoch, em segundos)
+SESSION_EXPIRY_KEY = "combat_sessions:expiry"
+DEFAULT_SESSION_TTL_SECONDS = 3600
 
 class RedisRepository:
-    def __init__(self, host: str = "localhost", port: int = 6379, db: int = 0):
+    """
+    Sessões de combate no Redis. Cada sessão ocupa dois hashes:
+    - `combat_session:<id>:meta`: campos da sessão (JSON por campo), incluindo a ordem de iniciativa
+      como lista de chaves de entradas;
+    - `combat_session:<id>:entries`: uma entrada de iniciativa por campo (JSON).
+    Assim !dano grava só a entrada do alvo e !proximo só os campos do turno. Sessões no formato
+    antigo (`combat_session:<id>` com o JSON inteiro) são convertidas na primeira leitura.
+    O conjunto `combat_sessions:active` indexa os IDs das sessões para enumerá-las sem KEYS e o
+    conjunto ordenado `combat_sessions:expiry` guarda quando cada uma expira (ver sweep_expired_sessions).
+    """
+
+    def __init__(self, host: str = "localhost", port: int = 6379, db: int = 0, max_connections: Optional[int] = None,
+                 metrics: Optional[MetricsRegistry] = None):
         self.host = host
         self.port = port
         self.db = db
+        self.max_connections = max_connections
+        # Quando informado, cada comando enviado ao Redis é medido (ver instrument_redis_client)
+        self.metrics = metrics
         self.redis_client: Optional[redis.Redis] = None
+        self.scripts: Optional[CombatScripts] = None
 
     async def connect(self):
         if not self.redis_client:
             # decode_responses=True garante que os valores retornados já são strings
-            self.redis_client = redis.Redis(host=self.host, port=self.port, db=self.db, decode_responses=True)
+            self.redis_client = redis.Redis(
+                host=self.host, port=self.port, db=self.db,
+                decode_responses=True, max_connections=self.max_connections
+            )
+            if self.metrics is not None:
+                instrument_redis_client(self.redis_client, self.metrics)
+            self.scripts = CombatScripts(self.redis_client)
             try:
                 await self.redis_client.ping()
                 # print(f"Conectado ao Redis em {self.host}:{self.port}/{self.db}") # Removido para evitar logs excessivos
@@ -25,80 +63,313 @@ class RedisRepository:
         if self.redis_client:
             await self.redis_client.close()
             self.redis_client = None
+            self.scripts = None
+
+    @staticmethod
+    def _meta_key(session_id: str) -> str:
+        return f"{SESSION_KEY_PREFIX}{session_id}:meta"
+
+    @staticmethod
+    def _entries_key(session_id: str) -> str:
+        return f"{SESSION_KEY_PREFIX}{session_id}:entries"
+
+    @staticmethod
+    def _legacy_key(session_id: str) -> str:
+        # Formato antigo: a sessão inteira serializada em JSON numa string
+        return f"{SESSION_KEY_PREFIX}{session_id}"
+
+    @staticmethod
+    def _channel_key(channel_id: str) -> str:
+        return f"{SESSION_KEY_PREFIX}channel:{channel_id}"
 
-    async def save_combat_session(self, session: CombatSession, ttl_seconds: int = 3600):
+    def _require_client(self) -> redis.Redis:
         if not self.redis_client:
             raise CacheError("Redis client not connected.")
-        session_json = json.dumps(session.to_dict())
-        await self.redis_client.set(f"combat_session:{session.id}", session_json, ex=ttl_seconds)
+        return self.redis_client
+
+    async def _write_session(self, session: CombatSession, ttl_seconds: Optional[int]):
+        """Grava meta e entradas da sessão (substituindo as anteriores) numa única transação."""
+        client = self._require_client()
+        meta, entries = session.to_redis_hash()
+        meta_key, entries_key = self._meta_key(session.id), self._entries_key(session.id)
+        pipeline = client.pipeline(transaction=True)
+        pipeline.delete(entries_key, self._legacy_key(session.id))
+        pipeline.hset(meta_key, mapping=meta)
+        if entries:
+            pipeline.hset(entries_key, mapping=entries)
+        if ttl_seconds is not None:
+            pipeline.expire(meta_key, ttl_seconds)
+            pipeline.expire(entries_key, ttl_seconds)
         # Mapeia o ID do canal para o ID da sessão ativa
-        await self.redis_client.set(f"combat_session:channel:{session.channel_id}", str(session.id), ex=ttl_seconds)
+        pipeline.set(self._channel_key(session.channel_id), str(session.id), ex=ttl_seconds)
+        pipeline.sadd(ACTIVE_SESSIONS_KEY, str(session.id))
+        if ttl_seconds is not None:
+            pipeline.zadd(SESSION_EXPIRY_KEY, {str(session.id): time.time() + ttl_seconds})
+        else:
+            pipeline.zrem(SESSION_EXPIRY_KEY, str(session.id))
+        await pipeline.execute()
+
+    async def save_combat_session(self, session: CombatSession, ttl_seconds: int = DEFAULT_SESSION_TTL_SECONDS):
+        self._require_client()
+        await self._write_session(session, ttl_seconds)
+
+    async def _migrate_legacy_session(self, session_id: str) -> Optional[CombatSession]:
+        """Converte uma sessão no formato JSON antigo para os hashes, preservando o TTL."""
+        client = self._require_client()
+        legacy_key = self._legacy_key(session_id)
+        session_data = await client.get(legacy_key)
+        if not session_data:
+            return None
+        session = CombatSession.from_dict(json.loads(session_data))
+        ttl = await client.ttl(legacy_key)
+        await self._write_session(session, ttl if ttl > 0 else None)
+        logger.info(f"Sessão de combate {session_id} migrada do formato JSON para hashes.")
+        return session
 
     async def get_combat_session(self, session_id: str) -> Optional[CombatSession]:
-        if not self.redis_client:
-            raise CacheError("Redis client not connected.")
-        session_data = await self.redis_client.get(f"combat_session:{session_id}")
-        if session_data:
-            # session_data já é uma string devido a decode_responses=True
-            return CombatSession.from_dict(json.loads(session_data))
-        return None
+        client = self._require_client()
+        pipeline = client.pipeline(transaction=False)
+        pipeline.hgetall(self._meta_key(session_id))
+        pipeline.hgetall(self._entries_key(session_id))
+        meta, entries = await pipeline.execute()
+        if meta:
+            return CombatSession.from_redis_hash(meta, entries)
+        return await self._migrate_legacy_session(session_id)
 
     async def update_combat_session(self, session: CombatSession):
-        if not self.redis_client:
-            raise CacheError("Redis client not connected.")
-        session_json = json.dumps(session.to_dict())
-        # Preserva o TTL se existir, caso contrário, define um padrão
-        ttl = await self.redis_client.ttl(f"combat_session:{session.id}")
-        if ttl == -1: # Sem expiração
-            await self.redis_client.set(f"combat_session:{session.id}", session_json)
-            await self.redis_client.set(f"combat_session:channel:{session.channel_id}", str(session.id))
+        """Regrava a sessão inteira (ex.: novas entradas de iniciativa), preservando o TTL."""
+        client = self._require_client()
+        ttl = await client.ttl(self._meta_key(session.id))
+        if ttl == -1:  # Sem expiração
+            await self._write_session(session, None)
         else:
-            await self.redis_client.set(f"combat_session:{session.id}", session_json, ex=ttl)
-            await self.redis_client.set(f"combat_session:channel:{session.channel_id}", str(session.id), ex=ttl)
+            await self._write_session(session, ttl if ttl > 0 else DEFAULT_SESSION_TTL_SECONDS)
+
+    async def update_session_fields(self, session_id: str, ttl_seconds: int = DEFAULT_SESSION_TTL_SECONDS,
+                                    **fields: Any) -> bool:
+        """
+        Atualiza apenas os campos informados do hash de meta (ex.: current_turn_index, turn_number), mais
+        `last_activity`, e renova o TTL e a expiração da sessão, atomicamente (script UPDATE_FIELDS).
+        Retorna False se a sessão não existir.
+        """
+        fields.setdefault("last_activity", datetime.now(timezone.utc).isoformat())
+        args = [ttl_seconds, self._channel_key(""), session_id, time.time() + ttl_seconds]
+        for name, value in fields.items():
+            args += [name, json.dumps(value)]
+        return await self._run_session_script(self.scripts.update_fields, session_id, args) is not None
+
+    async def _run_session_script(self, script, session_id: str, args: List[Any]) -> Optional[Dict[str, Any]]:
+        """
+        Executa um script de combate sobre os hashes da sessão. Sessões ainda no formato JSON antigo
+        são migradas e o script é executado de novo. Retorna None se a sessão não existir.
+        """
+        self._require_client()
+        keys = [self._meta_key(session_id), self._entries_key(session_id), SESSION_EXPIRY_KEY]
+        for attempt in range(2):
+            try:
+                return json.loads(await script(keys=keys, args=args))
+            except ResponseError as e:
+                message = str(e)
+                if "SESSION_NOT_FOUND" in message:
+                    if attempt == 0 and await self._migrate_legacy_session(session_id):
+                        continue
+                    return None
+                if "TARGET_NOT_FOUND" in message:
+                    raise KeyError("Target not found in turn order")
+                if "EMPTY_TURN_ORDER" in message:
+                    raise ValueError("Turn order is empty")
+                raise CacheError(f"Erro ao executar script de combate no Redis: {e}")
+        return None
+
+    @staticmethod
+    def _activity_now() -> str:
+        return json.dumps(datetime.now(timezone.utc).isoformat())
+
+    async def apply_hp_change(self, session_id: str, mode: str, amount: int, target_id: Optional[str] = None,
+                              target_name: Optional[str] = None,
+                              ttl_seconds: int = DEFAULT_SESSION_TTL_SECONDS) -> Optional[Dict[str, Any]]:
+        """
+        Aplica dano (mode="damage", HP mínimo 0) ou cura (mode="heal", limitada ao max_hp) a uma entrada
+        da iniciativa, atomicamente no Redis, e renova o TTL da sessão. O alvo é buscado pelo id e depois
+        pelo nome. Retorna a entrada atualizada, ou None se a sessão não existir.
+        """
+        if mode not in ("damage", "heal"):
+            raise ValueError(f"Invalid hp change mode: {mode}")
+        if not target_id and not target_name:
+            raise ValueError("Must provide either target_id or target_name")
+        args = [mode, int(amount), target_id or "", target_name or "", ttl_seconds,
+                self._channel_key(""), self._activity_now(), session_id, time.time() + ttl_seconds]
+        try:
+            return await self._run_session_script(self.scripts.apply_hp_change, session_id, args)
+        except KeyError:
+            raise KeyError(f"Target '{target_name or target_id}' not found in turn order")
+
+    async def advance_turn(self, session_id: str,
+                           ttl_seconds: int = DEFAULT_SESSION_TTL_SECONDS) -> Optional[Dict[str, Any]]:
+        """
+        Avança o turno atomicamente no Redis e renova o TTL da sessão.
+        Retorna {"entry", "current_turn_index", "turn_number"}, ou None se a sessão não existir.
+        """
+        args = [ttl_seconds, self._channel_key(""), self._activity_now(), session_id, time.time() + ttl_seconds]
+        return await self._run_session_script(self.scripts.advance_turn, session_id, args)
 
     async def delete_combat_session(self, session_id: str):
-        if not self.redis_client:
-            raise CacheError("Redis client not connected.")
-        # Tenta obter o channel_id da sessão antes de deletar o mapeamento
-        session_data = await self.redis_client.get(f"combat_session:{session_id}")
-        if session_data:
+        client = self._require_client()
+        # Obtém o channel_id da sessão antes de deletar o mapeamento
+        channel_id = await client.hget(self._meta_key(session_id), "channel_id")
+        if channel_id is not None:
+            channel_id = json.loads(channel_id)
+        else:
+            session_data = await client.get(self._legacy_key(session_id))
+            if session_data:
+                try:
+                    channel_id = json.loads(session_data).get("channel_id")
+                except ValueError as e:
+                    # Logar o erro, mas não impedir a exclusão da sessão principal
+                    logger.warning(f"Erro ao tentar ler o canal da sessão {session_id}: {e}")
+        keys = [self._meta_key(session_id), self._entries_key(session_id), self._legacy_key(session_id)]
+        if channel_id:
+            keys.append(self._channel_key(channel_id))
+        pipeline = client.pipeline(transaction=True)
+        pipeline.delete(*keys)
+        pipeline.srem(ACTIVE_SESSIONS_KEY, session_id)
+        pipeline.zrem(SESSION_EXPIRY_KEY, session_id)
+        await pipeline.execute()
+
+    async def sweep_expired_sessions(self, now: Optional[float] = None, limit: int = 500) -> int:
+        """
+        Remove até `limit` sessões cujo instante de expiração (score em `combat_sessions:expiry`) já
+        passou: ZRANGEBYSCORE dos IDs vencidos, um pipeline lendo o canal de cada uma, o script
+        RELEASE_CHANNELS apagando os mapeamentos de canal que ainda apontam para elas (comparação e
+        remoção atômicas, sem corrida com um !iniciar no mesmo canal) e uma transação apagando meta,
+        entradas, chave antiga e as entradas nos índices.
+        Retorna quantas sessões foram removidas.
+        """
+        client = self._require_client()
+        now = time.time() if now is None else now
+        session_ids = await client.zrangebyscore(SESSION_EXPIRY_KEY, "-inf", now, start=0, num=limit)
+        if not session_ids:
+            return 0
+
+        pipeline = client.pipeline(transaction=False)
+        for session_id in session_ids:
+            pipeline.hget(self._meta_key(session_id), "channel_id")
+            pipeline.get(self._legacy_key(session_id))
+        replies = await pipeline.execute()
+        channels = {}
+        for session_id, channel_json, legacy_json in zip(session_ids, replies[::2], replies[1::2]):
             try:
-                session = CombatSession.from_dict(json.loads(session_data))
-                await self.redis_client.delete(f"combat_session:channel:{session.channel_id}")
-            except Exception as e:
-                # Logar o erro, mas não impedir a exclusão da sessão principal
-                print(f"Erro ao tentar deletar mapeamento de canal para sessão {session_id}: {e}")
-        await self.redis_client.delete(f"combat_session:{session.id}")
+                channel_id = json.loads(channel_json) if channel_json else json.loads(legacy_json or "{}").get("channel_id")
+            except (ValueError, AttributeError) as e:
+                logger.warning(f"Erro ao tentar ler o canal da sessão expirada {session_id}: {e}")
+                continue
+            if channel_id:
+                channels[session_id] = self._channel_key(channel_id)
+
+        if channels:
+            await self.scripts.release_channels(keys=list(channels.values()), args=list(channels))
+
+        pipeline = client.pipeline(transaction=True)
+        for session_id in session_ids:
+            pipeline.delete(self._meta_key(session_id), self._entries_key(session_id), self._legacy_key(session_id))
+        pipeline.srem(ACTIVE_SESSIONS_KEY, *session_ids)
+        pipeline.zrem(SESSION_EXPIRY_KEY, *session_ids)
+        await pipeline.execute()
+        return len(session_ids)
+
+    async def get_session_id_by_channel(self, channel_id: str) -> Optional[str]:
+        """ID da sessão ativa do canal (um único GET, sem carregar a sessão)."""
+        client = self._require_client()
+        return await client.get(self._channel_key(channel_id))
 
     async def get_combat_session_by_channel(self, channel_id: str) -> Optional[CombatSession]:
         """
-        Recupera uma sessão de combate do Redis usando o ID do canal.
+        Recupera uma sessão de combate do Redis usando o ID do canal, em uma única ida e volta
+        (script RESOLVE_CHANNEL: mapeamento do canal + hashes da sessão).
         """
-        if not self.redis_client:
-            raise CacheError("Redis client not connected.")
-        session_key = f"combat_session:channel:{channel_id}"
-        session_id = await self.redis_client.get(session_key)
-        if session_id:
-            # session_id já é uma string (devido a decode_responses=True), não precisa de decode
-            session_data = await self.redis_client.get(f"combat_session:{session_id}")
-            if session_data:
-                # session_data já é uma string, não precisa de decode
-                return CombatSession.from_dict(json.loads(session_data))
-        return None
+        self._require_client()
+        result = await self.scripts.resolve_channel(keys=[self._channel_key(channel_id)], args=[SESSION_KEY_PREFIX])
+        if not result:
+            return None
+        session_id = result[0]
+        if result[1] == "legacy":
+            return await self._migrate_legacy_session(session_id)
+        meta, entries = (dict(zip(values[::2], values[1::2])) for values in result[1:3])
+        return CombatSession.from_redis_hash(meta, entries)
+
+    async def iter_combat_sessions(self, batch_size: int = 100) -> AsyncIterator[CombatSession]:
+        """
+        Percorre todas as sessões sem bloquear o Redis: os IDs vêm do índice `combat_sessions:active`
+        via SSCAN e cada lote é lido com um único pipeline (HGETALL de meta e entradas). IDs cujas
+        sessões já expiraram são removidos do índice; sessões no formato antigo são convertidas.
+        """
+        client = self._require_client()
+        seen = set()
+        cursor = 0
+        while True:
+            cursor, members = await client.sscan(ACTIVE_SESSIONS_KEY, cursor, count=batch_size)
+            # O SSCAN pode repetir elementos entre iterações
+            session_ids = [session_id for session_id in dict.fromkeys(members) if session_id not in seen]
+            seen.update(session_ids)
+            if session_ids:
+                pipeline = client.pipeline(transaction=False)
+                for session_id in session_ids:
+                    pipeline.hgetall(self._meta_key(session_id))
+                    pipeline.hgetall(self._entries_key(session_id))
+                replies = await pipeline.execute()
+                missing = []
+                for session_id, meta, entries in zip(session_ids, replies[::2], replies[1::2]):
+                    if meta:
+                        yield CombatSession.from_redis_hash(meta, entries)
+                        continue
+                    session = await self._migrate_legacy_session(session_id)
+                    if session:
+                        yield session
+                    else:
+                        missing.append(session_id)
+                if missing:
+                    await client.srem(ACTIVE_SESSIONS_KEY, *missing)
+            if int(cursor) == 0:
+                break
 
     async def get_all_combat_sessions(self) -> List[CombatSession]:
         """
         Recupera todas as sessões de combate ativas.
         """
-        if not self.redis_client:
-            raise CacheError("Redis client not connected.")
-        session_keys = await self.redis_client.keys("combat_session:*")
-        sessions: List[CombatSession] = []
-        for key in session_keys:
-            # Ignorar chaves de mapeamento de canal
-            if "combat_session:channel:" in key:
+        return [session async for session in self.iter_combat_sessions()]
+
+    async def rebuild_session_index(self, scan_count: int = 500) -> int:
+        """
+        Registra nos índices as sessões que ainda não estão neles (ex.: sessões no formato JSON antigo,
+        criadas antes dos índices), percorrendo as chaves com SCAN. A expiração de cada sessão vem do
+        TTL da sua chave. Retorna quantos IDs foram adicionados ao conjunto de sessões ativas.
+        """
+        client = self._require_client()
+        added = 0
+        batch = []
+        async for key in client.scan_iter(match=f"{SESSION_KEY_PREFIX}*", count=scan_count):
+            suffix = key[len(SESSION_KEY_PREFIX):]
+            # Ignorar chaves de mapeamento de canal e os hashes de entradas
+            if suffix.startswith("channel:") or suffix.endswith(":entries"):
                 continue
-            session_data = await self.redis_client.get(key)
-            if session_data:
-                sessions.append(CombatSession.from_dict(json.loads(session_data)))
-        return sessions
\ No newline at end of file
+            batch.append((suffix[:-len(":meta")] if suffix.endswith(":meta") else suffix, key))
+            if len(batch) >= scan_count:
+                added += await self._index_sessions(batch)
+                batch = []
+        if batch:
+            added += await self._index_sessions(batch)
+        return added
+
+    async def _index_sessions(self, batch: List[tuple]) -> int:
+        client = self._require_client()
+        pipeline = client.pipeline(transaction=False)
+        pipeline.sadd(ACTIVE_SESSIONS_KEY, *(session_id for session_id, _ in batch))
+        for _, key in batch:
+            pipeline.ttl(key)
+        added, *ttls = await pipeline.execute()
+        now = time.time()
+        expiry = {session_id: now + ttl for (session_id, _), ttl in zip(batch, ttls) if ttl > 0}
+        if expiry:
+            # NX: não sobrescreve a expiração de sessões que já estão no índice
+            await client.zadd(SESSION_EXPIRY_KEY, expiry, nx=True)
+        return added
@@ -0,0 +1,94 @@
+"""
+Limpeza periódica das sessões de combate expiradas, executada dentro do bot.
+
+A cada intervalo o `CombatSessionSweeper` chama `RedisRepository.sweep_expired_sessions`, que busca
+só os IDs vencidos no índice de expiração (ZRANGEBYSCORE) e os apaga em pipeline. As rodadas são
+registradas como "sweeper.combat_sessions" no MetricsRegistry (quando houver) e resumidas em `stats`.
+"""
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from src.infrastructure.monitoring.instrumentation import MetricsRegistry
+from src.utils.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+SWEEP_METRIC = "sweeper.combat_sessions"
+
+
+class CombatSessionSweeper:
+    """Tarefa em segundo plano que remove sessões expiradas em lotes de `batch_size`."""
+
+    def __init__(self, repository, interval_seconds: float = 60, batch_size: int = 500,
+                 metrics: Optional[MetricsRegistry] = None):
+        self.repository = repository
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.metrics = metrics
+        self.stats: Dict[str, Any] = {
+            "runs": 0,
+            "errors": 0,
+            "swept_total": 0,
+            "last_swept": 0,
+            "last_run_at": None,
+            "last_duration_ms": 0.0,
+        }
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def sweep_once(self) -> int:
+        """Executa uma rodada: remove lotes até não sobrar sessão vencida. Retorna quantas foram removidas."""
+        start = time.perf_counter()
+        swept = 0
+        error = False
+        try:
+            while True:
+                removed = await self.repository.sweep_expired_sessions(limit=self.batch_size)
+                swept += removed
+                if removed < self.batch_size:
+                    break
+        except Exception:
+            error = True
+            self.stats["errors"] += 1
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.stats["runs"] += 1
+            self.stats["swept_total"] += swept
+            self.stats["last_swept"] = swept
+            self.stats["last_run_at"] = time.time()
+            self.stats["last_duration_ms"] = round(elapsed_ms, 3)
+            if self.metrics is not None:
+                self.metrics.record(SWEEP_METRIC, elapsed_ms, error)
+        if swept:
+            logger.info(f"{swept} sessões de combate expiradas removidas em {elapsed_ms:.1f} ms.")
+        return swept
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sweep_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Uma falha do Redis não derruba a tarefa; a próxima rodada tenta de novo
+                logger.warning(f"Falha na limpeza de sessões de combate: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self):
+        if not self.running:
+            self._task = asyncio.create_task(self._run(), name="combat-session-sweeper")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
@@ -0,0 +1,134 @@
+import asyncio
+import copy
+import time
+from typing import Callable, Dict, List, Optional
+
+from src.core.entities.transformation import Transformation
+from src.infrastructure.database.transformation_repository import TransformationRepository
+from src.utils.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TransformationCatalog:
+    """
+    Catálogo em memória das transformações, indexado por id e por nome.
+
+    Tem a mesma interface do TransformationRepository e pode substituí-lo nos serviços.
+    As transformações mudam raramente, então as leituras são servidas da memória:
+    - o catálogo é carregado por inteiro em `load()` (na inicialização do bot);
+    - save/update/delete passam pelo repositório e atualizam o catálogo na hora;
+    - após `ttl_seconds` o catálogo é recarregado, cobrindo alterações feitas por outros processos.
+    Ids/nomes ausentes do catálogo são buscados no repositório (e contados como miss).
+    Leituras devolvem cópias e escritas guardam cópias: editar o objeto recebido não altera o
+    catálogo, que só passa a refletir a edição depois que o repositório a grava.
+    """
+
+    def __init__(self, repository: TransformationRepository, ttl_seconds: float = 300,
+                 clock: Callable[[], float] = time.monotonic):
+        self.repository = repository
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._by_id: Dict[str, Transformation] = {}
+        self._by_name: Dict[str, Transformation] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        # Incrementado a cada mudança no catálogo; permite que outros caches detectem invalidação
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    async def load(self):
+        """(Re)carrega todas as transformações do banco."""
+        transformations = await self.repository.get_all_transformations()
+        self._by_id = {str(t.id): t for t in transformations}
+        self._by_name = {t.name: t for t in transformations}
+        self._loaded_at = self._clock()
+        self.generation += 1
+        self.reloads += 1
+        logger.info(f"Catálogo de transformações carregado: {len(transformations)} transformações.")
+
+    def invalidate(self):
+        """Força a recarga no próximo acesso."""
+        self._loaded_at = None
+
+    async def _ensure_fresh(self):
+        if self._loaded_at is not None and self._clock() - self._loaded_at < self.ttl_seconds:
+            return
+        async with self._lock:
+            # Outra tarefa pode ter recarregado enquanto esperávamos o lock
+            if self._loaded_at is None or self._clock() - self._loaded_at >= self.ttl_seconds:
+                await self.load()
+
+    def _drop_name_entries(self, transformation_id: str):
+        # A transformação pode ter sido renomeada no update, então procura pelo id
+        for name in [name for name, t in self._by_name.items() if str(t.id) == transformation_id]:
+            del self._by_name[name]
+
+    def _put(self, transformation: Transformation):
+        transformation = copy.deepcopy(transformation)
+        self._drop_name_entries(str(transformation.id))
+        self._by_id[str(transformation.id)] = transformation
+        self._by_name[transformation.name] = transformation
+        self.generation += 1
+
+    def _remove(self, transformation_id: str):
+        self._by_id.pop(str(transformation_id), None)
+        self._drop_name_entries(str(transformation_id))
+        self.generation += 1
+
+    async def get_transformation(self, transformation_id: str) -> Optional[Transformation]:
+        await self._ensure_fresh()
+        transformation = self._by_id.get(str(transformation_id))
+        if transformation is not None:
+            self.hits += 1
+            return copy.deepcopy(transformation)
+        self.misses += 1
+        transformation = await self.repository.get_transformation(str(transformation_id))
+        if transformation is not None:
+            self._put(transformation)
+        return transformation
+
+    async def get_transformation_by_name(self, name: str) -> Optional[Transformation]:
+        await self._ensure_fresh()
+        transformation = self._by_name.get(name)
+        if transformation is not None:
+            self.hits += 1
+            return copy.deepcopy(transformation)
+        self.misses += 1
+        transformation = await self.repository.get_transformation_by_name(name)
+        if transformation is not None:
+            self._put(transformation)
+        return transformation
+
+    async def get_all_transformations(self) -> List[Transformation]:
+        await self._ensure_fresh()
+        return [copy.deepcopy(t) for t in self._by_id.values()]
+
+    async def save_transformation(self, transformation: Transformation) -> str:
+        inserted_id = await self.repository.save_transformation(transformation)
+        self._put(transformation)
+        return inserted_id
+
+    async def update_transformation(self, transformation: Transformation) -> bool:
+        modified = await self.repository.update_transformation(transformation)
+        self._put(transformation)
+        return modified
+
+    async def delete_transformation(self, transformation_id: str) -> bool:
+        deleted = await self.repository.delete_transformation(transformation_id)
+        self._remove(transformation_id)
+        return deleted
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._by_id),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "reloads": self.reloads,
+            "generation": self.generation,
+            "age_seconds": round(self._clock() - self._loaded_at, 1) if self._loaded_at is not None else None,
+        }
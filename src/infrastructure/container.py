@@ -0,0 +1,177 @@
+import asyncio
+from typing import Optional, Type
+
+from discord.ext import commands
+
+from config.settings.base_settings import BaseSettings
+from src.core.services.character_service import CharacterService
+from src.core.services.combat_service import CombatService
+from src.core.services.levelup_service import LevelUpService
+from src.core.services.report_service import ReportService
+from src.core.services.transformation_service import TransformationService
+from src.infrastructure.cache.class_registry import ClassRegistry
+from src.infrastructure.cache.player_preferences_cache import CachedPlayerPreferencesRepository
+from src.infrastructure.cache.redis_repository import RedisRepository
+from src.infrastructure.cache.session_sweeper import CombatSessionSweeper
+from src.infrastructure.cache.transformation_catalog import TransformationCatalog
+from src.infrastructure.database.class_repository import ClassRepository
+from src.infrastructure.database.mongodb_repository import MongoDBRepository
+from src.infrastructure.database.ph_ledger_repository import PHLedgerRepository
+from src.infrastructure.database.player_preferences_repository import PlayerPreferencesRepository
+from src.infrastructure.database.transformation_repository import TransformationRepository
+from src.infrastructure.monitoring.instrumentation import InstrumentedRepository, MetricsRegistry, MongoCommandMetrics
+from src.utils.exceptions.infrastructure_exceptions import CacheError
+from src.utils.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ServiceContainer:
+    """
+    Contêiner de dependências compartilhado por todos os cogs.
+
+    Mantém um único cliente MongoDB (com pool de conexões) e um único cliente Redis,
+    e expõe os repositórios e serviços já montados sobre eles. As configurações vêm de
+    `BaseSettings` (ou da subclasse informada).
+    """
+
+    def __init__(self, mongodb_repository: MongoDBRepository, redis_repository: Optional[RedisRepository] = None,
+                 metrics: Optional[MetricsRegistry] = None, settings: Type[BaseSettings] = BaseSettings):
+        self.mongodb_repository = mongodb_repository
+        self.redis_repository = redis_repository
+        # Métricas de latência (!perf); None desativa a instrumentação dos repositórios
+        self.metrics = metrics
+        self.settings = settings
+        self.transformation_repository: Optional[TransformationCatalog] = None
+        self.class_repository: Optional[ClassRegistry] = None
+        self.player_preferences_repository: Optional[CachedPlayerPreferencesRepository] = None
+        self.ph_ledger_repository: Optional[PHLedgerRepository] = None
+        self.character_service: Optional[CharacterService] = None
+        self.levelup_service: Optional[LevelUpService] = None
+        self.report_service: Optional[ReportService] = None
+        self.transformation_service: Optional[TransformationService] = None
+        self.combat_service: Optional[CombatService] = None
+        # Limpeza periódica das sessões de combate expiradas (None sem Redis ou com intervalo 0)
+        self.session_sweeper: Optional[CombatSessionSweeper] = None
+        self.connected = False
+
+    @classmethod
+    def from_env(cls, settings: Type[BaseSettings] = BaseSettings) -> "ServiceContainer":
+        metrics = MetricsRegistry() if settings.INSTRUMENTATION_ENABLED else None
+        mongodb_repository = MongoDBRepository(
+            connection_string=settings.MONGODB_CONNECTION_STRING,
+            database_name=settings.MONGODB_DATABASE_NAME,
+            max_pool_size=settings.MONGODB_MAX_POOL_SIZE,
+            min_pool_size=settings.MONGODB_MIN_POOL_SIZE,
+            event_listeners=[MongoCommandMetrics(metrics)] if metrics else None,
+        )
+        redis_repository = RedisRepository(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_DB,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            metrics=metrics,
+        )
+        return cls(mongodb_repository, redis_repository, metrics, settings)
+
+    def _instrument(self, repository):
+        """Envolve o repositório com medição de latência por método quando as métricas estão ativas."""
+        if self.metrics is None:
+            return repository
+        return InstrumentedRepository(repository, self.metrics)
+
+    async def connect(self):
+        """Conecta MongoDB e Redis em paralelo e monta os repositórios e serviços."""
+        if self.connected:
+            return
+
+        connections = [self.mongodb_repository.connect()]
+        if self.redis_repository is not None:
+            connections.append(self.redis_repository.connect())
+        results = await asyncio.gather(*connections, return_exceptions=True)
+
+        if isinstance(results[0], BaseException):
+            # Sem MongoDB nenhum cog funciona; libera o Redis e propaga o erro.
+            if self.redis_repository is not None:
+                await self.redis_repository.disconnect()
+            raise results[0]
+        if len(results) > 1 and isinstance(results[1], BaseException):
+            if not isinstance(results[1], CacheError):
+                raise results[1]
+            # Sem Redis o serviço de combate fica None e o setup do cog de combate não o carrega;
+            # os demais cogs funcionam normalmente.
+            logger.warning(f"Redis indisponível, comandos de combate desativados: {results[1]}")
+            self.redis_repository = None
+
+        self._build()
+        await asyncio.gather(self.transformation_repository.load(), self.class_repository.load())
+        if self.session_sweeper is not None:
+            self.session_sweeper.start()
+        self.connected = True
+
+    def _build(self):
+        # Serviços recebem os repositórios instrumentados; as camadas em memória ficam por fora,
+        # então acertos de cache não aparecem como chamadas ao banco.
+        mongodb_repository = self._instrument(self.mongodb_repository)
+        redis_repository = self._instrument(self.redis_repository) if self.redis_repository is not None else None
+        # Leituras de transformações são servidas pelo catálogo em memória
+        self.transformation_repository = TransformationCatalog(
+            self._instrument(TransformationRepository(mongodb_repository)),
+            ttl_seconds=float(self.settings.TRANSFORMATION_CATALOG_TTL_SECONDS),
+        )
+        self.class_repository = ClassRegistry(self._instrument(ClassRepository(mongodb_repository)))
+        self.player_preferences_repository = CachedPlayerPreferencesRepository(
+            self._instrument(PlayerPreferencesRepository(mongodb_repository=mongodb_repository)),
+            max_entries=self.settings.PLAYER_PREFERENCES_CACHE_SIZE,
+        )
+        self.ph_ledger_repository = self._instrument(PHLedgerRepository(mongodb_repository))
+
+        self.character_service = CharacterService(
+            character_repository=mongodb_repository,
+            transformation_repository=self.transformation_repository,
+            class_repository=self.class_repository,
+            ph_ledger_repository=self.ph_ledger_repository,
+        )
+        self.levelup_service = LevelUpService(
+            character_service=self.character_service,
+            class_repository=self.class_repository,
+        )
+        self.report_service = ReportService(character_repository=mongodb_repository)
+        self.transformation_service = TransformationService(self.transformation_repository)
+        if redis_repository is not None:
+            self.combat_service = CombatService(
+                character_repository=mongodb_repository,
+                session_repository=redis_repository,
+                player_preferences_repository=self.player_preferences_repository,
+            )
+            sweep_interval = self.settings.REDIS_SESSION_SWEEP_INTERVAL_SECONDS
+            if sweep_interval > 0:
+                self.session_sweeper = CombatSessionSweeper(self.redis_repository, interval_seconds=sweep_interval,
+                                                            metrics=self.metrics)
+
+    def require_combat_service(self) -> CombatService:
+        if self.combat_service is None:
+            raise CacheError("Redis não conectado: serviço de combate indisponível.")
+        return self.combat_service
+
+    async def close(self):
+        """Fecha os clientes compartilhados. Seguro para ser chamado mais de uma vez."""
+        if self.session_sweeper is not None:
+            await self.session_sweeper.stop()
+        if self.redis_repository is not None:
+            await self.redis_repository.disconnect()
+        await self.mongodb_repository.disconnect()
+        self.connected = False
+
+
+async def get_container(bot: commands.Bot) -> ServiceContainer:
+    """
+    Retorna o contêiner do bot, criando e conectando um novo caso o bot ainda não tenha
+    (ex.: extensão carregada por um bot que não seja o RPGDiscordBot).
+    """
+    container: Optional[ServiceContainer] = getattr(bot, "container", None)
+    if container is None:
+        container = ServiceContainer.from_env()
+        setattr(bot, "container", container)
+    await container.connect()
+    return container
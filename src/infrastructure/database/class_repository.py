@@ -2,7 +2,7 @@ from src.infrastructure.database.mongodb_repository import MongoDBRepository
 from src.core.entities.class_template import ClassTemplate
 from src.utils.exceptions.infrastructure_exceptions import DatabaseConnectionError
 from bson.objectid import ObjectId
-from typing import Optional
+from typing import List, Optional
 
 class ClassRepository:
     def __init__(self, mongodb_repository: MongoDBRepository):
@@ -24,10 +24,15 @@ class ClassRepository:
             return ClassTemplate.from_dict(data)
         return None
     
+    async def get_all_classes(self) -> List[ClassTemplate]:
+        if self.collection is None:
+            raise DatabaseConnectionError("Conexão com a coleção de classes não estabelecida.")
+        return [ClassTemplate.from_dict(data) async for data in self.collection.find({})]
+
     async def get_class_by_name(self, class_name: str) -> Optional[ClassTemplate]:
         if self.collection is None:
             raise DatabaseConnectionError("Conexão com a coleção de classes não estabelecida.")
-        data = await self.collection.find_one({"nome": class_name})
+        data = await self.collection.find_one({"$or": [{"name": class_name}, {"nome": class_name}]})
         if data:
             return ClassTemplate.from_dict(data)
         return None
@@ -1,18 +1,32 @@
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.collation import Collation
 from pymongo.errors import ConnectionFailure, PyMongoError
 import re
-from typing import Dict, List, Optional, Any, Union
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple, Union
 from bson.objectid import ObjectId
 from src.core.entities.character import Character
+from src.core.entities.character_view import CharacterView, get_view_projection
 from src.core.entities.class_template import ClassTemplate
 from src.core.entities.player_preferences import PlayerPreferences
 from src.core.entities.transformation import Transformation
-from src.utils.exceptions.infrastructure_exceptions import DatabaseConnectionError, RepositoryError
+from src.utils.exceptions.infrastructure_exceptions import ConcurrentUpdateError, DatabaseConnectionError, RepositoryError
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
 
+# Collation de força 2 compara ignorando maiúsculas/minúsculas. Consultas por nome/apelido
+# precisam usar exatamente esta collation para que o MongoDB aproveite os índices abaixo.
+CASE_INSENSITIVE_COLLATION = Collation(locale="en", strength=2)
+
 class MongoDBRepository:
-    def __init__(self, connection_string: str, database_name: str):
+    def __init__(self, connection_string: str, database_name: str,
+                 max_pool_size: Optional[int] = None, min_pool_size: Optional[int] = None,
+                 event_listeners: Optional[List[Any]] = None):
         self.connection_string = connection_string
         self.database_name = database_name
+        self.max_pool_size = max_pool_size
+        self.min_pool_size = min_pool_size
+        # Listeners de monitoramento do pymongo (ex.: MongoCommandMetrics)
+        self.event_listeners = event_listeners
         self.client: Optional[AsyncIOMotorClient] = None
         self.db = None
         self.characters_collection: Optional[AsyncIOMotorCollection] = None
@@ -20,11 +34,19 @@ class MongoDBRepository:
         self.titulos_collection: Optional[AsyncIOMotorCollection] = None
         self.player_preferences_collection: Optional[AsyncIOMotorCollection] = None
         self.transformacoes_collection: Optional[AsyncIOMotorCollection] = None
+        self.ph_ledger_collection: Optional[AsyncIOMotorCollection] = None
         # A conexão será feita de forma assíncrona quando o bot for iniciado
 
     async def connect(self):
         try:
-            self.client = AsyncIOMotorClient(self.connection_string)
+            client_options: Dict[str, Any] = {}
+            if self.max_pool_size is not None:
+                client_options["maxPoolSize"] = self.max_pool_size
+            if self.min_pool_size is not None:
+                client_options["minPoolSize"] = self.min_pool_size
+            if self.event_listeners:
+                client_options["event_listeners"] = self.event_listeners
+            self.client = AsyncIOMotorClient(self.connection_string, **client_options)
             assert self.client is not None # Garante que self.client não é None
             # Test connection
             await self.client.admin.command('ping')
@@ -34,12 +56,45 @@ class MongoDBRepository:
             self.titulos_collection = self.db["titulos"]
             self.player_preferences_collection = self.db["player_preferences"]
             self.transformacoes_collection = self.db["transformacoes"]
+            self.ph_ledger_collection = self.db["ph_ledger"]
+            await self._ensure_indexes()
             print(f"Conectado ao MongoDB: {self.database_name}")
         except ConnectionFailure as e:
             raise DatabaseConnectionError(f"Falha ao conectar ao MongoDB: {e}")
         except Exception as e:
             raise DatabaseConnectionError(f"Erro inesperado ao conectar ao MongoDB: {e}")
 
+    async def _ensure_indexes(self):
+        """
+        Cria (de forma idempotente) os índices usados pelas consultas do repositório.
+        Falhas aqui não impedem a conexão: as consultas continuam funcionando, apenas sem índice.
+        """
+        if self.characters_collection is None:
+            return
+        try:
+            await self.characters_collection.create_index(
+                [("name", ASCENDING)], name="name_ci", collation=CASE_INSENSITIVE_COLLATION
+            )
+            await self.characters_collection.create_index(
+                [("alias", ASCENDING)], name="alias_ci", collation=CASE_INSENSITIVE_COLLATION
+            )
+            # Listagem por jogador ordenada por nome (paginação por chave em list_characters_by_player)
+            await self.characters_collection.create_index(
+                [("player_discord_id", ASCENDING), ("name", ASCENDING), ("_id", ASCENDING)],
+                name="player_name_ci", collation=CASE_INSENSITIVE_COLLATION,
+            )
+        except PyMongoError as e:
+            print(f"Aviso: não foi possível criar os índices de personagens: {e}")
+        if self.ph_ledger_collection is None:
+            return
+        try:
+            # Histórico de PH por personagem, do mais recente para o mais antigo (paginação por chave)
+            await self.ph_ledger_collection.create_index(
+                [("character_id", ASCENDING), ("data", DESCENDING), ("_id", DESCENDING)], name="character_data"
+            )
+        except PyMongoError as e:
+            print(f"Aviso: não foi possível criar os índices do ph_ledger: {e}")
+
     def __enter__(self):
         # Este método não será usado para operações assíncronas, mas é mantido para compatibilidade
         raise NotImplementedError("Use async context manager for MongoDBRepository")
@@ -85,6 +140,7 @@ class MongoDBRepository:
             result = await self.characters_collection.insert_one(character_dict)
             if not result.acknowledged:
                 raise RepositoryError("Falha ao salvar personagem: operação não reconhecida.")
+            character.mark_clean()
             return str(result.inserted_id)
         except PyMongoError as e:
             raise RepositoryError(f"Erro no banco de dados ao salvar personagem: {e}")
@@ -126,14 +182,11 @@ class MongoDBRepository:
         if self.characters_collection is None:
             raise DatabaseConnectionError("Conexão com a coleção de personagens não estabelecida.")
         try:
-            # Case-insensitive search for name or alias
-            data = await self.characters_collection.find_one({
-                "$or": [
-                    {"name": {"$regex": f"^{re.escape(name_or_alias)}$", "$options": "i"}},
-                    {"alias": {"$regex": f"^{re.escape(name_or_alias)}$", "$options": "i"}}
-                ]
-            })
-            print(f"[DEBUG] get_character_by_name_or_alias - Data retrieved: {data}")
+            # Igualdade com collation case-insensitive: usa os índices name_ci/alias_ci
+            data = await self.characters_collection.find_one(
+                {"$or": [{"name": name_or_alias}, {"alias": name_or_alias}]},
+                collation=CASE_INSENSITIVE_COLLATION,
+            )
             if data:
                 return Character.from_dict(data)
             return None
@@ -142,6 +195,98 @@ class MongoDBRepository:
         except Exception as e:
             raise RepositoryError(f"Erro inesperado ao buscar personagem por nome/apelido: {e}")
 
+    def _decode_character(self, data: Dict[str, Any], view: Optional[str]) -> Union[Character, CharacterView]:
+        return CharacterView.from_document(data, view) if view else Character.from_dict(data)
+
+    async def get_characters_by_ids(self, character_ids: List[Union[str, ObjectId]],
+                                    view: Optional[str] = None) -> Dict[str, Union[Character, CharacterView]]:
+        """
+        Busca vários personagens por _id com uma única consulta $in.
+        Retorna um dicionário {id em string: personagem}; ids não encontrados ficam de fora.
+        """
+        if self.characters_collection is None:
+            raise DatabaseConnectionError("Conexão com a coleção de personagens não estabelecida.")
+        object_ids = list({self._to_objectid(character_id) for character_id in character_ids})
+        if not object_ids:
+            return {}
+        projection = get_view_projection(view) if view else None
+        try:
+            cursor = self.characters_collection.find({"_id": {"$in": object_ids}}, projection)
+            return {str(data["_id"]): self._decode_character(data, view) async for data in cursor}
+        except PyMongoError as e:
+            raise RepositoryError(f"Erro no banco de dados ao buscar personagens por ID: {e}")
+        except Exception as e:
+            raise RepositoryError(f"Erro inesperado ao buscar personagens por ID: {e}")
+
+    async def get_characters_by_names(self, names: List[str],
+                                      view: Optional[str] = None) -> Dict[str, Union[Character, CharacterView]]:
+        """
+        Busca vários personagens por nome ou apelido (sem diferenciar maiúsculas) com uma única consulta $in.
+        Retorna um dicionário {nome como informado: personagem}; nomes não encontrados ficam de fora.
+        """
+        if self.characters_collection is None:
+            raise DatabaseConnectionError("Conexão com a coleção de personagens não estabelecida.")
+        unique_names = list(dict.fromkeys(name for name in names if name))
+        if not unique_names:
+            return {}
+        projection = get_view_projection(view) if view else None
+        try:
+            cursor = self.characters_collection.find(
+                {"$or": [{"name": {"$in": unique_names}}, {"alias": {"$in": unique_names}}]},
+                projection,
+                collation=CASE_INSENSITIVE_COLLATION,
+            )
+            by_name: Dict[str, Union[Character, CharacterView]] = {}
+            by_alias: Dict[str, Union[Character, CharacterView]] = {}
+            async for data in cursor:
+                character = self._decode_character(data, view)
+                by_name.setdefault(str(data.get("name") or "").casefold(), character)
+                if data.get("alias"):
+                    by_alias.setdefault(str(data["alias"]).casefold(), character)
+            # O nome tem prioridade sobre o apelido, como na busca individual
+            found = {}
+            for name in unique_names:
+                character = by_name.get(name.casefold()) or by_alias.get(name.casefold())
+                if character is not None:
+                    found[name] = character
+            return found
+        except PyMongoError as e:
+            raise RepositoryError(f"Erro no banco de dados ao buscar personagens por nome/apelido: {e}")
+        except Exception as e:
+            raise RepositoryError(f"Erro inesperado ao buscar personagens por nome/apelido: {e}")
+
+    async def list_characters_by_player(self, player_id: str, after: Optional[Tuple[str, ObjectId]] = None,
+                                        limit: int = 10, view: str = "summary"
+                                        ) -> Tuple[List[CharacterView], Optional[Tuple[str, ObjectId]]]:
+        """
+        Lista os personagens de um jogador em ordem alfabética (sem diferenciar maiúsculas), `limit` por vez.
+        `after` é o cursor (nome, _id) devolvido pela página anterior; a consulta usa o índice
+        player_name_ci, então o custo de cada página não depende de quantas páginas vieram antes.
+        Retorna (personagens, cursor da próxima página ou None).
+        """
+        if self.characters_collection is None:
+            raise DatabaseConnectionError("Conexão com a coleção de personagens não estabelecida.")
+        query: Dict[str, Any] = {"player_discord_id": str(player_id)}
+        if after is not None:
+            after_name, after_id = after
+            query["$or"] = [
+                {"name": {"$gt": after_name}},
+                {"name": after_name, "_id": {"$gt": after_id}},
+            ]
+        try:
+            cursor = self.characters_collection.find(
+                query, get_view_projection(view), collation=CASE_INSENSITIVE_COLLATION
+            ).sort([("name", ASCENDING), ("_id", ASCENDING)]).limit(limit + 1)
+            characters = [CharacterView.from_document(data, view) async for data in cursor]
+        except PyMongoError as e:
+            raise RepositoryError(f"Erro no banco de dados ao listar personagens do jogador: {e}")
+        except Exception as e:
+            raise RepositoryError(f"Erro inesperado ao listar personagens do jogador: {e}")
+        if len(characters) <= limit:
+            return characters, None
+        characters = characters[:limit]
+        return characters, (characters[-1].name, characters[-1].id)
+
     async def get_character_by_id_or_name(self, identifier: str) -> Optional[Character]:
         """
         Tenta buscar um personagem por _id (quando `identifier` é um ObjectId ou hex de 24 chars)
@@ -161,29 +306,136 @@ class MongoDBRepository:
         except Exception as e:
             raise RepositoryError(f"Erro inesperado ao buscar personagem: {e}")
 
+    async def get_character_view(self, identifier: Union[str, ObjectId], view: str) -> Optional[CharacterView]:
+        """
+        Busca um personagem por _id ou nome/apelido trazendo apenas os campos da visão informada
+        (ver CHARACTER_VIEWS). Retorna uma CharacterView somente leitura.
+        """
+        if self.characters_collection is None:
+            raise DatabaseConnectionError("Conexão com a coleção de personagens não estabelecida.")
+        projection = get_view_projection(view)
+        try:
+            if isinstance(identifier, ObjectId) or re.fullmatch(r'^[0-9a-fA-F]{24}$', str(identifier)):
+                data = await self.characters_collection.find_one({"_id": self._to_objectid(identifier)}, projection)
+            else:
+                data = await self.characters_collection.find_one(
+                    {"$or": [{"name": identifier}, {"alias": identifier}]},
+                    projection,
+                    collation=CASE_INSENSITIVE_COLLATION,
+                )
+            if data:
+                return CharacterView.from_document(data, view)
+            return None
+        except PyMongoError as e:
+            raise RepositoryError(f"Erro no banco de dados ao buscar visão '{view}' do personagem: {e}")
+        except RepositoryError:
+            raise
+        except Exception as e:
+            raise RepositoryError(f"Erro inesperado ao buscar visão '{view}' do personagem: {e}")
+
+    @staticmethod
+    def _version_filter(character_id: ObjectId, version: int) -> Dict[str, Any]:
+        # Documentos anteriores ao controle de versão não têm o campo: equivalem à versão 0
+        return {"_id": character_id, "version": {"$in": [0, None]} if not version else version}
+
+    async def _raise_if_conflict(self, character_id: ObjectId, version: int):
+        """Após um compare-and-set sem match, distingue personagem removido de versão desatualizada."""
+        if await self.characters_collection.count_documents({"_id": character_id}, limit=1):
+            raise ConcurrentUpdateError(
+                f"Personagem {character_id} foi alterado por outra operação (versão esperada: {version})."
+            )
+
     async def update_character(self, character: Character) -> bool:
+        """
+        Grava as alterações do personagem com compare-and-set na `version` lida do banco.
+        Levanta ConcurrentUpdateError se outra operação gravou o documento nesse intervalo.
+        """
         if self.characters_collection is None:
             raise DatabaseConnectionError("Conexão com a coleção de personagens não estabelecida.")
         try:
-            character_dict = character.to_dict()
             # Normaliza o id usado no filtro para ObjectId
             filter_id = self._to_objectid(getattr(character, "id", None))
             if filter_id is None:
                 raise RepositoryError("Identificador do personagem ausente para atualização.")
-            # Garante que o documento de substituição contenha o mesmo _id em tipo ObjectId
-            character_dict["_id"] = filter_id
-            # Remove possível chave 'id' para evitar campos inconsistentes
-            if "id" in character_dict:
-                character_dict.pop("id")
-            result = await self.characters_collection.replace_one({"_id": filter_id}, character_dict)
-            if not result.acknowledged:
-                raise RepositoryError("Falha ao atualizar personagem: operação não reconhecida.")
+            expected_version = character.version
+
+            changes = character.get_changes()
+            if changes is not None:
+                # Personagem carregado do banco: envia apenas os caminhos alterados
+                set_fields, unset_fields = changes
+                if not set_fields and not unset_fields:
+                    return False
+                updated_at = datetime.now(timezone.utc)
+                set_fields["updated_at"] = updated_at.isoformat()
+                update: Dict[str, Any] = {"$set": set_fields, "$inc": {"version": 1}}
+                if unset_fields:
+                    update["$unset"] = unset_fields
+                result = await self.characters_collection.update_one(
+                    self._version_filter(filter_id, expected_version), update
+                )
+                if not result.acknowledged:
+                    raise RepositoryError("Falha ao atualizar personagem: operação não reconhecida.")
+            else:
+                updated_at = character.updated_at
+                character_dict = character.to_dict()
+                # Garante que o documento de substituição contenha o mesmo _id em tipo ObjectId
+                character_dict["_id"] = filter_id
+                character_dict["version"] = expected_version + 1
+                # Remove possível chave 'id' para evitar campos inconsistentes
+                if "id" in character_dict:
+                    character_dict.pop("id")
+                result = await self.characters_collection.replace_one(
+                    self._version_filter(filter_id, expected_version), character_dict
+                )
+                if not result.acknowledged:
+                    raise RepositoryError("Falha ao atualizar personagem: operação não reconhecida.")
+
+            if result.matched_count == 0:
+                await self._raise_if_conflict(filter_id, expected_version)
+                return False
+            character.updated_at = updated_at
+            character.version = expected_version + 1
+            character.mark_clean()
             return result.modified_count > 0
         except PyMongoError as e:
             raise RepositoryError(f"Erro no banco de dados ao atualizar personagem: {e}")
+        except RepositoryError:
+            raise
         except Exception as e:
             raise RepositoryError(f"Erro inesperado ao atualizar personagem: {e}")
 
+    async def bulk_update_resources(self, updates: Dict[Union[str, ObjectId], Dict[str, int]]) -> int:
+        """
+        Grava hp/chakra/fp de vários personagens em um único bulk_write não ordenado.
+        `updates` mapeia o id do personagem para os recursos alterados, ex.: {id: {"hp": 10, "fp": 3}}.
+        Retorna a quantidade de personagens modificados.
+        """
+        if self.characters_collection is None:
+            raise DatabaseConnectionError("Conexão com a coleção de personagens não estabelecida.")
+        updated_at = datetime.now(timezone.utc).isoformat()
+        operations = []
+        for character_id, resources in updates.items():
+            set_fields = {field: value for field, value in resources.items() if field in ("hp", "chakra", "fp")}
+            if not set_fields:
+                continue
+            set_fields["updated_at"] = updated_at
+            operations.append(UpdateOne(
+                {"_id": self._to_objectid(character_id)}, {"$set": set_fields, "$inc": {"version": 1}}
+            ))
+        if not operations:
+            return 0
+        try:
+            result = await self.characters_collection.bulk_write(operations, ordered=False)
+            if not result.acknowledged:
+                raise RepositoryError("Falha ao atualizar recursos dos personagens: operação não reconhecida.")
+            return result.modified_count
+        except PyMongoError as e:
+            raise RepositoryError(f"Erro no banco de dados ao atualizar recursos dos personagens: {e}")
+        except RepositoryError:
+            raise
+        except Exception as e:
+            raise RepositoryError(f"Erro inesperado ao atualizar recursos dos personagens: {e}")
+
     async def delete_character(self, character_id: str) -> bool:
         if self.characters_collection is None:
             raise DatabaseConnectionError("Conexão com a coleção de personagens não estabelecida.")
@@ -197,21 +449,94 @@ class MongoDBRepository:
         except Exception as e:
             raise RepositoryError(f"Erro inesperado ao deletar personagem: {e}")
 
-    async def get_all_characters(self) -> List[Character]:
+    async def iter_characters(self, filter: Optional[Dict[str, Any]] = None, batch_size: int = 500,
+                              view: Optional[str] = None) -> AsyncIterator[Union[Character, CharacterView]]:
+        """
+        Percorre os personagens que atendem a `filter` sem carregar a coleção inteira na memória:
+        o cursor busca `batch_size` documentos por vez e cada um é decodificado sob demanda.
+        Com `view`, aplica a projeção correspondente e produz CharacterView em vez de Character.
+        """
         if self.characters_collection is None:
             raise DatabaseConnectionError("Conexão com a coleção de personagens não estabelecida.")
+        projection = get_view_projection(view) if view else None
         try:
-            characters = []
-            # Usar to_list(None) para obter todos os documentos de forma assíncrona
-            data_list = await self.characters_collection.find().to_list(None)
-            for data in data_list:
-                characters.append(Character.from_dict(data))
-            return characters
+            cursor = self.characters_collection.find(filter or {}, projection).batch_size(batch_size)
+            async for data in cursor:
+                yield CharacterView.from_document(data, view) if view else Character.from_dict(data)
         except PyMongoError as e:
-            raise RepositoryError(f"Erro no banco de dados ao buscar todos os personagens: {e}")
+            raise RepositoryError(f"Erro no banco de dados ao percorrer personagens: {e}")
+
+    async def get_all_characters(self) -> List[Character]:
+        if self.characters_collection is None:
+            raise DatabaseConnectionError("Conexão com a coleção de personagens não estabelecida.")
+        try:
+            # Prefira iter_characters em coleções grandes: aqui todos os personagens ficam em memória
+            return [character async for character in self.iter_characters()]
+        except RepositoryError:
+            raise
         except Exception as e:
             raise RepositoryError(f"Erro inesperado ao buscar todos os personagens: {e}")
 
+    @staticmethod
+    def _usage_statistics_pipeline() -> List[Dict[str, Any]]:
+        resource_totals = {
+            f"{prefix}{resource}": {"$sum": f"${prefix}{resource}"}
+            for resource in ("hp", "chakra", "fp") for prefix in ("", "max_")
+        }
+        return [
+            {"$facet": {
+                "totals": [
+                    {"$group": {"_id": None, "total_characters": {"$sum": 1}, "average_level": {"$avg": "$level"}, **resource_totals}},
+                ],
+                "classes": [
+                    {"$unwind": "$classe_ids"},
+                    {"$group": {"_id": "$classe_ids", "count": {"$sum": 1}}},
+                    {"$lookup": {"from": "classes", "localField": "_id", "foreignField": "_id", "as": "classe"}},
+                    # Classes antigas usam o campo 'nome'
+                    {"$project": {"count": 1, "name": {"$ifNull": [
+                        {"$arrayElemAt": ["$classe.name", 0]}, {"$arrayElemAt": ["$classe.nome", 0]},
+                    ]}}},
+                ],
+                "levels": [
+                    {"$group": {"_id": "$level", "count": {"$sum": 1}}},
+                    {"$sort": {"_id": 1}},
+                ],
+            }},
+        ]
+
+    async def aggregate_usage_statistics(self) -> Dict[str, Any]:
+        """
+        Calcula as estatísticas de uso no servidor (uma única agregação com $facet):
+        total de personagens, nível médio, distribuição por classe, histograma de níveis e
+        soma dos recursos atuais/máximos. Apenas os números agregados trafegam pela rede.
+        """
+        if self.characters_collection is None:
+            raise DatabaseConnectionError("Conexão com a coleção de personagens não estabelecida.")
+        try:
+            result = await self.characters_collection.aggregate(self._usage_statistics_pipeline()).to_list(1)
+            facets = result[0] if result else {}
+            totals = (facets.get("totals") or [{}])[0]
+
+            class_distribution: Dict[str, int] = {}
+            for entry in facets.get("classes", []):
+                class_name = entry.get("name") or str(entry["_id"])
+                class_distribution[class_name] = class_distribution.get(class_name, 0) + entry["count"]
+
+            return {
+                "total_characters": totals.get("total_characters", 0),
+                "average_level": totals.get("average_level") or 0,
+                "class_distribution": class_distribution,
+                "level_histogram": {entry["_id"]: entry["count"] for entry in facets.get("levels", [])},
+                "resource_totals": {
+                    resource: {"atual": totals.get(resource, 0), "maximo": totals.get(f"max_{resource}", 0)}
+                    for resource in ("hp", "chakra", "fp")
+                },
+            }
+        except PyMongoError as e:
+            raise RepositoryError(f"Erro no banco de dados ao agregar estatísticas de uso: {e}")
+        except Exception as e:
+            raise RepositoryError(f"Erro inesperado ao agregar estatísticas de uso: {e}")
+
     async def delete_all_characters(self) -> int:
         if self.characters_collection is None:
             raise DatabaseConnectionError("Conexão com a coleção de personagens não estabelecida.")
@@ -0,0 +1,140 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from bson.objectid import ObjectId
+from pymongo import DESCENDING
+from pymongo.errors import PyMongoError
+
+from src.infrastructure.database.mongodb_repository import MongoDBRepository
+from src.utils.exceptions.infrastructure_exceptions import DatabaseConnectionError, RepositoryError
+
+# Cursor de paginação do histórico: (data, _id) do último lançamento da página anterior
+HistoryCursor = Tuple[datetime, ObjectId]
+
+# Situação do lançamento: gravado como pendente antes da atualização do personagem e confirmado
+# (ou cancelado) depois dela. Lançamentos sem o campo são anteriores a ele e contam como confirmados.
+PENDING = "pendente"
+CONFIRMED = "confirmado"
+CANCELLED = "cancelado"
+
+
+class PHLedgerRepository:
+    """
+    Livro-razão de PH (coleção `ph_ledger`), somente de inclusão.
+
+    Cada gasto é um lançamento com `custo` positivo e cada reembolso um lançamento negativo;
+    o total líquido fica em `pontos.ph.gasto_total` no personagem. Os lançamentos são
+    indexados por (character_id, data, _id), o que atende ao histórico paginado e às somas
+    por personagem sem varrer a coleção.
+
+    O lançamento é gravado como pendente antes da atualização do personagem, então nunca há
+    cobrança sem histórico. Nas somas, gastos pendentes ainda não contam e reembolsos pendentes
+    já contam: dois reembolsos simultâneos não conseguem devolver o mesmo gasto duas vezes.
+    """
+
+    def __init__(self, mongodb_repository: MongoDBRepository):
+        self.mongodb_repository = mongodb_repository
+        self.collection = mongodb_repository.ph_ledger_collection
+
+    def _require_collection(self):
+        if self.collection is None:
+            raise DatabaseConnectionError("Conexão com a coleção ph_ledger não estabelecida.")
+
+    @staticmethod
+    def _character_id(character_id: Union[str, ObjectId]) -> ObjectId:
+        try:
+            return ObjectId(character_id)
+        except Exception:
+            raise RepositoryError(f"ID de personagem inválido para o ph_ledger: {character_id}")
+
+    async def append_entry(self, character_id: Union[str, ObjectId], descricao: str, custo: int,
+                           data: Optional[datetime] = None, status: str = CONFIRMED) -> Dict[str, Any]:
+        """Registra um lançamento (custo negativo para reembolsos) e retorna o documento gravado."""
+        self._require_collection()
+        entry = {
+            "character_id": self._character_id(character_id),
+            "descricao": descricao,
+            "custo": custo,
+            "tipo": "reembolso" if custo < 0 else "gasto",
+            "data": data or datetime.now(timezone.utc),
+            "status": status,
+        }
+        try:
+            result = await self.collection.insert_one(entry)
+            entry["_id"] = result.inserted_id
+            return entry
+        except PyMongoError as e:
+            raise RepositoryError(f"Erro no banco de dados ao registrar lançamento de PH: {e}")
+
+    async def set_entry_status(self, entry_id: ObjectId, status: str) -> bool:
+        """Confirma ou cancela um lançamento pendente. Retorna False se ele não estava mais pendente."""
+        self._require_collection()
+        try:
+            result = await self.collection.update_one({"_id": entry_id, "status": PENDING}, {"$set": {"status": status}})
+            return result.modified_count == 1
+        except PyMongoError as e:
+            raise RepositoryError(f"Erro no banco de dados ao atualizar lançamento de PH: {e}")
+
+    async def get_history(self, character_id: Union[str, ObjectId], limit: int = 10,
+                          before: Optional[HistoryCursor] = None
+                          ) -> Tuple[List[Dict[str, Any]], Optional[HistoryCursor]]:
+        """
+        Retorna até `limit` lançamentos, do mais recente para o mais antigo, e o cursor da próxima
+        página (None quando não há mais lançamentos). A paginação é por chave, sem skip.
+        """
+        self._require_collection()
+        query: Dict[str, Any] = {"character_id": self._character_id(character_id),
+                                 "status": {"$nin": [PENDING, CANCELLED]}}
+        if before is not None:
+            before_data, before_id = before
+            query["$or"] = [
+                {"data": {"$lt": before_data}},
+                {"data": before_data, "_id": {"$lt": before_id}},
+            ]
+        try:
+            cursor = self.collection.find(query).sort([("data", DESCENDING), ("_id", DESCENDING)]).limit(limit + 1)
+            entries = await cursor.to_list(length=limit + 1)
+        except PyMongoError as e:
+            raise RepositoryError(f"Erro no banco de dados ao buscar histórico de PH: {e}")
+        if len(entries) <= limit:
+            return entries, None
+        entries = entries[:limit]
+        return entries, (entries[-1]["data"], entries[-1]["_id"])
+
+    async def get_spent_by_description(self, character_id: Union[str, ObjectId],
+                                       descricao: Optional[str] = None) -> Dict[str, int]:
+        """
+        Soma líquida (gastos menos reembolsos) de PH por descrição, opcionalmente de uma só.
+        Ignora lançamentos cancelados e gastos pendentes; reembolsos pendentes já são descontados.
+        """
+        self._require_collection()
+        match: Dict[str, Any] = {"character_id": self._character_id(character_id), "status": {"$ne": CANCELLED}}
+        if descricao is not None:
+            match["descricao"] = descricao
+        pending_spend = {"$and": [{"$eq": ["$status", PENDING]}, {"$gt": ["$custo", 0]}]}
+        pipeline = [
+            {"$match": match},
+            {"$group": {"_id": "$descricao", "total": {"$sum": {"$cond": [pending_spend, 0, "$custo"]}}}},
+        ]
+        try:
+            return {row["_id"]: row["total"] async for row in self.collection.aggregate(pipeline)}
+        except PyMongoError as e:
+            raise RepositoryError(f"Erro no banco de dados ao somar gastos de PH: {e}")
+
+    async def delete_character_entries(self, character_id: Union[str, ObjectId]) -> int:
+        """Remove os lançamentos de um personagem (chamado quando o personagem é excluído)."""
+        self._require_collection()
+        try:
+            result = await self.collection.delete_many({"character_id": self._character_id(character_id)})
+            return result.deleted_count
+        except PyMongoError as e:
+            raise RepositoryError(f"Erro no banco de dados ao remover lançamentos de PH: {e}")
+
+    async def delete_all_entries(self) -> int:
+        """Remove todos os lançamentos (chamado quando todos os personagens são excluídos)."""
+        self._require_collection()
+        try:
+            result = await self.collection.delete_many({})
+            return result.deleted_count
+        except PyMongoError as e:
+            raise RepositoryError(f"Erro no banco de dados ao remover lançamentos de PH: {e}")
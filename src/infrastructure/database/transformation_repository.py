@@ -2,7 +2,7 @@ from src.infrastructure.database.mongodb_repository import MongoDBRepository
 from src.core.entities.transformation import Transformation
 from src.utils.exceptions.infrastructure_exceptions import DatabaseConnectionError
 from bson.objectid import ObjectId
-from typing import Optional
+from typing import List, Optional
 
 class TransformationRepository:
     def __init__(self, mongodb_repository: MongoDBRepository):
@@ -24,6 +24,11 @@ class TransformationRepository:
             return Transformation.from_dict(data)
         return None
 
+    async def get_all_transformations(self) -> List[Transformation]:
+        if self.collection is None:
+            raise DatabaseConnectionError("Conexão com a coleção de transformações não estabelecida.")
+        return [Transformation.from_dict(data) async for data in self.collection.find({})]
+
     async def get_transformation_by_name(self, name: str) -> Optional[Transformation]:
         if self.collection is None:
             raise DatabaseConnectionError("Conexão com a coleção de transformações não estabelecida.")
@@ -36,7 +41,7 @@ class TransformationRepository:
         if self.collection is None:
             raise DatabaseConnectionError("Conexão com a coleção de transformações não estabelecida.")
         transformation_dict = transformation.to_dict()
-        result = await self.collection.replace_one({"id": transformation.id}, transformation_dict)
+        result = await self.collection.replace_one({"id": str(transformation.id)}, transformation_dict)
         return result.modified_count > 0
 
     async def delete_transformation(self, transformation_id: str) -> bool:
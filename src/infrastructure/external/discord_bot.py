@@ -11,6 +11,8 @@ sys.path.append(str(Path(__file__).parent.parent.parent.parent))
 # Load environment variables from .env file
 load_dotenv()
 
+from src.infrastructure.container import ServiceContainer
+
 class RPGDiscordBot(commands.Bot):
     def __init__(self, command_prefix: str, intents: discord.Intents):
         super().__init__(command_prefix=command_prefix, intents=intents)
@@ -23,13 +25,21 @@ class RPGDiscordBot(commands.Bot):
             'src.application.commands.dice_commands',
             'src.application.commands.help_command',
             'src.application.commands.test_commands',
+            'src.application.commands.perf_commands',
         ]
+        # Conexões e serviços compartilhados por todos os cogs (um único pool por banco)
+        self.container: ServiceContainer = ServiceContainer.from_env()
 
     async def setup_hook(self):
+        await self.container.connect()
         for extension in self.initial_extensions:
             await self.load_extension(extension)
         print(f"Extensions loaded: {', '.join(self.initial_extensions)}")
 
+    async def close(self):
+        await super().close()
+        await self.container.close()
+
     async def on_ready(self):
         if self.user:
             print(f'Logged in as {self.user} (ID: {self.user.id})')
@@ -0,0 +1,287 @@
+"""
+Instrumentação de repositórios e drivers: histogramas de latência, erros e tamanho de payload.
+
+- `InstrumentedRepository` envolve qualquer repositório (mesma interface) e mede cada método assíncrono;
+- `MongoCommandMetrics` é um CommandListener do pymongo, registrado via `event_listeners` no cliente;
+- `instrument_redis_client` envolve `execute_command` (e pipelines) de um cliente redis.asyncio.
+
+Todas as medições vão para um `MetricsRegistry`, consultado pelo comando `!perf`.
+"""
+import bisect
+import functools
+import inspect
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import bson
+from pymongo import monitoring
+
+# Limites superiores (ms) dos baldes do histograma; o último balde é aberto (> 5000 ms)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    """Histograma de latência com baldes fixos, contagem de erros e bytes trafegados."""
+
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.payload_bytes = 0
+
+    def observe(self, elapsed_ms: float, error: bool = False, payload_bytes: int = 0):
+        self.counts[bisect.bisect_left(self.buckets_ms, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.payload_bytes += payload_bytes
+        if error:
+            self.errors += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Percentil aproximado pelo limite superior do balde (o máximo observado para o último balde)."""
+        if not self.count:
+            return 0.0
+        threshold = fraction * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= threshold:
+                if index < len(self.buckets_ms):
+                    return float(min(self.buckets_ms[index], self.max_ms))
+                break
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 3),
+            "payload_bytes": self.payload_bytes,
+            "buckets": {
+                **{f"le_{bound}": self.counts[i] for i, bound in enumerate(self.buckets_ms)},
+                "inf": self.counts[-1],
+            },
+        }
+
+
+class MetricsRegistry:
+    """
+    Conjunto de histogramas por operação ("mongo.find", "repo.MongoDBRepository.get_character", ...).
+    Thread-safe: o Motor executa o pymongo (e portanto os listeners) em threads do executor.
+    """
+
+    def __init__(self):
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def record(self, name: str, elapsed_ms: float, error: bool = False, payload_bytes: int = 0):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram()
+            histogram.observe(elapsed_ms, error, payload_bytes)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: histogram.snapshot() for name, histogram in sorted(self._histograms.items())}
+
+    def top(self, limit: int = 10, prefix: Optional[str] = None) -> List[tuple]:
+        """Operações ordenadas pelo tempo total gasto, opcionalmente filtradas por prefixo."""
+        items = [(name, data) for name, data in self.snapshot().items() if not prefix or name.startswith(prefix)]
+        return sorted(items, key=lambda item: item[1]["total_ms"], reverse=True)[:limit]
+
+    def to_json(self) -> str:
+        return json.dumps({"started_at": self.started_at, "captured_at": time.time(), "operations": self.snapshot()},
+                          indent=2)
+
+    def dump_json(self, path: str) -> str:
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(self.to_json())
+        return path
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self.started_at = time.time()
+
+
+class InstrumentedRepository:
+    """
+    Envolve um repositório e registra latência e erros de cada método assíncrono como
+    "repo.<Classe>.<método>". Geradores assíncronos (ex.: iter_characters) são medidos até o fim da iteração.
+    Atributos e métodos síncronos são repassados sem alteração.
+    """
+
+    def __init__(self, repository: Any, registry: MetricsRegistry, name: Optional[str] = None):
+        object.__setattr__(self, "_repository", repository)
+        object.__setattr__(self, "_registry", registry)
+        object.__setattr__(self, "_prefix", f"repo.{name or type(repository).__name__}")
+        object.__setattr__(self, "_wrapped", {})
+
+    def __getattr__(self, attribute: str):
+        value = getattr(self._repository, attribute)
+        if not callable(value) or attribute.startswith("_"):
+            return value
+        # Reaproveita o wrapper enquanto o método do repositório for o mesmo (pode ser trocado em testes)
+        function = getattr(value, "__func__", value)
+        cached = self._wrapped.get(attribute)
+        if cached is not None and cached[0] is function:
+            return cached[1]
+        wrapped = self._wrap(attribute, value)
+        self._wrapped[attribute] = (function, wrapped)
+        return wrapped
+
+    def __setattr__(self, attribute: str, value: Any):
+        setattr(self._repository, attribute, value)
+
+    def _wrap(self, attribute: str, method):
+        metric = f"{self._prefix}.{attribute}"
+        registry = self._registry
+
+        if inspect.isasyncgenfunction(method):
+            @functools.wraps(method)
+            async def wrapped_generator(*args, **kwargs):
+                start = time.perf_counter()
+                error = False
+                try:
+                    async for item in method(*args, **kwargs):
+                        yield item
+                except Exception:
+                    error = True
+                    raise
+                finally:
+                    registry.record(metric, (time.perf_counter() - start) * 1000, error)
+            return wrapped_generator
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def wrapped_coroutine(*args, **kwargs):
+                start = time.perf_counter()
+                error = False
+                try:
+                    return await method(*args, **kwargs)
+                except Exception:
+                    error = True
+                    raise
+                finally:
+                    registry.record(metric, (time.perf_counter() - start) * 1000, error)
+            return wrapped_coroutine
+        return method
+
+    def unwrap(self) -> Any:
+        return self._repository
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    Listener de monitoramento de comandos do pymongo. Registra "mongo.<comando>" com a duração medida
+    pelo driver e o tamanho em BSON do comando enviado e da resposta.
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self._request_sizes: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(event) -> tuple:
+        return event.connection_id, event.request_id, event.operation_id
+
+    @staticmethod
+    def _bson_size(document) -> int:
+        try:
+            return len(bson.encode(document))
+        except Exception:
+            return 0
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        size = self._bson_size(event.command)
+        with self._lock:
+            self._request_sizes[self._key(event)] = size
+
+    def _request_size(self, event) -> int:
+        with self._lock:
+            return self._request_sizes.pop(self._key(event), 0)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        payload = self._request_size(event) + self._bson_size(event.reply)
+        self.registry.record(f"mongo.{event.command_name}", event.duration_micros / 1000, False, payload)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        payload = self._request_size(event)
+        self.registry.record(f"mongo.{event.command_name}", event.duration_micros / 1000, True, payload)
+
+
+def _redis_payload_size(value: Any) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (list, tuple, set)):
+        return sum(_redis_payload_size(item) for item in value)
+    if isinstance(value, dict):
+        return sum(_redis_payload_size(k) + _redis_payload_size(v) for k, v in value.items())
+    return len(str(value))
+
+
+def instrument_redis_client(client, registry: MetricsRegistry):
+    """
+    Envolve `execute_command` de um cliente redis.asyncio (todas as chamadas diretas, inclusive EVALSHA)
+    e o `execute` dos pipelines criados por ele, registrando "redis.<COMANDO>" e "redis.PIPELINE".
+    """
+    if getattr(client, "_rpg_instrumented", False):
+        return client
+    execute_command = client.execute_command
+    create_pipeline = client.pipeline
+
+    async def timed_execute_command(*args, **options):
+        start = time.perf_counter()
+        error = False
+        response = None
+        try:
+            response = await execute_command(*args, **options)
+            return response
+        except Exception:
+            error = True
+            raise
+        finally:
+            name = str(args[0]).upper() if args else "UNKNOWN"
+            payload = _redis_payload_size(args[1:]) + _redis_payload_size(response)
+            registry.record(f"redis.{name}", (time.perf_counter() - start) * 1000, error, payload)
+
+    def instrumented_pipeline(*args, **kwargs):
+        pipeline = create_pipeline(*args, **kwargs)
+        execute = pipeline.execute
+
+        async def timed_execute(*exec_args, **exec_kwargs):
+            payload = sum(_redis_payload_size(command[0]) for command in getattr(pipeline, "command_stack", []))
+            start = time.perf_counter()
+            error = False
+            try:
+                return await execute(*exec_args, **exec_kwargs)
+            except Exception:
+                error = True
+                raise
+            finally:
+                registry.record("redis.PIPELINE", (time.perf_counter() - start) * 1000, error, payload)
+
+        pipeline.execute = timed_execute
+        return pipeline
+
+    client.execute_command = timed_execute_command
+    client.pipeline = instrumented_pipeline
+    client._rpg_instrumented = True
+    return client
@@ -10,6 +10,14 @@ class RepositoryError(InfrastructureException):
     """Raised when there's an issue with repository operations (e.g., save, get, update, delete)."""
     pass
 
+class ConcurrentUpdateError(RepositoryError):
+    """Raised when a compare-and-set write finds that the document version changed since it was read."""
+    pass
+
 class CacheError(InfrastructureException):
     """Raised when there's an issue with cache operations."""
-    pass
\ No newline at end of file
+    pass
+
+class BackupArchiveError(InfrastructureException):
+    """Raised when a backup archive or manifest is corrupted, truncated or fails checksum verification."""
+    pass
@@ -101,6 +101,8 @@ class Formatter:
         average_character_level = stats_data.get("average_character_level", 0.0)
 
         class_distribution_str = "\n".join([f"- {cls}: {count}" for cls, count in class_distribution.items()]) if class_distribution else "Nenhuma classe registrada."
+        level_histogram_str = "\n".join([f"- Nível {level}: {count}" for level, count in stats_data.get("level_histogram", {}).items()]) or "Nenhum personagem registrado."
+        resource_totals_str = "\n".join([f"- {resource.upper()}: {totals['atual']}/{totals['maximo']}" for resource, totals in stats_data.get("resource_totals", {}).items()])
 
         response_message = (
             f"**Estatísticas de Uso do RPG Bot**\n\n"
@@ -108,6 +110,9 @@ class Formatter:
             f"Nível Médio dos Personagens: {average_character_level}\n\n"
             f"**Distribuição de Classes:**\n"
             f"{class_distribution_str}\n\n"
-            f"*(Mais estatísticas em breve!)*"
+            f"**Personagens por Nível:**\n"
+            f"{level_histogram_str}\n\n"
+            f"**Recursos Totais (atual/máximo):**\n"
+            f"{resource_totals_str}"
         )
         return response_message
\ No newline at end of file
@@ -0,0 +1,30 @@
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class PageCursors:
+    """
+    Cursores da próxima página ("... mais") guardados pelos cogs, por chave (jogador, personagem...).
+
+    É um LRU de até `max_entries` chaves: quem nunca pede a próxima página acaba descartado em vez
+    de ficar na memória enquanto o bot estiver no ar. Guardar None (última página) remove a chave.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._cursors: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        return self._cursors.get(key)
+
+    def store(self, key: Hashable, cursor: Optional[Any]):
+        if cursor is None:
+            self._cursors.pop(key, None)
+            return
+        self._cursors[key] = cursor
+        self._cursors.move_to_end(key)
+        while len(self._cursors) > self.max_entries:
+            self._cursors.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._cursors)
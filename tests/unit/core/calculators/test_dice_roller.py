@@ -48,5 +48,17 @@ class TestDiceRoller(unittest.TestCase):
             DiceRoller.roll_dice("1d0")
         self.assertIn("Número de dados e lados devem ser maiores que zero", str(cm.exception))
 
+    def test_compile_parses_once_and_is_reusable(self):
+        formula = DiceRoller.compile("2d6+3!")
+        self.assertIs(DiceRoller.compile("2d6+3!"), formula)
+        self.assertEqual((formula.num_dice, formula.num_sides, formula.modifier, formula.is_explosive), (2, 6, 3, True))
+
+        with patch('secrets.randbelow', side_effect=[1, 3]):
+            self.assertEqual(DiceRoller.compile("2d6+1").roll(), (2 + 4 + 1, 0))
+
+    def test_compile_invalid_notation(self):
+        with self.assertRaises(ValueError):
+            DiceRoller.compile("invalid_notation")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,86 @@
+import asyncio
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, Mock
+
+from src.core.calculators.effective_stats import EffectiveStatsEngine, ModifierVector
+from src.core.entities.character import Character
+from src.core.entities.transformation import Transformation
+
+
+class TestModifierVector(unittest.TestCase):
+
+    def test_compile_and_combine(self):
+        first = ModifierVector.compile({"strength": 2, "hp": "50%", "ignored": "abc"})
+        second = ModifierVector.compile({"strength": 3, "hp": "10%"})
+        combined = ModifierVector.combine([first, second])
+
+        self.assertEqual(combined.additive, {"strength": 5})
+        self.assertAlmostEqual(combined.multiplicative["hp"], 1.5 * 1.1)
+
+
+class TestEffectiveStatsEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        self.transformation = Transformation(
+            name="Modo Sábio", description="", attribute_modifiers={"strength": 4, "dexterity": "50%", "hp": 20}
+        )
+        self.repository = Mock(spec=["get_transformation"])
+        self.repository.get_transformation = AsyncMock(return_value=self.transformation)
+        self.engine = EffectiveStatsEngine(self.repository, clock=lambda: self.now)
+        self.updated_at = datetime(2025, 12, 31, tzinfo=timezone.utc)
+        self.character_id = Character(name="Naruto").id
+
+    def _character(self, expires_in=timedelta(minutes=10)):
+        character = Character(
+            name="Naruto", attributes={"strength": 10, "dexterity": 10}, hp=50, max_hp=50,
+            transformacoes_ativas=[{"transformacao_id": self.transformation.id, "expires_at": self.now + expires_in}],
+        )
+        character.id = self.character_id
+        character.updated_at = self.updated_at
+        return character
+
+    def test_applies_additive_and_multiplicative_bonuses(self):
+        character = asyncio.run(self.engine.apply(self._character()))
+
+        self.assertEqual(character.attributes, {"strength": 14, "dexterity": 15})
+        self.assertEqual(character.max_hp, 70)
+        self.assertEqual(character.modifiers, {"strength": 3, "dexterity": 4})
+
+    def test_memoizes_by_character_version(self):
+        asyncio.run(self.engine.apply(self._character()))
+        second = asyncio.run(self.engine.apply(self._character()))
+
+        self.assertEqual(second.attributes["strength"], 14)
+        self.assertEqual(self.repository.get_transformation.await_count, 1)
+        self.assertEqual(self.engine.stats()["hits"], 1)
+
+        self.updated_at += timedelta(seconds=1)
+        asyncio.run(self.engine.apply(self._character()))
+        self.assertEqual(self.engine.stats()["misses"], 2)
+
+    def test_entry_expires_with_earliest_transformation(self):
+        asyncio.run(self.engine.apply(self._character(expires_in=timedelta(minutes=1))))
+        self.now += timedelta(minutes=2)
+
+        character = asyncio.run(self.engine.apply(self._character(expires_in=-timedelta(minutes=1))))
+
+        self.assertEqual(character.transformacoes_ativas, [])
+        self.assertEqual(character.attributes, {"strength": 10, "dexterity": 10})
+        self.assertEqual(character.max_hp, 50)
+
+    def test_catalog_generation_change_recompiles(self):
+        self.repository.generation = 1
+        asyncio.run(self.engine.apply(self._character()))
+        self.transformation.attribute_modifiers = {"strength": 1}
+        self.repository.generation = 2
+
+        character = asyncio.run(self.engine.apply(self._character()))
+
+        self.assertEqual(character.attributes["strength"], 11)
+        self.assertEqual(self.repository.get_transformation.await_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
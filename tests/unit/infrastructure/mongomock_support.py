@@ -0,0 +1,31 @@
+"""
+Apoio para testes com mongomock: o bulk_write do mongomock não é compatível com as
+operações do pymongo 4.x, então as operações são aplicadas uma a uma na coleção fake.
+"""
+from unittest.mock import Mock
+
+from pymongo import DeleteOne, InsertOne, ReplaceOne, UpdateOne
+
+
+def apply_bulk_write(collection, operations, ordered=True, **kwargs):
+    inserted = matched = modified = deleted = 0
+    upserted_ids = {}
+    for index, op in enumerate(operations):
+        if isinstance(op, InsertOne):
+            collection.insert_one(op._doc)
+            inserted += 1
+        elif isinstance(op, (UpdateOne, ReplaceOne)):
+            method = collection.update_one if isinstance(op, UpdateOne) else collection.replace_one
+            result = method(op._filter, op._doc, upsert=bool(op._upsert))
+            matched += result.matched_count
+            modified += result.modified_count
+            if result.upserted_id is not None:
+                upserted_ids[index] = result.upserted_id
+        elif isinstance(op, DeleteOne):
+            deleted += collection.delete_one(op._filter).deleted_count
+        else:
+            raise TypeError(f"Operação não suportada: {op!r}")
+    return Mock(
+        acknowledged=True, inserted_count=inserted, matched_count=matched, modified_count=modified,
+        deleted_count=deleted, upserted_count=len(upserted_ids), upserted_ids=upserted_ids,
+    )
@@ -0,0 +1,181 @@
+"""
+Apoio para testes do RedisRepository sem servidor Redis: um cliente assíncrono em memória com o
+subconjunto de comandos usado pelo repositório (strings, hashes, conjuntos,
+conjuntos ordenados, TTL, SCAN e pipelines), respondendo
+como um redis.asyncio.Redis com decode_responses=True. O TTL não corre sozinho; use `expire_now`.
+"""
+import fnmatch
+from typing import Any, Dict, List, Optional
+
+
+class FakeAsyncRedis:
+    def __init__(self):
+        self.data: Dict[str, Any] = {}
+        self.ttls: Dict[str, int] = {}
+        self.commands: List[tuple] = []
+
+    def _record(self, *command):
+        self.commands.append(command)
+
+    def _drop(self, key: str):
+        self.data.pop(key, None)
+        self.ttls.pop(key, None)
+
+    def expire_now(self, key: str):
+        self._drop(key)
+
+    async def ping(self):
+        return True
+
+    async def close(self):
+        pass
+
+    async def get(self, key: str) -> Optional[str]:
+        self._record("GET", key)
+        value = self.data.get(key)
+        return value if isinstance(value, str) else None
+
+    async def set(self, key: str, value: Any, ex: Optional[int] = None):
+        self._record("SET", key)
+        self.data[key] = str(value)
+        if ex is not None:
+            self.ttls[key] = int(ex)
+        else:
+            self.ttls.pop(key, None)
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        self._record("DEL", *keys)
+        removed = sum(1 for key in keys if key in self.data)
+        for key in keys:
+            self._drop(key)
+        return removed
+
+    async def exists(self, *keys: str) -> int:
+        self._record("EXISTS", *keys)
+        return sum(1 for key in keys if key in self.data)
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        self._record("EXPIRE", key)
+        if key not in self.data:
+            return False
+        self.ttls[key] = int(seconds)
+        return True
+
+    async def ttl(self, key: str) -> int:
+        self._record("TTL", key)
+        if key not in self.data:
+            return -2
+        return self.ttls.get(key, -1)
+
+    async def keys(self, pattern: str = "*") -> List[str]:
+        self._record("KEYS", pattern)
+        return [key for key in self.data if fnmatch.fnmatchcase(key, pattern)]
+
+    async def hset(self, key: str, field: Optional[str] = None, value: Any = None,
+                   mapping: Optional[Dict[str, Any]] = None) -> int:
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        self._record("HSET", key, *items)
+        target = self.data.setdefault(key, {})
+        added = sum(1 for name in items if name not in target)
+        target.update({name: str(item) for name, item in items.items()})
+        return added
+
+    async def hget(self, key: str, field: str) -> Optional[str]:
+        self._record("HGET", key, field)
+        return (self.data.get(key) or {}).get(field)
+
+    async def hgetall(self, key: str) -> Dict[str, str]:
+        self._record("HGETALL", key)
+        return dict(self.data.get(key) or {})
+
+    async def sadd(self, key: str, *members: str) -> int:
+        self._record("SADD", key, *members)
+        target = self.data.setdefault(key, set())
+        added = len(set(members) - target)
+        target.update(members)
+        return added
+
+    async def srem(self, key: str, *members: str) -> int:
+        self._record("SREM", key, *members)
+        target = self.data.get(key) or set()
+        removed = len(target & set(members))
+        target.difference_update(members)
+        if key in self.data and not target:
+            self._drop(key)
+        return removed
+
+    async def smembers(self, key: str) -> set:
+        self._record("SMEMBERS", key)
+        return set(self.data.get(key) or set())
+
+    async def sscan(self, key: str, cursor: int = 0, match: Optional[str] = None, count: Optional[int] = None):
+        """Pagina os membros em ordem; o cursor é o deslocamento (0 ao terminar)."""
+        self._record("SSCAN", key, cursor)
+        members = sorted(self.data.get(key) or set())
+        end = int(cursor) + (count or 10)
+        page = [member for member in members[int(cursor):end] if match is None or fnmatch.fnmatchcase(member, match)]
+        return (end if end < len(members) else 0), page
+
+    async def zadd(self, key: str, mapping: Dict[str, float], nx: bool = False) -> int:
+        self._record("ZADD", key, *mapping)
+        target = self.data.setdefault(key, {})
+        added = sum(1 for member in mapping if member not in target)
+        target.update({member: float(score) for member, score in mapping.items() if not nx or member not in target})
+        return added
+
+    async def zrem(self, key: str, *members: str) -> int:
+        self._record("ZREM", key, *members)
+        target = self.data.get(key) or {}
+        removed = sum(1 for member in members if target.pop(member, None) is not None)
+        if key in self.data and not target:
+            self._drop(key)
+        return removed
+
+    async def zscore(self, key: str, member: str) -> Optional[float]:
+        self._record("ZSCORE", key, member)
+        return (self.data.get(key) or {}).get(member)
+
+    async def zrangebyscore(self, key: str, min: Any, max: Any, start: Optional[int] = None,
+                            num: Optional[int] = None) -> List[str]:
+        self._record("ZRANGEBYSCORE", key, min, max)
+        low, high = float(min), float(max)
+        members = sorted((score, member) for member, score in (self.data.get(key) or {}).items()
+                         if low <= score <= high)
+        members = [member for _, member in members]
+        if start is not None:
+            members = members[start:start + num if num is not None and num >= 0 else None]
+        return members
+
+    async def scan_iter(self, match: str = "*", count: Optional[int] = None):
+        self._record("SCAN", match)
+        for key in list(self.data):
+            if fnmatch.fnmatchcase(key, match):
+                yield key
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Enfileira as chamadas e as executa em ordem no `execute`, como um pipeline do redis-py."""
+
+    def __init__(self, client: FakeAsyncRedis):
+        self.client = client
+        self.command_stack: List[tuple] = []
+
+    def __getattr__(self, name: str):
+        method = getattr(self.client, name)
+
+        def queue(*args, **kwargs):
+            self.command_stack.append((method, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self) -> List[Any]:
+        self.client._record("PIPELINE", len(self.command_stack))
+        results = [await method(*args, **kwargs) for method, args, kwargs in self.command_stack]
+        self.command_stack = []
+        return results
@@ -0,0 +1,116 @@
+import gzip
+import importlib.util
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import Mock
+
+import mongomock
+from bson.objectid import ObjectId
+
+from src.infrastructure.backup.bson_archive import (
+    ArchiveWriter, file_sha256, iter_archive, latest_manifest, read_manifest,
+)
+from src.utils.exceptions.infrastructure_exceptions import BackupArchiveError
+
+SCRIPT_PATH = Path(__file__).resolve().parents[3] / "scripts" / "backup" / "daily_backup.py"
+spec = importlib.util.spec_from_file_location("daily_backup", SCRIPT_PATH)
+daily_backup = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(daily_backup)
+
+
+class TestBsonArchive(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "characters.bson.gz")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip_and_checksum(self):
+        documents = [{"_id": ObjectId(), "name": f"P{i}", "nivel": i} for i in range(50)]
+        with ArchiveWriter(self.path) as writer:
+            writer.write_all(documents)
+
+        summary = writer.summary()
+        self.assertEqual(summary["documents"], 50)
+        self.assertEqual(summary["sha256"], file_sha256(self.path))
+        restored = [document["name"] for document in iter_archive(self.path)]
+        self.assertEqual(restored, [document["name"] for document in documents])
+
+    def test_truncated_archive_raises(self):
+        with ArchiveWriter(self.path) as writer:
+            writer.write({"name": "Aldric"})
+        with gzip.open(self.path, "rb") as handle:
+            data = handle.read()
+        with gzip.open(self.path, "wb") as handle:
+            handle.write(data[:-3])
+
+        with self.assertRaises(BackupArchiveError):
+            list(iter_archive(self.path))
+
+
+class TestDailyBackup(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.db = mongomock.MongoClient().rpg_bot_db
+        old = datetime.now(timezone.utc) - timedelta(days=2)
+        self.db.characters.insert_many([
+            {"_id": ObjectId(), "name": "Aldric", "updated_at": old.isoformat()},
+            {"_id": ObjectId(), "name": "Brina", "updated_at": old.isoformat()},
+        ])
+        self.db.ph_ledger.insert_one({"character_id": ObjectId(), "custo": 2, "data": old})
+        self.db.transformations.insert_one({"name": "Modo Sábio"})
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _backup(self, incremental=False):
+        return daily_backup.backup_database(self.db, self.directory.name, incremental=incremental,
+                                            batch_size=1, raw_documents=False)
+
+    def test_full_backup_writes_archives_and_manifest(self):
+        directory, manifest = self._backup()
+
+        self.assertEqual(read_manifest(directory), manifest)
+        self.assertEqual(manifest["mode"], "full")
+        self.assertEqual(manifest["archives"]["characters"]["documents"], 2)
+        for name, archive in manifest["archives"].items():
+            path = os.path.join(directory, archive["file"])
+            self.assertEqual(file_sha256(path), archive["sha256"])
+            self.assertEqual(len(list(iter_archive(path))), archive["documents"])
+
+    def test_incremental_backup_exports_only_changes_since_last_backup(self):
+        full_directory, _ = self._backup()
+        now = datetime.now(timezone.utc) + timedelta(seconds=1)
+        self.db.characters.update_one({"name": "Brina"}, {"$set": {"updated_at": now.isoformat()}})
+        self.db.ph_ledger.insert_one({"character_id": ObjectId(), "custo": 1, "data": now})
+
+        directory, manifest = self._backup(incremental=True)
+
+        self.assertEqual(manifest["mode"], "incremental")
+        self.assertEqual(manifest["base"], os.path.basename(full_directory))
+        self.assertEqual(manifest["archives"]["characters"]["documents"], 1)
+        self.assertEqual(manifest["archives"]["ph_ledger"]["documents"], 1)
+        # Sem updated_at: exportada por inteiro
+        self.assertFalse(manifest["archives"]["transformations"]["incremental"])
+        self.assertEqual(manifest["archives"]["transformations"]["documents"], 1)
+        self.assertEqual(latest_manifest(self.directory.name, "mongodb")["directory"], os.path.basename(directory))
+
+    def test_redis_backup_dumps_keys_with_ttl(self):
+        client = Mock()
+        client.scan_iter.return_value = iter([b"session:1", b"session:2", b"gone"])
+        pipeline = client.pipeline.return_value
+        pipeline.execute.return_value = [b"\x00dump1", 5000, b"\x00dump2", -1, None, -2]
+
+        directory, manifest = daily_backup.backup_redis(client, self.directory.name)
+
+        self.assertEqual(manifest["archives"]["redis"]["documents"], 2)
+        records = list(iter_archive(os.path.join(directory, daily_backup.REDIS_ARCHIVE)))
+        self.assertEqual([(bytes(r["key"]), r["ttl"]) for r in records], [(b"session:1", 5000), (b"session:2", 0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import Mock
+
+import mongomock
+from bson.objectid import ObjectId
+
+from src.infrastructure.backup.bson_archive import ArchiveReader, ArchiveWriter
+from src.utils.exceptions.infrastructure_exceptions import BackupArchiveError
+from tests.unit.infrastructure.mongomock_support import apply_bulk_write
+
+
+def _load_script(name):
+    path = Path(__file__).resolve().parents[3] / "scripts" / "backup" / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+daily_backup = _load_script("daily_backup")
+restore_backup = _load_script("restore_backup")
+
+
+class _Database:
+    """Banco mongomock cujas coleções aplicam bulk_write operação a operação."""
+
+    def __init__(self):
+        self.db = mongomock.MongoClient().restored_db
+
+    def __getitem__(self, name):
+        collection = self.db[name]
+        collection.bulk_write = lambda operations, **kwargs: apply_bulk_write(collection, operations, **kwargs)
+        return collection
+
+
+class TestRestoreBackup(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = mongomock.MongoClient().rpg_bot_db
+        old = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+        self.source.characters.insert_many(
+            [{"_id": ObjectId(), "name": f"P{i}", "nivel": i, "updated_at": old} for i in range(25)]
+        )
+        self.source.classes.insert_many([{"_id": ObjectId(), "name": "Mago"}, {"_id": ObjectId(), "name": "Bárbaro"}])
+        self.target = _Database()
+        self.messages = []
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _backup(self, incremental=False):
+        directory, _ = daily_backup.backup_database(self.source, self.directory.name, incremental=incremental,
+                                                    raw_documents=False)
+        return directory
+
+    def _restore(self, directory, **kwargs):
+        return restore_backup.restore_backup(self.target, directory, workers=2, batch_size=4,
+                                             raw_documents=False, **kwargs)
+
+    def test_full_restore_in_parallel(self):
+        results = self._restore(self._backup())
+
+        self.assertEqual(results["characters"]["inserted"], 25)
+        self.assertEqual(self.target.db.characters.count_documents({}), 25)
+        self.assertEqual(self.target.db.classes.find_one({"name": "Mago"})["name"], "Mago")
+
+    def test_restoring_twice_counts_duplicates(self):
+        directory = self._backup()
+        self._restore(directory)
+
+        results = self._restore(directory)
+
+        self.assertEqual(results["characters"]["duplicates"], 25)
+        self.assertEqual(self.target.db.characters.count_documents({}), 25)
+
+    def test_incremental_chain_upserts_changes(self):
+        full = self._backup()
+        self.source.characters.update_one(
+            {"name": "P3"},
+            {"$set": {"nivel": 99, "updated_at": (datetime.now(timezone.utc) + timedelta(seconds=1)).isoformat()}},
+        )
+        incremental = self._backup(incremental=True)
+
+        chain = restore_backup.resolve_chain(incremental)
+        for directory in chain:
+            self._restore(directory)
+
+        self.assertEqual([os.path.basename(path) for path in chain],
+                         [os.path.basename(full), os.path.basename(incremental)])
+        self.assertEqual(self.target.db.characters.find_one({"name": "P3"})["nivel"], 99)
+        self.assertEqual(self.target.db.characters.count_documents({}), 25)
+
+    def test_checksum_mismatch_aborts_before_writing(self):
+        directory = self._backup()
+        with open(os.path.join(directory, "classes.bson.gz"), "ab") as handle:
+            handle.write(b"lixo")
+
+        with self.assertRaises(BackupArchiveError):
+            self._restore(directory)
+        self.assertEqual(self.target.db.characters.count_documents({}), 0)
+
+    def test_reader_streams_from_mmap(self):
+        path = os.path.join(self.directory.name, "single.bson.gz")
+        with ArchiveWriter(path) as writer:
+            writer.write({"name": "Aldric"})
+
+        with ArchiveReader(path) as reader:
+            reader.verify(writer.summary()["sha256"])
+            self.assertIsNotNone(reader._buffer)
+            self.assertEqual([document["name"] for document in reader], ["Aldric"])
+
+    def test_redis_restore_uses_restore_with_replace(self):
+        client = Mock()
+        client.scan_iter.return_value = iter([b"session:1"])
+        client.pipeline.return_value.execute.return_value = [b"\x00dump", 1500]
+        directory, _ = daily_backup.backup_redis(client, self.directory.name)
+
+        target = Mock()
+        restored = restore_backup.restore_redis(target, directory)
+
+        self.assertEqual(restored, 1)
+        target.pipeline.return_value.restore.assert_called_once_with(b"session:1", 1500, b"\x00dump", replace=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import asyncio
+from unittest import TestCase
+from unittest.mock import AsyncMock, Mock, patch
+
+from src.core.calculators.attribute_calc import AttributeCalculator
+from src.core.calculators.dice_roller import DiceRoller
+from src.core.entities.character import Character
+from src.core.entities.class_template import ClassTemplate
+from src.core.services.character_service import CharacterService
+from src.infrastructure.cache.class_registry import ClassRegistry
+
+
+class TestClassRegistry(TestCase):
+    def setUp(self):
+        self.ninja = ClassTemplate.from_dict({"_id": "64b000000000000000000001", "nome": "Ninja", "hp_formula": "3d8+2"})
+        self.monge = ClassTemplate(name="Monge", description="", hp_formula="2d10")
+        self.repository = Mock()
+        self.repository.get_all_classes = AsyncMock(return_value=[self.ninja, self.monge])
+        self.repository.update_class = AsyncMock(return_value=True)
+        self.repository.get_class = AsyncMock()
+        self.registry = ClassRegistry(self.repository)
+        asyncio.run(self.registry.load())
+
+    def test_lookups_by_id_and_name_are_served_from_memory(self):
+        async def scenario():
+            return (
+                await self.registry.get_class(str(self.ninja.id)),
+                await self.registry.get_class_by_name("Ninja"),
+                await self.registry.get_class_by_name("Monge"),
+                await self.registry.get_class("64b0000000000000000000ff"),
+            )
+        by_id, by_nome, by_name, unknown = asyncio.run(scenario())
+
+        self.assertIs(by_id, self.ninja)
+        self.assertIs(by_nome, self.ninja)
+        self.assertIs(by_name, self.monge)
+        self.assertIsNone(unknown)
+        self.repository.get_class.assert_not_called()
+        with self.assertRaises(TypeError):
+            self.registry.classes["x"] = self.monge
+
+    def test_load_stores_compiled_formulas_on_each_template(self):
+        compiled = self.ninja.compiled_formulas
+
+        self.assertEqual(set(compiled), {"hp_formula", "chakra_formula", "fp_formula"})
+        self.assertEqual((compiled["hp_formula"].num_dice, compiled["hp_formula"].modifier), (3, 2))
+        self.assertEqual(self.monge.compiled_formulas["hp_formula"].num_sides, 10)
+        self.assertNotIn("compiled_formulas", self.ninja.to_dict())
+        with patch.object(DiceRoller, "compile", side_effect=AssertionError("recompilou")):
+            hp, _, _ = AttributeCalculator.roll_class_attributes(self.ninja)
+        self.assertTrue(5 <= hp <= 26)
+
+    def test_invalid_formula_is_skipped_and_changed_formula_is_recompiled(self):
+        broken = ClassTemplate(name="Quebrada", description="", hp_formula="abc")
+        self.repository.get_all_classes = AsyncMock(return_value=[broken])
+
+        asyncio.run(self.registry.reload())
+
+        self.assertNotIn("hp_formula", broken.compiled_formulas)
+        self.assertIn("fp_formula", broken.compiled_formulas)
+        broken.hp_formula = "1d1+9"
+        hp, _, _ = AttributeCalculator.roll_class_attributes(broken)
+        self.assertEqual(hp, 10)
+
+    def test_update_reloads_registry(self):
+        renamed = ClassTemplate(id=self.monge.id, name="Monge Guerreiro", description="")
+        self.repository.get_all_classes = AsyncMock(return_value=[self.ninja, renamed])
+
+        asyncio.run(self.registry.update_class(renamed))
+
+        self.assertIs(asyncio.run(self.registry.get_class_by_name("Monge Guerreiro")), renamed)
+        self.assertIsNone(asyncio.run(self.registry.get_class_by_name("Monge")))
+
+
+class TestCharacterServiceMulticlass(TestCase):
+    def test_add_multiclass_looks_up_class_by_name(self):
+        monge = ClassTemplate(name="Monge", description="", hp_formula="1d1+4", chakra_formula="1d1", fp_formula="1d1")
+        character = Character(name="Lee", max_hp=10)
+        class_repository = Mock()
+        class_repository.get_class_by_name = AsyncMock(return_value=monge)
+        character_repository = Mock()
+        character_repository.get_character_by_id_or_name = AsyncMock(return_value=character)
+        character_repository.update_character = AsyncMock()
+        service = CharacterService(character_repository, Mock(), class_repository)
+
+        asyncio.run(service.add_multiclass(str(character.id), "Monge"))
+
+        class_repository.get_class_by_name.assert_called_once_with("Monge")
+        self.assertIn(monge.id, character.classe_ids)
+        self.assertEqual(character.max_hp, 15)
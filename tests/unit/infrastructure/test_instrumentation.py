@@ -0,0 +1,124 @@
+import asyncio
+import json
+from unittest import TestCase
+from unittest.mock import Mock
+
+from src.infrastructure.monitoring.instrumentation import (
+    InstrumentedRepository, LatencyHistogram, MetricsRegistry, MongoCommandMetrics, instrument_redis_client,
+)
+from src.utils.exceptions.infrastructure_exceptions import RepositoryError
+
+
+class _Repository:
+    def __init__(self):
+        self.collection = "characters"
+
+    async def get(self, value):
+        return value
+
+    async def fail(self):
+        raise RepositoryError("falhou")
+
+    async def iterate(self):
+        for value in range(3):
+            yield value
+
+    def describe(self):
+        return "sync"
+
+
+class TestLatencyHistogram(TestCase):
+    def test_percentiles_use_bucket_bounds(self):
+        histogram = LatencyHistogram()
+        for elapsed in [0.5] * 90 + [40] * 9 + [7000]:
+            histogram.observe(elapsed)
+
+        snapshot = histogram.snapshot()
+        self.assertEqual((snapshot["p50_ms"], snapshot["p95_ms"], snapshot["p99_ms"]), (1.0, 50.0, 50.0))
+        self.assertEqual(snapshot["max_ms"], 7000)
+        self.assertEqual(snapshot["buckets"]["inf"], 1)
+
+
+class TestInstrumentedRepository(TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.repository = InstrumentedRepository(_Repository(), self.registry)
+
+    def test_records_latency_errors_and_generators(self):
+        async def scenario():
+            await self.repository.get(1)
+            with self.assertRaises(RepositoryError):
+                await self.repository.fail()
+            return [value async for value in self.repository.iterate()]
+
+        self.assertEqual(asyncio.run(scenario()), [0, 1, 2])
+        snapshot = self.registry.snapshot()
+        self.assertEqual(snapshot["repo._Repository.get"]["count"], 1)
+        self.assertEqual(snapshot["repo._Repository.fail"]["errors"], 1)
+        self.assertEqual(snapshot["repo._Repository.iterate"]["count"], 1)
+
+    def test_attributes_and_sync_methods_pass_through(self):
+        self.assertEqual(self.repository.describe(), "sync")
+        self.repository.collection = "outra"
+
+        self.assertEqual(self.repository.unwrap().collection, "outra")
+        self.assertEqual(self.registry.snapshot(), {})
+
+    def test_json_dump_contains_operations(self):
+        asyncio.run(self.repository.get(1))
+
+        self.assertIn("repo._Repository.get", json.loads(self.registry.to_json())["operations"])
+
+
+class TestMongoCommandMetrics(TestCase):
+    def test_records_command_duration_and_payload(self):
+        registry = MetricsRegistry()
+        listener = MongoCommandMetrics(registry)
+        ids = dict(connection_id=("localhost", 27017), request_id=1, operation_id=1)
+
+        listener.started(Mock(command={"find": "characters", "filter": {}}, **ids))
+        listener.succeeded(Mock(command_name="find", duration_micros=2500, reply={"ok": 1}, **ids))
+        listener.failed(Mock(command_name="update", duration_micros=1000, **dict(ids, request_id=2)))
+
+        snapshot = registry.snapshot()
+        self.assertEqual(snapshot["mongo.find"]["total_ms"], 2.5)
+        self.assertGreater(snapshot["mongo.find"]["payload_bytes"], 0)
+        self.assertEqual(snapshot["mongo.update"]["errors"], 1)
+
+
+class _FakePipeline:
+    def __init__(self):
+        self.command_stack = []
+
+    def hgetall(self, key):
+        self.command_stack.append((("HGETALL", key), {}))
+        return self
+
+    async def execute(self):
+        return [{} for _ in self.command_stack]
+
+
+class _FakeRedis:
+    async def execute_command(self, *args, **options):
+        return "valor"
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline()
+
+
+class TestRedisInstrumentation(TestCase):
+    def test_commands_and_pipelines_are_recorded(self):
+        registry = MetricsRegistry()
+        client = instrument_redis_client(_FakeRedis(), registry)
+
+        async def scenario():
+            await client.execute_command("get", "chave")
+            pipeline = client.pipeline()
+            pipeline.hgetall("a").hgetall("b")
+            return await pipeline.execute()
+
+        self.assertEqual(len(asyncio.run(scenario())), 2)
+        snapshot = registry.snapshot()
+        self.assertEqual(snapshot["redis.GET"]["payload_bytes"], len("chave") + len("valor"))
+        self.assertEqual(snapshot["redis.PIPELINE"]["count"], 1)
+        self.assertIs(instrument_redis_client(client, registry), client)
@@ -0,0 +1,109 @@
+import asyncio
+from unittest import TestCase
+from unittest.mock import AsyncMock, Mock
+
+from src.application.dtos.combat_dto import InitiativeEntryDTO
+from src.core.entities.character import Character
+from src.core.entities.character_view import CHARACTER_VIEWS, CharacterView
+from src.core.entities.combat_session import CombatSession
+from src.core.services.combat_service import CombatService
+from src.infrastructure.database.mongodb_repository import MongoDBRepository, CASE_INSENSITIVE_COLLATION
+from src.utils.exceptions.application_exceptions import CharacterNotFoundError
+
+
+class _AsyncCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+
+class TestMongoDBRepositoryBatchFetch(TestCase):
+    def setUp(self):
+        self.repo = MongoDBRepository("mongodb://localhost:27017", "testdb")
+        self.repo.characters_collection = Mock()
+        self.naruto = Character(name="Naruto", alias="Hokage")
+        self.sasuke = Character(name="Sasuke")
+
+    def test_get_characters_by_ids_uses_single_in_query(self):
+        self.repo.characters_collection.find = Mock(return_value=_AsyncCursor([self.naruto.to_dict()]))
+
+        found = asyncio.run(self.repo.get_characters_by_ids([str(self.naruto.id), self.sasuke.id], view="combat"))
+
+        self.repo.characters_collection.find.assert_called_once()
+        args, _ = self.repo.characters_collection.find.call_args
+        self.assertEqual(set(args[0]["_id"]["$in"]), {self.naruto.id, self.sasuke.id})
+        self.assertEqual(args[1], CHARACTER_VIEWS["combat"])
+        self.assertEqual(list(found), [str(self.naruto.id)])
+        self.assertIsInstance(found[str(self.naruto.id)], CharacterView)
+
+    def test_get_characters_by_names_maps_back_to_requested_names(self):
+        self.repo.characters_collection.find = Mock(
+            return_value=_AsyncCursor([self.naruto.to_dict(), self.sasuke.to_dict()])
+        )
+
+        found = asyncio.run(self.repo.get_characters_by_names(["naruto", "HOKAGE", "Orc", "Sasuke"]))
+
+        args, kwargs = self.repo.characters_collection.find.call_args
+        self.assertEqual(args[0]["$or"][0], {"name": {"$in": ["naruto", "HOKAGE", "Orc", "Sasuke"]}})
+        self.assertEqual(kwargs["collation"], CASE_INSENSITIVE_COLLATION)
+        self.assertEqual(set(found), {"naruto", "HOKAGE", "Sasuke"})
+        self.assertEqual(found["HOKAGE"].id, self.naruto.id)
+        self.assertIsInstance(found["Sasuke"], Character)
+
+    def test_empty_input_skips_query(self):
+        self.repo.characters_collection.find = Mock()
+        self.assertEqual(asyncio.run(self.repo.get_characters_by_names([])), {})
+        self.assertEqual(asyncio.run(self.repo.get_characters_by_ids([])), {})
+        self.repo.characters_collection.find.assert_not_called()
+
+
+class TestCombatServiceBatchInitiative(TestCase):
+    def setUp(self):
+        self.characters = [Character(name=f"P{i}", hp=10 + i) for i in range(3)]
+        self.views = {
+            str(c.id): CharacterView.from_document(c.to_dict(), "combat") for c in self.characters
+        }
+        self.character_repository = Mock()
+        self.session = CombatSession(guild_id="g", channel_id="c", player_id="p", character_id=None)
+        session_repository = Mock()
+        session_repository.get_combat_session = AsyncMock(return_value=self.session)
+        session_repository.update_combat_session = AsyncMock()
+        self.service = CombatService(self.character_repository, session_repository, Mock())
+
+    def _entries(self, ids):
+        entries = [InitiativeEntryDTO("s", f"P{i}", 0, "p", character_id=character_id) for i, character_id in enumerate(ids)]
+        entries.append(InitiativeEntryDTO("s", "Orc", 0, "p", is_npc=True))
+        return entries
+
+    def test_add_characters_fetches_party_in_one_call(self):
+        self.character_repository.get_characters_by_ids = AsyncMock(return_value=self.views)
+
+        asyncio.run(self.service.add_characters_to_initiative("s", self._entries(list(self.views))))
+
+        self.character_repository.get_characters_by_ids.assert_called_once_with(list(self.views), view="combat")
+        self.assertEqual(len(self.session.turn_order), 4)
+        self.assertEqual({e["hp"] for e in self.session.turn_order if e["type"] == "player"}, {10, 11, 12})
+
+    def test_add_characters_reports_missing_ids(self):
+        self.character_repository.get_characters_by_ids = AsyncMock(return_value={})
+
+        with self.assertRaises(CharacterNotFoundError):
+            asyncio.run(self.service.add_characters_to_initiative("s", self._entries(list(self.views)[:1])))
+
+    def test_resolve_participants_reports_misses(self):
+        view = self.views[str(self.characters[0].id)]
+        other = self.views[str(self.characters[1].id)]
+        self.character_repository.get_characters_by_names = AsyncMock(return_value={"P0": view})
+        self.character_repository.get_characters_by_ids = AsyncMock(return_value={str(other.id): other})
+
+        found, missing = asyncio.run(self.service.resolve_participants(["P0", str(other.id), "Orc"]))
+
+        self.assertEqual(found, {"P0": view, str(other.id): other})
+        self.assertEqual(missing, ["Orc"])
+        self.character_repository.get_characters_by_ids.assert_called_once_with([str(other.id)], view="combat")
@@ -0,0 +1,60 @@
+import asyncio
+from unittest import TestCase
+from unittest.mock import AsyncMock, Mock
+
+import mongomock
+
+from src.core.entities.character import Character
+from src.core.entities.combat_session import CombatSession
+from src.core.services.combat_service import CombatService
+from src.infrastructure.database.mongodb_repository import MongoDBRepository
+from tests.unit.infrastructure.mongomock_support import apply_bulk_write
+
+
+class TestBulkUpdateResources(TestCase):
+    def setUp(self):
+        self.collection = mongomock.MongoClient().db.characters
+        self.repo = MongoDBRepository("mongodb://localhost:27017", "testdb")
+        self.repo.characters_collection = Mock()
+        self.repo.characters_collection.bulk_write = AsyncMock(
+            side_effect=lambda operations, **kwargs: apply_bulk_write(self.collection, operations, **kwargs)
+        )
+        self.characters = [Character(name=f"P{i}", hp=10, max_hp=10, chakra=5, fp=3) for i in range(3)]
+        self.collection.insert_many([c.to_dict() for c in self.characters])
+
+    def test_single_unordered_bulk_write_sets_only_resources(self):
+        updates = {str(c.id): {"hp": 4, "chakra": 1, "fp": 0, "name": "ignorado"} for c in self.characters[:2]}
+
+        modified = asyncio.run(self.repo.bulk_update_resources(updates))
+
+        self.assertEqual(modified, 2)
+        self.repo.characters_collection.bulk_write.assert_called_once()
+        self.assertFalse(self.repo.characters_collection.bulk_write.call_args.kwargs["ordered"])
+        for character in self.characters[:2]:
+            stored = self.collection.find_one({"_id": character.id})
+            self.assertEqual((stored["hp"], stored["chakra"], stored["fp"], stored["name"]), (4, 1, 0, character.name))
+        untouched = self.collection.find_one({"_id": self.characters[2].id})
+        self.assertEqual(untouched["hp"], 10)
+
+    def test_no_updates_skips_round_trip(self):
+        self.assertEqual(asyncio.run(self.repo.bulk_update_resources({})), 0)
+        self.repo.characters_collection.bulk_write.assert_not_called()
+
+    def test_end_combat_session_persists_players_in_one_call(self):
+        session = CombatSession(guild_id="g", channel_id="c", player_id="p", character_id=None)
+        for character in self.characters:
+            session.add_player_entry(str(character.id), "p", character.name, 10, hp=2, chakra=1, fp=1)
+        session.add_npc_entry("Orc", 5)
+        session_repository = Mock()
+        session_repository.get_combat_session = AsyncMock(return_value=session)
+        session_repository.delete_combat_session = AsyncMock()
+        character_repository = Mock()
+        character_repository.bulk_update_resources = AsyncMock(return_value=3)
+        service = CombatService(character_repository, session_repository, Mock())
+
+        asyncio.run(service.end_combat_session(session.id, persist_changes=True))
+
+        character_repository.bulk_update_resources.assert_called_once()
+        (updates,), _ = character_repository.bulk_update_resources.call_args
+        self.assertEqual(set(updates), {str(c.id) for c in self.characters})
+        self.assertEqual(updates[str(self.characters[0].id)], {"hp": 2, "chakra": 1, "fp": 1})
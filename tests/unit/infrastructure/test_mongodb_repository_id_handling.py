@@ -31,3 +31,53 @@ class TestMongoDBRepositoryIDHandling(TestCase):
         filter_arg = called_args[0]
         self.assertIn("_id", filter_arg)
         self.assertIsInstance(filter_arg["_id"], ObjectId)
+
+    def _loaded_character(self):
+        return Character.from_dict(Character(name="Loaded", hp=10, max_hp=20).to_dict())
+
+    def test_update_loaded_character_sends_only_changed_paths(self):
+        repo = MongoDBRepository("mongodb://localhost:27017", "testdb")
+        mock_collection = Mock()
+        mock_collection.update_one = AsyncMock(return_value=Mock(acknowledged=True, modified_count=1))
+        mock_collection.replace_one = AsyncMock()
+        repo.characters_collection = mock_collection
+        character = self._loaded_character()
+        character.hp = 5
+        character.attributes["strength"] = 14
+        character.pontos["ph"]["total"] = 3
+
+        self.assertTrue(asyncio.run(repo.update_character(character)))
+
+        mock_collection.replace_one.assert_not_called()
+        filter_arg, update = mock_collection.update_one.call_args.args
+        self.assertEqual(filter_arg, {"_id": character.id, "version": {"$in": [0, None]}})
+        self.assertEqual(
+            set(update["$set"]),
+            {"hp", "attributes.strength", "pontos.ph.total", "updated_at"},
+        )
+        self.assertEqual(update["$inc"], {"version": 1})
+        self.assertNotIn("$unset", update)
+
+    def test_update_loaded_character_without_changes_skips_write(self):
+        repo = MongoDBRepository("mongodb://localhost:27017", "testdb")
+        mock_collection = Mock()
+        mock_collection.update_one = AsyncMock()
+        repo.characters_collection = mock_collection
+        character = self._loaded_character()
+
+        self.assertFalse(asyncio.run(repo.update_character(character)))
+        mock_collection.update_one.assert_not_called()
+
+        # Depois de gravar, o estado gravado vira a nova referência
+        mock_collection.update_one = AsyncMock(return_value=Mock(acknowledged=True, modified_count=1))
+        character.hp = 1
+        asyncio.run(repo.update_character(character))
+        self.assertEqual(character.get_changes(), ({}, {}))
+
+    def test_removed_nested_key_is_unset(self):
+        character = self._loaded_character()
+        del character.attributes["charisma"]
+
+        set_fields, unset_fields = character.get_changes()
+        self.assertEqual(set_fields, {})
+        self.assertEqual(unset_fields, {"attributes.charisma": ""})
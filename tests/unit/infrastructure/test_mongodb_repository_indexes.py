@@ -0,0 +1,29 @@
+import asyncio
+from unittest import TestCase
+from unittest.mock import AsyncMock, Mock
+
+from src.infrastructure.database.mongodb_repository import MongoDBRepository, CASE_INSENSITIVE_COLLATION
+
+
+class TestMongoDBRepositoryNameLookup(TestCase):
+    def setUp(self):
+        self.repo = MongoDBRepository("mongodb://localhost:27017", "testdb")
+        self.collection = Mock()
+        self.collection.create_index = AsyncMock()
+        self.collection.find_one = AsyncMock(return_value=None)
+        self.repo.characters_collection = self.collection
+
+    def test_ensure_indexes_creates_case_insensitive_indexes(self):
+        asyncio.run(self.repo._ensure_indexes())
+
+        created = {call.kwargs["name"]: call for call in self.collection.create_index.call_args_list}
+        self.assertEqual(set(created), {"name_ci", "alias_ci", "player_name_ci"})
+        for call in created.values():
+            self.assertEqual(call.kwargs["collation"], CASE_INSENSITIVE_COLLATION)
+
+    def test_lookup_uses_equality_with_collation(self):
+        asyncio.run(self.repo.get_character_by_name_or_alias("Naruto.*"))
+
+        args, kwargs = self.collection.find_one.call_args
+        self.assertEqual(args[0], {"$or": [{"name": "Naruto.*"}, {"alias": "Naruto.*"}]})
+        self.assertEqual(kwargs["collation"], CASE_INSENSITIVE_COLLATION)
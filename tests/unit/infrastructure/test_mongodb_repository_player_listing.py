@@ -0,0 +1,100 @@
+import asyncio
+from unittest import TestCase
+from unittest.mock import AsyncMock, Mock
+
+import mongomock
+
+from src.application.commands.character_commands import CharacterCommands
+from src.core.entities.character import Character
+from src.core.entities.character_view import CHARACTER_VIEWS, CharacterView
+from src.core.services.character_service import CharacterService
+from src.infrastructure.database.mongodb_repository import MongoDBRepository, CASE_INSENSITIVE_COLLATION
+
+
+class _AsyncCursor:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def sort(self, keys):
+        self.cursor = self.cursor.sort(keys)
+        return self
+
+    def limit(self, size):
+        self.cursor = self.cursor.limit(size)
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.cursor:
+            yield document
+
+
+class TestListCharactersByPlayer(TestCase):
+    def setUp(self):
+        self.collection = mongomock.MongoClient().db.characters
+        self.repo = MongoDBRepository("mongodb://localhost:27017", "testdb")
+        self.repo.characters_collection = Mock()
+        # O mongomock ignora collation: os nomes de teste já têm a mesma capitalização
+        self.repo.characters_collection.find = Mock(
+            side_effect=lambda query, projection, **kwargs: _AsyncCursor(self.collection.find(query, projection))
+        )
+        names = ["Sakura", "Naruto", "Kakashi", "Hinata", "Gaara"]
+        self.collection.insert_many(
+            [Character(name=name, player_discord_id="1").to_dict() for name in names]
+            + [Character(name="Sasuke", player_discord_id="2").to_dict()]
+        )
+
+    def test_pages_follow_name_order_until_exhausted(self):
+        pages, after = [], None
+        while True:
+            characters, after = asyncio.run(self.repo.list_characters_by_player("1", after=after, limit=2))
+            pages.append([c.name for c in characters])
+            if after is None:
+                break
+
+        self.assertEqual(pages, [["Gaara", "Hinata"], ["Kakashi", "Naruto"], ["Sakura"]])
+
+    def test_uses_summary_projection_and_collation(self):
+        characters, after = asyncio.run(self.repo.list_characters_by_player("2"))
+
+        args, kwargs = self.repo.characters_collection.find.call_args
+        self.assertEqual(args, ({"player_discord_id": "2"}, CHARACTER_VIEWS["summary"]))
+        self.assertEqual(kwargs["collation"], CASE_INSENSITIVE_COLLATION)
+        self.assertIsInstance(characters[0], CharacterView)
+        self.assertIsNone(after)
+
+
+class TestListCharactersCommand(TestCase):
+    """!ficha listar pagina pelo CharacterService, que usa o repositório acima."""
+
+    def setUp(self):
+        listing = TestListCharactersByPlayer("test_pages_follow_name_order_until_exhausted")
+        listing.setUp()
+        # 12 personagens do jogador 1: duas páginas de 10
+        listing.collection.insert_many([Character(name=f"Genin {i:02d}", player_discord_id="1").to_dict() for i in range(7)])
+        self.repo = listing.repo
+        self.service = CharacterService(self.repo, Mock(), Mock())
+        self.cog = CharacterCommands(Mock(), self.service, Mock(), Mock())
+        self.ctx = Mock(author=Mock(id=1, display_name="Kishimoto"), send=AsyncMock())
+
+    def _list(self, pagina=None):
+        asyncio.run(self.cog.list_characters.callback(self.cog, self.ctx, pagina))
+        return self.ctx.send.await_args.kwargs["embed"]
+
+    def test_service_pages_through_the_repository(self):
+        characters, after = asyncio.run(self.service.list_characters_by_player(1, limit=3))
+
+        self.assertEqual([c.name for c in characters], ["Gaara", "Genin 00", "Genin 01"])
+        self.assertIsNotNone(after)
+
+    def test_cursor_is_dropped_after_the_last_page(self):
+        first = self._list()
+        self.assertEqual(len(self.cog._list_cursors), 1)
+        self.assertIn("mais", first.footer.text)
+
+        last = self._list("mais")
+
+        self.assertIsNone(last.footer.text)
+        self.assertEqual(len(self.cog._list_cursors), 0)
@@ -0,0 +1,56 @@
+import asyncio
+from unittest import TestCase
+from unittest.mock import Mock
+
+import mongomock
+from bson.objectid import ObjectId
+
+from src.core.entities.character import Character
+from src.infrastructure.database.mongodb_repository import MongoDBRepository
+
+
+class _AggregateCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def to_list(self, length):
+        return self.documents[:length] if length else self.documents
+
+
+class TestMongoDBRepositoryUsageStatistics(TestCase):
+    def setUp(self):
+        self.db = mongomock.MongoClient().db
+        self.repo = MongoDBRepository("mongodb://localhost:27017", "testdb")
+        # Executa o pipeline real no mongomock por trás da interface assíncrona do Motor
+        self.repo.characters_collection = Mock()
+        self.repo.characters_collection.aggregate = lambda pipeline: _AggregateCursor(
+            list(self.db.characters.aggregate(pipeline))
+        )
+
+    def test_aggregates_classes_levels_and_resources(self):
+        ninja, monge = ObjectId(), ObjectId()
+        self.db.classes.insert_many([{"_id": ninja, "name": "Ninja"}, {"_id": monge, "nome": "Monge"}])
+        self.db.characters.insert_many([
+            Character(name="A", level=2, classe_ids=[ninja], hp=5, max_hp=10).to_dict(),
+            Character(name="B", level=4, classe_ids=[ninja, monge], hp=7, max_hp=7, chakra=3, max_chakra=9).to_dict(),
+            Character(name="C", level=4, classe_ids=[ObjectId()]).to_dict(),
+        ])
+
+        stats = asyncio.run(self.repo.aggregate_usage_statistics())
+
+        self.assertEqual(stats["total_characters"], 3)
+        self.assertAlmostEqual(stats["average_level"], 10 / 3)
+        self.assertEqual(stats["class_distribution"]["Ninja"], 2)
+        self.assertEqual(stats["class_distribution"]["Monge"], 1)
+        self.assertEqual(len(stats["class_distribution"]), 3)
+        self.assertEqual(stats["level_histogram"], {2: 1, 4: 2})
+        self.assertEqual(stats["resource_totals"]["hp"], {"atual": 12, "maximo": 17})
+        self.assertEqual(stats["resource_totals"]["chakra"], {"atual": 3, "maximo": 9})
+
+    def test_empty_collection(self):
+        stats = asyncio.run(self.repo.aggregate_usage_statistics())
+
+        self.assertEqual(stats["total_characters"], 0)
+        self.assertEqual(stats["average_level"], 0)
+        self.assertEqual(stats["class_distribution"], {})
+        self.assertEqual(stats["level_histogram"], {})
@@ -0,0 +1,104 @@
+import asyncio
+from unittest import TestCase
+from unittest.mock import AsyncMock, Mock
+
+import mongomock
+
+from src.core.entities.character import Character
+from src.core.services.character_service import CharacterService
+from src.infrastructure.database.mongodb_repository import MongoDBRepository
+from src.utils.exceptions.infrastructure_exceptions import ConcurrentUpdateError
+
+
+class _VersionedStoreTestCase(TestCase):
+    def setUp(self):
+        self.collection = mongomock.MongoClient().db.characters
+        self.repo = MongoDBRepository("mongodb://localhost:27017", "testdb")
+        self.repo.characters_collection = Mock()
+        for method in ("update_one", "replace_one", "count_documents"):
+            setattr(self.repo.characters_collection, method, AsyncMock(side_effect=getattr(self.collection, method)))
+        self.character = Character(name="Naruto", hp=10, max_hp=10)
+        self.collection.insert_one(self.character.to_dict())
+
+    def load(self) -> Character:
+        return Character.from_dict(self.collection.find_one({"_id": self.character.id}))
+
+
+class TestCompareAndSetUpdates(_VersionedStoreTestCase):
+    def test_update_increments_version(self):
+        character = self.load()
+        character.hp = 5
+
+        self.assertTrue(asyncio.run(self.repo.update_character(character)))
+
+        stored = self.collection.find_one({"_id": self.character.id})
+        self.assertEqual((stored["hp"], stored["version"]), (5, 1))
+        self.assertEqual(character.version, 1)
+
+    def test_stale_version_raises_and_keeps_other_write(self):
+        first, second = self.load(), self.load()
+        first.level = 2
+        second.hp = 1
+        asyncio.run(self.repo.update_character(first))
+
+        with self.assertRaises(ConcurrentUpdateError):
+            asyncio.run(self.repo.update_character(second))
+        self.assertEqual(self.collection.find_one({"_id": self.character.id})["hp"], 10)
+
+    def test_legacy_document_without_version_matches_version_zero(self):
+        self.collection.update_one({"_id": self.character.id}, {"$unset": {"version": ""}})
+        character = self.load()
+        character.hp = 7
+
+        asyncio.run(self.repo.update_character(character))
+
+        self.assertEqual(self.collection.find_one({"_id": self.character.id})["version"], 1)
+
+    def test_full_replace_is_also_conditional(self):
+        stale = Character(name="Naruto", hp=3, max_hp=10)
+        stale.id = self.character.id
+        self.collection.update_one({"_id": self.character.id}, {"$inc": {"version": 1}})
+
+        with self.assertRaises(ConcurrentUpdateError):
+            asyncio.run(self.repo.update_character(stale))
+
+    def test_missing_character_is_not_a_conflict(self):
+        self.collection.delete_one({"_id": self.character.id})
+        character = Character(name="Fantasma")
+        character.mark_clean()
+        character.hp = 1
+
+        self.assertFalse(asyncio.run(self.repo.update_character(character)))
+
+
+class TestUpdateWithRetry(_VersionedStoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.repo.get_character_by_id_or_name = AsyncMock(side_effect=lambda identifier: self.load())
+        self.service = CharacterService(self.repo, Mock(), Mock())
+
+    def test_reloads_and_reapplies_after_concurrent_write(self):
+        calls = []
+
+        def spend(character):
+            calls.append(character.version)
+            if len(calls) == 1:
+                # Outro comando grava o personagem entre a leitura e a escrita
+                self.collection.update_one({"_id": self.character.id}, {"$inc": {"hp": -4, "version": 1}})
+            character.level += 1
+
+        updated = asyncio.run(self.service.update_with_retry("Naruto", spend))
+
+        stored = self.collection.find_one({"_id": self.character.id})
+        self.assertEqual(calls, [0, 1])
+        self.assertEqual((stored["hp"], stored["level"], stored["version"]), (6, 2, 2))
+        self.assertEqual(updated.version, 2)
+
+    def test_gives_up_after_max_attempts(self):
+        def always_conflicts(character):
+            self.collection.update_one({"_id": self.character.id}, {"$inc": {"version": 1}})
+            character.level += 1
+
+        with self.assertRaises(ConcurrentUpdateError):
+            asyncio.run(self.service.update_with_retry("Naruto", always_conflicts, max_attempts=2))
+        self.assertEqual(self.repo.get_character_by_id_or_name.await_count, 2)
@@ -0,0 +1,119 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest import TestCase
+from unittest.mock import AsyncMock, Mock
+
+from src.core.entities.character import Character
+from src.core.entities.character_view import CHARACTER_VIEWS, CharacterView
+from src.core.services.character_service import CharacterService
+from src.infrastructure.database.mongodb_repository import MongoDBRepository, CASE_INSENSITIVE_COLLATION
+
+
+class TestMongoDBRepositoryCharacterViews(TestCase):
+    def setUp(self):
+        self.repo = MongoDBRepository("mongodb://localhost:27017", "testdb")
+        self.collection = Mock()
+        self.repo.characters_collection = self.collection
+        self.character = Character(name="Naruto", attributes={"strength": 14}, modifiers={"strength": 2}, hp=30, max_hp=40)
+
+    def test_view_by_name_uses_projection_and_collation(self):
+        document = {k: v for k, v in self.character.to_dict().items() if k == "_id" or k in CHARACTER_VIEWS["roll"]}
+        self.collection.find_one = AsyncMock(return_value=document)
+
+        view = asyncio.run(self.repo.get_character_view("naruto", "roll"))
+
+        args, kwargs = self.collection.find_one.call_args
+        self.assertEqual(args[1], CHARACTER_VIEWS["roll"])
+        self.assertEqual(kwargs["collation"], CASE_INSENSITIVE_COLLATION)
+        self.assertIsInstance(view, CharacterView)
+        self.assertEqual(view.id, self.character.id)
+        self.assertEqual(view.attributes["strength"], 14)
+        with self.assertRaises(TypeError):
+            view.attributes["strength"] = 20
+
+    def test_view_by_id_queries_object_id(self):
+        self.collection.find_one = AsyncMock(return_value=None)
+
+        asyncio.run(self.repo.get_character_view(str(self.character.id), "combat"))
+
+        args, _ = self.collection.find_one.call_args
+        self.assertEqual(args[0], {"_id": self.character.id})
+        self.assertEqual(args[1], CHARACTER_VIEWS["combat"])
+
+    def test_unknown_view_is_rejected(self):
+        with self.assertRaises(ValueError):
+            asyncio.run(self.repo.get_character_view("naruto", "full"))
+
+
+class _FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+        self.batch_size_value = None
+
+    def batch_size(self, size):
+        self.batch_size_value = size
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+
+class TestMongoDBRepositoryIterCharacters(TestCase):
+    def setUp(self):
+        self.repo = MongoDBRepository("mongodb://localhost:27017", "testdb")
+        self.repo.characters_collection = Mock()
+        self.documents = [Character(name=f"P{i}", level=i + 1).to_dict() for i in range(3)]
+        self.cursor = _FakeCursor(self.documents)
+        self.repo.characters_collection.find = Mock(return_value=self.cursor)
+
+    async def _collect(self, **kwargs):
+        return [item async for item in self.repo.iter_characters(**kwargs)]
+
+    def test_iter_characters_streams_full_characters_in_batches(self):
+        characters = asyncio.run(self._collect(filter={"level": {"$gt": 0}}, batch_size=2))
+
+        self.assertEqual([c.name for c in characters], ["P0", "P1", "P2"])
+        self.assertTrue(all(isinstance(c, Character) for c in characters))
+        self.repo.characters_collection.find.assert_called_once_with({"level": {"$gt": 0}}, None)
+        self.assertEqual(self.cursor.batch_size_value, 2)
+
+    def test_iter_characters_with_view_applies_projection(self):
+        views = asyncio.run(self._collect(view="summary"))
+
+        self.assertTrue(all(isinstance(v, CharacterView) for v in views))
+        self.repo.characters_collection.find.assert_called_once_with({}, CHARACTER_VIEWS["summary"])
+
+
+class TestCharacterServiceRollStats(TestCase):
+    def _service(self, view):
+        repo = Mock()
+        repo.get_character_view = AsyncMock(return_value=view)
+        service = CharacterService(repo, Mock(), Mock())
+        service.get_character_with_effective_stats = AsyncMock(return_value="effective")
+        return service
+
+    def test_roll_stats_uses_view_without_active_transformations(self):
+        expired = datetime.now(timezone.utc) - timedelta(minutes=1)
+        view = CharacterView.from_document(
+            {"_id": Character(name="x").id, "name": "x", "transformacoes_ativas": [{"expires_at": expired.isoformat()}]},
+            "roll",
+        )
+        service = self._service(view)
+
+        self.assertIs(asyncio.run(service.get_roll_stats("x")), view)
+        service.get_character_with_effective_stats.assert_not_called()
+
+    def test_roll_stats_falls_back_to_effective_stats(self):
+        expires = datetime.now(timezone.utc) + timedelta(minutes=5)
+        view = CharacterView.from_document(
+            {"_id": Character(name="x").id, "name": "x", "transformacoes_ativas": [{"expires_at": expires}]},
+            "roll",
+        )
+        service = self._service(view)
+
+        self.assertEqual(asyncio.run(service.get_roll_stats("x")), "effective")
+        service.get_character_with_effective_stats.assert_called_once_with(str(view.id))
@@ -0,0 +1,102 @@
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import mongomock
+from bson.objectid import ObjectId
+
+from tests.unit.infrastructure.mongomock_support import apply_bulk_write
+
+SCRIPT_PATH = Path(__file__).resolve().parents[3] / "scripts" / "migration" / "convert_string_ids_to_objectid.py"
+spec = importlib.util.spec_from_file_location("convert_string_ids_to_objectid", SCRIPT_PATH)
+migration = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(migration)
+
+
+class TestObjectIdMigration(unittest.TestCase):
+    def setUp(self):
+        self.collection = mongomock.MongoClient().db.characters
+        self.collection.bulk_write = lambda operations, **kwargs: apply_bulk_write(self.collection, operations, **kwargs)
+        self.ids = [str(ObjectId()) for _ in range(7)]
+        self.collection.insert_many([{"_id": value, "name": f"P{index}"} for index, value in enumerate(self.ids)])
+        self.collection.insert_one({"_id": "nao-e-hex", "name": "Legado"})
+        self.collection.insert_one({"_id": ObjectId(), "name": "Novo"})
+        self.messages = []
+
+    def test_dry_run_counts_without_writing(self):
+        result = migration.convert_collection(self.collection, batch_size=3, concurrency=2, report=self.messages.append)
+
+        self.assertEqual(result["documents"], 7)
+        self.assertEqual(self.collection.count_documents({"_id": {"$type": "string"}}), 8)
+
+    def test_apply_converts_in_batches_and_keeps_fields(self):
+        checkpoint = migration.Checkpoint(None)
+
+        result = migration.convert_collection(
+            self.collection, apply_changes=True, batch_size=3, concurrency=2,
+            checkpoint=checkpoint, report=self.messages.append,
+        )
+
+        self.assertEqual(result["documents"], 7)
+        self.assertEqual(self.collection.count_documents({"_id": {"$type": "string"}}), 1)
+        converted = self.collection.find_one({"_id": ObjectId(self.ids[4])})
+        self.assertEqual(converted["name"], "P4")
+        # Execução concluída: o checkpoint da coleção é descartado
+        self.assertIsNone(checkpoint.last_id("characters"))
+        # 3 lotes em rodadas de 2: duas rodadas relatadas
+        self.assertEqual(len(self.messages), 2)
+
+    def test_resumes_from_checkpoint_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "checkpoint.json")
+            ordered_ids = sorted(self.ids)
+            with open(path, "w", encoding="utf-8") as handle:
+                json.dump({"characters": {"last_id": ordered_ids[2], "converted": 3}}, handle)
+
+            result = migration.convert_collection(
+                self.collection, apply_changes=True, batch_size=2, concurrency=1,
+                checkpoint=migration.Checkpoint(path), report=self.messages.append,
+            )
+
+            self.assertEqual(result["processed"], 4)
+            self.assertEqual(result["documents"], 7)
+            # Os documentos anteriores ao checkpoint não são revisitados
+            for value in ordered_ids[:3]:
+                self.assertIsNotNone(self.collection.find_one({"_id": value}))
+            self.assertIn("Retomando", self.messages[0])
+            # Era a única coleção no checkpoint: o arquivo é removido ao terminar
+            self.assertFalse(os.path.exists(path))
+
+    def test_completed_run_does_not_skip_new_string_ids_on_the_next_run(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "checkpoint.json")
+            with open(path, "w", encoding="utf-8") as handle:
+                json.dump({"classes": {"last_id": "f" * 24, "converted": 1}}, handle)
+            migration.convert_collection(self.collection, apply_changes=True, batch_size=3,
+                                         checkpoint=migration.Checkpoint(path), report=self.messages.append)
+            late_id = "0" * 24
+            self.collection.insert_one({"_id": late_id, "name": "Atrasado"})
+
+            result = migration.convert_collection(self.collection, apply_changes=True, batch_size=3,
+                                                  checkpoint=migration.Checkpoint(path), report=self.messages.append)
+
+            self.assertEqual(result["documents"], 1)
+            self.assertIsNotNone(self.collection.find_one({"_id": ObjectId(late_id)}))
+            with open(path, encoding="utf-8") as handle:
+                self.assertEqual(json.load(handle), {"classes": {"last_id": "f" * 24, "converted": 1}})
+
+    def test_rerunning_a_batch_is_idempotent(self):
+        documents = migration.fetch_batch(self.collection, None, 2)
+        migration.write_batch(self.collection, documents)
+        migration.write_batch(self.collection, documents)
+
+        for document in documents:
+            self.assertIsNone(self.collection.find_one({"_id": document["_id"]}))
+            self.assertEqual(self.collection.count_documents({"_id": ObjectId(document["_id"])}), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,236 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest import TestCase
+from unittest.mock import AsyncMock, Mock
+
+import mongomock
+
+from src.application.commands.points_commands import PointsCommands
+from src.core.entities.character import Character
+from src.core.services.character_service import CharacterService
+from src.infrastructure.database.ph_ledger_repository import CANCELLED, CONFIRMED, PENDING, PHLedgerRepository
+from src.utils.exceptions.application_exceptions import InvalidInputError
+from src.utils.exceptions.infrastructure_exceptions import ConcurrentUpdateError
+
+
+class _AsyncCursor:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def sort(self, keys):
+        self.cursor = self.cursor.sort(keys)
+        return self
+
+    def limit(self, size):
+        self.cursor = self.cursor.limit(size)
+        return self
+
+    async def to_list(self, length):
+        return list(self.cursor)[:length]
+
+
+class _AsyncCollection:
+    """Adapta uma coleção do mongomock à interface assíncrona usada pelo repositório."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def insert_one(self, document):
+        return self.collection.insert_one(document)
+
+    async def update_one(self, query, update):
+        return self.collection.update_one(query, update)
+
+    async def delete_many(self, query):
+        return self.collection.delete_many(query)
+
+    def find(self, query):
+        return _AsyncCursor(self.collection.find(query))
+
+    async def aggregate(self, pipeline):
+        for row in self.collection.aggregate(pipeline):
+            yield row
+
+
+class TestPHLedgerRepository(TestCase):
+    def setUp(self):
+        self.collection = mongomock.MongoClient().db.ph_ledger
+        self.ledger = PHLedgerRepository(Mock(ph_ledger_collection=_AsyncCollection(self.collection)))
+        self.character_id = Character(name="Naruto").id
+        self.start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    def _append(self, descricao, custo, minutes):
+        return asyncio.run(self.ledger.append_entry(
+            str(self.character_id), descricao, custo, data=self.start + timedelta(minutes=minutes)
+        ))
+
+    def test_history_is_paginated_newest_first(self):
+        for minute in range(5):
+            self._append(f"Técnica {minute}", 1, minute)
+        asyncio.run(self.ledger.append_entry(Character(name="Sasuke").id, "Outro personagem", 1))
+
+        first, cursor = asyncio.run(self.ledger.get_history(self.character_id, limit=2))
+        second, cursor = asyncio.run(self.ledger.get_history(self.character_id, limit=2, before=cursor))
+        third, cursor = asyncio.run(self.ledger.get_history(self.character_id, limit=2, before=cursor))
+
+        self.assertEqual([e["descricao"] for e in first + second + third],
+                         [f"Técnica {m}" for m in (4, 3, 2, 1, 0)])
+        self.assertIsNone(cursor)
+
+    def test_refunds_are_negative_entries_netted_by_description(self):
+        self._append("Rasengan", 3, 0)
+        self._append("Rasengan", 2, 1)
+        refund = self._append("Rasengan", -4, 2)
+        self._append("Kage Bunshin", 5, 3)
+
+        spent = asyncio.run(self.ledger.get_spent_by_description(self.character_id))
+
+        self.assertEqual(refund["tipo"], "reembolso")
+        self.assertEqual(spent, {"Rasengan": 1, "Kage Bunshin": 5})
+        self.assertEqual(self.collection.count_documents({}), 4)
+
+
+    def test_pending_spends_and_cancelled_entries_are_not_refundable(self):
+        self._append("Rasengan", 5, 0)
+        asyncio.run(self.ledger.append_entry(self.character_id, "Rasengan", 3, status=PENDING))
+        refund = asyncio.run(self.ledger.append_entry(self.character_id, "Rasengan", -2, status=PENDING))
+        cancelled = asyncio.run(self.ledger.append_entry(self.character_id, "Rasengan", -5, status=PENDING))
+        asyncio.run(self.ledger.set_entry_status(cancelled["_id"], CANCELLED))
+
+        spent = asyncio.run(self.ledger.get_spent_by_description(self.character_id, "Rasengan"))
+        history, _ = asyncio.run(self.ledger.get_history(self.character_id))
+
+        self.assertEqual(spent, {"Rasengan": 3})
+        self.assertEqual([entry["custo"] for entry in history], [5])
+        self.assertTrue(asyncio.run(self.ledger.set_entry_status(refund["_id"], CONFIRMED)))
+        self.assertFalse(asyncio.run(self.ledger.set_entry_status(refund["_id"], CANCELLED)))
+
+    def test_entries_are_deleted_with_the_character(self):
+        self._append("Rasengan", 3, 0)
+        asyncio.run(self.ledger.append_entry(Character(name="Sasuke").id, "Chidori", 2))
+
+        self.assertEqual(asyncio.run(self.ledger.delete_character_entries(self.character_id)), 1)
+        self.assertEqual(asyncio.run(self.ledger.delete_all_entries()), 1)
+        self.assertEqual(self.collection.count_documents({}), 0)
+
+
+class TestPHChangeFlow(TestCase):
+    """Fluxo de !gastar ph / !refund ph: lançamento pendente, atualização do personagem, confirmação."""
+
+    def setUp(self):
+        self.collection = mongomock.MongoClient().db.ph_ledger
+        self.ledger = PHLedgerRepository(Mock(ph_ledger_collection=_AsyncCollection(self.collection)))
+        self.character = Character(name="Naruto")
+        self.character_service = Mock()
+        self.character_service.get_character = AsyncMock(return_value=self.character)
+
+        async def update_with_retry(name, apply):
+            await asyncio.sleep(0)
+            apply(self.character)
+            return self.character
+
+        self.character_service.update_with_retry = AsyncMock(side_effect=update_with_retry)
+        self.cog = PointsCommands(Mock(), self.character_service, self.ledger)
+
+    def _statuses(self):
+        return sorted((entry["custo"], entry["status"]) for entry in self.collection.find())
+
+    def test_failed_update_cancels_the_pending_entry(self):
+        self.character_service.update_with_retry = AsyncMock(side_effect=InvalidInputError("PH insuficiente"))
+
+        with self.assertRaises(InvalidInputError):
+            asyncio.run(self.cog._apply_ph_change("Naruto", "Rasengan", 3, lambda character: None))
+
+        self.assertEqual(self._statuses(), [(3, CANCELLED)])
+
+    def test_conflicting_update_cancels_the_pending_entry(self):
+        self.character_service.update_with_retry = AsyncMock(side_effect=ConcurrentUpdateError("conflito"))
+
+        with self.assertRaises(ConcurrentUpdateError):
+            asyncio.run(self.cog._apply_ph_change("Naruto", "Rasengan", 3, lambda character: None))
+
+        self.assertEqual(self._statuses(), [(3, CANCELLED)])
+
+    def test_ambiguous_failure_keeps_the_entry_pending(self):
+        for error in (ConnectionError("rede caiu"), asyncio.CancelledError()):
+            self.character_service.update_with_retry = AsyncMock(side_effect=error)
+
+            with self.assertRaises(type(error)):
+                asyncio.run(self.cog._apply_ph_change("Naruto", "Rasengan", 3, lambda character: None))
+
+        self.assertEqual(self._statuses(), [(3, PENDING), (3, PENDING)])
+
+    def test_history_cursor_is_dropped_after_the_last_page(self):
+        self.character.player_discord_id = "7"
+        for index in range(12):
+            asyncio.run(self.ledger.append_entry(self.character.id, f"Técnica {index}", 1))
+        ctx = Mock(author=Mock(id=7), send=AsyncMock())
+
+        asyncio.run(self.cog.ph_history.callback(self.cog, ctx, "Naruto"))
+        self.assertEqual(len(self.cog._history_cursors), 1)
+        asyncio.run(self.cog.ph_history.callback(self.cog, ctx, "Naruto", "mais"))
+
+        self.assertEqual(len(self.cog._history_cursors), 0)
+        self.assertNotIn("mais", ctx.send.await_args.args[0])
+
+    def test_concurrent_refunds_cannot_refund_the_same_spend_twice(self):
+        asyncio.run(self.ledger.append_entry(self.character.id, "Rasengan", 3))
+
+        async def refund_twice():
+            return await asyncio.gather(
+                *[self.cog._apply_ph_change("Naruto", "Rasengan", -3, lambda character: None) for _ in range(2)],
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(refund_twice())
+
+        self.assertEqual(sum(isinstance(result, InvalidInputError) for result in results), 1)
+        self.assertEqual(self._statuses(), [(-3, CANCELLED), (-3, CONFIRMED), (3, CONFIRMED)])
+        spent = asyncio.run(self.ledger.get_spent_by_description(self.character.id))
+        self.assertEqual(spent, {"Rasengan": 0})
+
+
+class TestCharacterDeletionRemovesLedger(TestCase):
+    def setUp(self):
+        self.character_repository = Mock()
+        self.ledger = Mock()
+        self.ledger.delete_character_entries = AsyncMock(return_value=2)
+        self.ledger.delete_all_entries = AsyncMock(return_value=5)
+        self.service = CharacterService(self.character_repository, Mock(), Mock(), ph_ledger_repository=self.ledger)
+
+    def test_deleting_a_character_deletes_its_entries(self):
+        self.character_repository.delete_character = AsyncMock(return_value=True)
+
+        self.assertTrue(asyncio.run(self.service.delete_character("abc")))
+        self.ledger.delete_character_entries.assert_awaited_once_with("abc")
+
+    def test_character_not_deleted_keeps_entries(self):
+        self.character_repository.delete_character = AsyncMock(return_value=False)
+
+        self.assertFalse(asyncio.run(self.service.delete_character("abc")))
+        self.ledger.delete_character_entries.assert_not_awaited()
+
+    def test_deleting_all_characters_clears_the_ledger(self):
+        self.character_repository.delete_all_characters = AsyncMock(return_value=3)
+
+        self.assertEqual(asyncio.run(self.service.delete_all_characters()), 3)
+        self.ledger.delete_all_entries.assert_awaited_once()
+
+
+class TestCharacterPHPoints(TestCase):
+    def test_running_total_round_trips_without_embedded_history(self):
+        character = Character(name="Naruto")
+        character.pontos["ph"] = {"total": 2, "gasto_total": 7}
+
+        data = character.to_dict()
+
+        self.assertEqual(data["pontos"]["ph"], {"total": 2, "gasto_total": 7})
+        self.assertEqual(Character.from_dict(data).pontos["ph"]["gasto_total"], 7)
+
+    def test_unmigrated_embedded_history_is_preserved(self):
+        data = Character(name="Naruto").to_dict()
+        data["pontos"]["ph"]["gasto"] = [{"descricao": "Rasengan", "custo": 3, "data": "2025-01-01T00:00:00+00:00"}]
+
+        character = Character.from_dict(data)
+
+        self.assertEqual(character.to_dict()["pontos"]["ph"]["gasto"][0]["custo"], 3)
@@ -0,0 +1,58 @@
+import asyncio
+from unittest import TestCase
+from unittest.mock import AsyncMock, Mock
+
+from src.core.entities.player_preferences import PlayerPreferences
+from src.infrastructure.cache.player_preferences_cache import CachedPlayerPreferencesRepository
+
+
+class TestCachedPlayerPreferencesRepository(TestCase):
+    def setUp(self):
+        self.stored = {"1": PlayerPreferences(player_discord_id="1", favorite_character_id="abc")}
+        self.repository = Mock()
+        self.repository.get_preferences = AsyncMock(side_effect=lambda pid: self.stored.get(pid))
+        self.repository.save_preferences = AsyncMock()
+        self.repository.delete_preferences = AsyncMock(return_value=True)
+        self.cache = CachedPlayerPreferencesRepository(self.repository, max_entries=2)
+
+    def test_repeated_reads_hit_cache_including_missing_players(self):
+        async def scenario():
+            for _ in range(3):
+                await self.cache.get_preferences("1")
+                await self.cache.get_preferences("sem-preferencias")
+            return await self.cache.get_preferences("1"), await self.cache.get_preferences("sem-preferencias")
+        found, missing = asyncio.run(scenario())
+
+        self.assertEqual(found.favorite_character_id, "abc")
+        self.assertIsNone(missing)
+        self.assertEqual(self.repository.get_preferences.call_count, 2)
+        self.assertEqual(self.cache.stats()["hits"], 6)
+
+    def test_callers_get_copies(self):
+        first = asyncio.run(self.cache.get_preferences("1"))
+        first.favorite_character_id = "alterado-sem-salvar"
+
+        self.assertEqual(asyncio.run(self.cache.get_preferences("1")).favorite_character_id, "abc")
+
+    def test_save_and_delete_refresh_entry(self):
+        asyncio.run(self.cache.get_preferences("2"))  # cache negativo
+        asyncio.run(self.cache.save_preferences(PlayerPreferences(player_discord_id="2", favorite_character_id="xyz")))
+
+        self.assertEqual(asyncio.run(self.cache.get_preferences("2")).favorite_character_id, "xyz")
+        asyncio.run(self.cache.delete_preferences("2"))
+        self.assertIsNone(asyncio.run(self.cache.get_preferences("2")))
+        self.assertEqual(self.repository.get_preferences.call_count, 1)
+
+    def test_lru_eviction(self):
+        async def scenario():
+            await self.cache.get_preferences("a")
+            await self.cache.get_preferences("b")
+            await self.cache.get_preferences("a")  # "b" passa a ser o menos recente
+            await self.cache.get_preferences("c")
+            await self.cache.get_preferences("a")
+            await self.cache.get_preferences("b")
+        asyncio.run(scenario())
+
+        fetched = [call.args[0] for call in self.repository.get_preferences.call_args_list]
+        self.assertEqual(fetched, ["a", "b", "c", "b"])
+        self.assertEqual(self.cache.stats()["size"], 2)
@@ -0,0 +1,77 @@
+import importlib.util
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+import mongomock
+
+from src.core.entities.class_template import ClassTemplate
+from tests.unit.infrastructure.mongomock_support import apply_bulk_write
+
+SCRIPT_PATH = Path(__file__).resolve().parents[3] / "scripts" / "migration" / "populate_classes.py"
+spec = importlib.util.spec_from_file_location("populate_classes", SCRIPT_PATH)
+populate_classes = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(populate_classes)
+
+
+class TestPopulateClasses(unittest.TestCase):
+    def setUp(self):
+        self.collection = mongomock.MongoClient().db.classes
+        self.collection.bulk_write = lambda operations, **kwargs: apply_bulk_write(self.collection, operations, **kwargs)
+
+    def test_normalizes_legacy_keys_to_class_template_schema(self):
+        document = populate_classes.normalize_class_document(populate_classes.classes_data[0])
+
+        self.assertEqual(document["name"], "Bárbaro")
+        self.assertEqual(document["base_attributes"]["strength"], 35)
+        self.assertEqual(document["base_attributes"]["charisma"], 10)
+        self.assertEqual(document["starting_skills"], [])
+        self.assertNotIn("_id", document)
+        self.assertFalse(set(populate_classes.LEGACY_FIELDS) & set(document))
+
+    def test_first_run_inserts_and_second_run_is_unchanged(self):
+        first = populate_classes.seed_classes(self.collection)
+        second = populate_classes.seed_classes(self.collection)
+
+        total = len(populate_classes.classes_data)
+        self.assertEqual(first, {"inserted": total, "updated": 0, "unchanged": 0})
+        self.assertEqual(second, {"inserted": 0, "updated": 0, "unchanged": total})
+        self.assertEqual(self.collection.count_documents({}), total)
+        self.assertIsNotNone(self.collection.find_one({"name": "Mago"})["created_at"])
+
+    def test_legacy_document_is_updated_in_place(self):
+        legacy = dict(populate_classes.classes_data[4], hp_formula="1d4")
+        legacy_id = self.collection.insert_one(legacy).inserted_id
+
+        counts = populate_classes.seed_classes(self.collection, [populate_classes.classes_data[4]])
+
+        self.assertEqual(counts, {"inserted": 0, "updated": 1, "unchanged": 0})
+        stored = self.collection.find_one({"_id": legacy_id})
+        self.assertEqual(stored["hp_formula"], "10d4")
+        self.assertNotIn("nome", stored)
+        self.assertNotIn("atributos_base", stored)
+        self.assertEqual(ClassTemplate.from_dict(stored).base_attributes["intelligence"], 50)
+        self.assertIsNotNone(stored["updated_at"])
+
+    def test_updated_at_only_changes_with_the_document(self):
+        mago = populate_classes.classes_data[4]
+        before = datetime(2020, 1, 1)
+        self.collection.insert_one(dict(populate_classes.normalize_class_document(mago),
+                                        created_at=before, updated_at=before))
+
+        counts = populate_classes.seed_classes(self.collection, [mago])
+
+        self.assertEqual(counts, {"inserted": 0, "updated": 0, "unchanged": 1})
+        self.assertEqual(self.collection.find_one({"name": "Mago"})["updated_at"], before)
+
+        counts = populate_classes.seed_classes(self.collection, [dict(mago, hp_formula="12d4")])
+
+        stored = self.collection.find_one({"name": "Mago"})
+        self.assertEqual(counts, {"inserted": 0, "updated": 1, "unchanged": 0})
+        self.assertEqual(stored["hp_formula"], "12d4")
+        self.assertEqual(stored["created_at"], before)
+        self.assertGreater(stored["updated_at"], before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+"""
+Testes dos scripts Lua de combate contra um Redis local (REDIS_HOST/REDIS_PORT, banco 15). Sem
+Redis, rodam no fakeredis com suporte a Lua (`fakeredis[lua]`, em requirements.txt); são pulados
+só quando nenhum dos dois está disponível.
+"""
+import asyncio
+import os
+import socket
+import time
+import unittest
+
+import redis
+
+from src.core.entities.combat_session import CombatSession
+from src.infrastructure.cache.combat_scripts import CombatScripts
+from src.infrastructure.cache.redis_repository import RedisRepository
+
+try:
+    import fakeredis
+    import lupa  # noqa: F401  (EVAL no fakeredis)
+except ImportError:
+    fakeredis = None
+
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+REDIS_TEST_DB = 15
+
+
+def _redis_available() -> bool:
+    try:
+        # Checagem rápida da porta antes do PING (o cliente faz novas tentativas com backoff)
+        socket.create_connection((REDIS_HOST, REDIS_PORT), timeout=0.2).close()
+        return redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_TEST_DB, socket_connect_timeout=0.2).ping()
+    except (OSError, redis.RedisError):
+        return False
+
+
+REDIS_AVAILABLE = _redis_available()
+
+
+async def _connect() -> RedisRepository:
+    repository = RedisRepository(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_TEST_DB)
+    if REDIS_AVAILABLE:
+        await repository.connect()
+    else:
+        repository.redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        repository.scripts = CombatScripts(repository.redis_client)
+    return repository
+
+
+@unittest.skipUnless(REDIS_AVAILABLE or fakeredis is not None, "Sem Redis local e sem fakeredis[lua]")
+class TestRedisCombatScripts(unittest.TestCase):
+    def _run(self, scenario):
+        async def runner():
+            repository = await _connect()
+            session = CombatSession(guild_id="g-test", channel_id=f"ch-test-{os.getpid()}")
+            session.add_player_entry(character_id="c1", player_id="p1", name="Aldric", initiative=18,
+                                     hp=100, chakra=10, fp=10)
+            session.add_npc_entry(name="Goblin", initiative=10)
+            await repository.save_combat_session(session, ttl_seconds=60)
+            try:
+                return await scenario(repository, session)
+            finally:
+                await repository.delete_combat_session(session.id)
+                await repository.disconnect()
+        return asyncio.run(runner())
+
+    def test_concurrent_damage_loses_no_updates(self):
+        async def scenario(repository, session):
+            await asyncio.gather(*[
+                repository.apply_hp_change(session.id, "damage", 3, target_name="Goblin") for _ in range(100)
+            ])
+            return await repository.get_combat_session(session.id)
+
+        loaded = self._run(scenario)
+
+        goblin = next(entry for entry in loaded.turn_order if entry["name"] == "Goblin")
+        self.assertEqual(goblin["hp"], 700)
+
+    def test_damage_and_healing_are_clamped(self):
+        async def scenario(repository, session):
+            damaged = await repository.apply_hp_change(session.id, "damage", 500, target_id="c1")
+            healed = await repository.apply_hp_change(session.id, "heal", 500, target_name="Aldric")
+            ttl = await repository.redis_client.ttl(f"combat_session:{session.id}:entries")
+            expires_at = await repository.redis_client.zscore("combat_sessions:expiry", session.id)
+            return damaged, healed, ttl, expires_at
+
+        damaged, healed, ttl, expires_at = self._run(scenario)
+
+        self.assertEqual(damaged["hp"], 0)
+        self.assertEqual(healed["hp"], 100)
+        self.assertGreater(ttl, 60)
+        self.assertGreater(expires_at, time.time() + 60)
+
+    def test_advance_turn_wraps_and_counts_rounds(self):
+        async def scenario(repository, session):
+            return [await repository.advance_turn(session.id) for _ in range(3)]
+
+        turns = self._run(scenario)
+
+        self.assertEqual([turn["entry"]["name"] for turn in turns], ["Aldric", "Goblin", "Aldric"])
+        self.assertEqual([turn["turn_number"] for turn in turns], [0, 0, 1])
+
+    def test_field_update_refreshes_ttl_and_expiry(self):
+        async def scenario(repository, session):
+            client = repository.redis_client
+            await client.expire(f"combat_session:{session.id}:meta", 5)
+            updated = await repository.update_session_fields(session.id, ttl_seconds=600, current_turn_index=0,
+                                                            is_active=True)
+            missing = await repository.update_session_fields("inexistente", current_turn_index=0)
+            return (updated, missing, await repository.get_combat_session(session.id),
+                    [await client.ttl(f"combat_session:{session.id}:{suffix}") for suffix in ("meta", "entries")],
+                    await client.ttl(f"combat_session:channel:{session.channel_id}"),
+                    await client.zscore("combat_sessions:expiry", session.id),
+                    await client.exists("combat_session:inexistente:meta"))
+
+        updated, missing, loaded, ttls, channel_ttl, expires_at, orphan = self._run(scenario)
+
+        self.assertTrue(updated)
+        self.assertFalse(missing)
+        self.assertEqual(loaded.current_turn_index, 0)
+        self.assertTrue(all(ttl > 60 for ttl in ttls + [channel_ttl]))
+        self.assertGreater(expires_at, time.time() + 60)
+        self.assertEqual(orphan, 0)
+
+    def test_channel_resolution_returns_the_session(self):
+        async def scenario(repository, session):
+            return session, await repository.get_combat_session_by_channel(session.channel_id)
+
+        session, loaded = self._run(scenario)
+
+        self.assertEqual(loaded.id, session.id)
+        self.assertEqual([entry["name"] for entry in loaded.turn_order], ["Aldric", "Goblin"])
+
+
+if __name__ == "__main__":
+    unittest.main()
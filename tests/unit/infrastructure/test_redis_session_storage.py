@@ -0,0 +1,252 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import AsyncMock, Mock
+
+from redis.exceptions import ResponseError
+
+from src.core.entities.combat_session import CombatSession
+from src.core.services.combat_service import CombatService
+from src.infrastructure.cache.redis_repository import RedisRepository
+from src.utils.exceptions.application_exceptions import CombatError, CombatSessionNotFoundError
+from tests.unit.infrastructure.redis_support import FakeAsyncRedis
+
+
+class TestRedisSessionStorage(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeAsyncRedis()
+        self.repository = RedisRepository()
+        self.repository.redis_client = self.client
+        self.session = CombatSession(guild_id="g1", channel_id="ch1", player_id="p1")
+        self.session.add_player_entry(character_id="c1", player_id="p1", name="Aldric", initiative=18,
+                                      hp=120, chakra=40, fp=20)
+        self.session.add_npc_entry(name="Goblin", initiative=10)
+        self.session.add_npc_entry(name="Goblin", initiative=5)
+
+    def test_save_stores_meta_and_one_field_per_entry(self):
+        asyncio.run(self.repository.save_combat_session(self.session, ttl_seconds=600))
+
+        meta = self.client.data[f"combat_session:{self.session.id}:meta"]
+        entries = self.client.data[f"combat_session:{self.session.id}:entries"]
+        self.assertEqual(json.loads(meta["channel_id"]), "ch1")
+        self.assertEqual(len(entries), 3)
+        self.assertEqual(json.loads(meta["turn_order"]), [entry["key"] for entry in self.session.turn_order])
+        self.assertEqual(self.client.ttls[f"combat_session:{self.session.id}:entries"], 600)
+        self.assertEqual(self.client.data["combat_session:channel:ch1"], self.session.id)
+
+    def test_round_trip_keeps_turn_order(self):
+        asyncio.run(self.repository.save_combat_session(self.session))
+
+        loaded = asyncio.run(self.repository.get_combat_session(self.session.id))
+
+        self.assertEqual([entry["initiative"] for entry in loaded.turn_order],
+                         [entry["initiative"] for entry in self.session.turn_order])
+        self.assertEqual(loaded.turn_order[0]["hp"], 120)
+        self.assertIsNone(loaded.character_id)
+
+    def test_legacy_json_session_is_migrated_on_read(self):
+        legacy = self.session.to_dict()
+        for entry in legacy["turn_order"]:
+            entry.pop("key")
+        self.client.data[f"combat_session:{self.session.id}"] = json.dumps(legacy)
+        self.client.ttls[f"combat_session:{self.session.id}"] = 1200
+
+        loaded = asyncio.run(self.repository.get_combat_session(self.session.id))
+
+        self.assertEqual(len(loaded.turn_order), 3)
+        self.assertTrue(all(entry.get("key") for entry in loaded.turn_order))
+        self.assertNotIn(f"combat_session:{self.session.id}", self.client.data)
+        self.assertEqual(self.client.ttls[f"combat_session:{self.session.id}:meta"], 1200)
+
+    def test_delete_removes_hashes_and_channel_mapping(self):
+        asyncio.run(self.repository.save_combat_session(self.session))
+        self.assertEqual(self.client.data["combat_sessions:active"], {self.session.id})
+
+        asyncio.run(self.repository.delete_combat_session(self.session.id))
+
+        self.assertEqual(self.client.data, {})
+
+
+class TestSessionEnumeration(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeAsyncRedis()
+        self.repository = RedisRepository()
+        self.repository.redis_client = self.client
+        self.sessions = [CombatSession(guild_id="g1", channel_id=f"ch{i}") for i in range(5)]
+        for session in self.sessions:
+            asyncio.run(self.repository.save_combat_session(session))
+        self.client.commands.clear()
+
+    async def _collect(self, batch_size):
+        return [session async for session in self.repository.iter_combat_sessions(batch_size=batch_size)]
+
+    def test_iterates_index_in_pipelined_batches_without_keys(self):
+        sessions = asyncio.run(self._collect(batch_size=2))
+
+        self.assertEqual({session.id for session in sessions}, {session.id for session in self.sessions})
+        commands = [command[0] for command in self.client.commands]
+        self.assertNotIn("KEYS", commands)
+        self.assertEqual(commands.count("SSCAN"), 3)
+        self.assertEqual(commands.count("PIPELINE"), 3)
+
+    def test_expired_sessions_are_dropped_from_the_index(self):
+        expired = self.sessions[0]
+        self.client.expire_now(f"combat_session:{expired.id}:meta")
+        self.client.expire_now(f"combat_session:{expired.id}:entries")
+
+        sessions = asyncio.run(self._collect(batch_size=10))
+
+        self.assertEqual(len(sessions), 4)
+        self.assertNotIn(expired.id, self.client.data["combat_sessions:active"])
+
+    def test_rebuild_index_registers_legacy_sessions(self):
+        legacy = CombatSession(guild_id="g1", channel_id="ch-legacy")
+        self.client.data[f"combat_session:{legacy.id}"] = json.dumps(legacy.to_dict())
+
+        added = asyncio.run(self.repository.rebuild_session_index())
+        sessions = asyncio.run(self.repository.get_all_combat_sessions())
+
+        self.assertEqual(added, 1)
+        self.assertIn(legacy.id, {session.id for session in sessions})
+        self.assertIn(f"combat_session:{legacy.id}:meta", self.client.data)
+
+
+class TestRedisCombatScriptsErrors(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeAsyncRedis()
+        self.repository = RedisRepository()
+        self.repository.redis_client = self.client
+        self.repository.scripts = Mock()
+        self.session = CombatSession(guild_id="g1", channel_id="ch1")
+        self.session.add_npc_entry(name="Goblin", initiative=10)
+
+    def test_target_not_found_maps_to_key_error(self):
+        self.repository.scripts.apply_hp_change = AsyncMock(side_effect=ResponseError("TARGET_NOT_FOUND"))
+
+        with self.assertRaises(KeyError):
+            asyncio.run(self.repository.apply_hp_change(self.session.id, "damage", 5, target_name="Orc"))
+
+    def test_legacy_session_is_migrated_and_script_retried(self):
+        self.client.data[f"combat_session:{self.session.id}"] = json.dumps(self.session.to_dict())
+        entry = dict(self.session.turn_order[0], hp=995)
+        self.repository.scripts.apply_hp_change = AsyncMock(
+            side_effect=[ResponseError("SESSION_NOT_FOUND"), json.dumps(entry)]
+        )
+
+        result = asyncio.run(self.repository.apply_hp_change(self.session.id, "damage", 5, target_name="Goblin"))
+
+        self.assertEqual(result["hp"], 995)
+        self.assertIn(f"combat_session:{self.session.id}:meta", self.client.data)
+        self.assertEqual(self.repository.scripts.apply_hp_change.await_count, 2)
+
+    def test_missing_session_returns_none(self):
+        self.repository.scripts.advance_turn = AsyncMock(side_effect=ResponseError("SESSION_NOT_FOUND"))
+
+        self.assertIsNone(asyncio.run(self.repository.advance_turn("inexistente")))
+
+
+class TestChannelResolution(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeAsyncRedis()
+        self.repository = RedisRepository()
+        self.repository.redis_client = self.client
+        self.repository.scripts = Mock()
+        self.session = CombatSession(guild_id="g1", channel_id="ch1")
+        self.session.add_npc_entry(name="Goblin", initiative=10)
+
+    def test_session_is_built_from_script_reply(self):
+        meta, entries = self.session.to_redis_hash()
+        reply = [self.session.id, [item for pair in meta.items() for item in pair],
+                 [item for pair in entries.items() for item in pair]]
+        self.repository.scripts.resolve_channel = AsyncMock(return_value=reply)
+
+        loaded = asyncio.run(self.repository.get_combat_session_by_channel("ch1"))
+
+        self.assertEqual(loaded.id, self.session.id)
+        self.assertEqual(loaded.turn_order[0]["name"], "Goblin")
+        self.repository.scripts.resolve_channel.assert_awaited_once_with(
+            keys=["combat_session:channel:ch1"], args=["combat_session:"]
+        )
+
+    def test_legacy_reply_migrates_the_session(self):
+        self.client.data[f"combat_session:{self.session.id}"] = json.dumps(self.session.to_dict())
+        self.repository.scripts.resolve_channel = AsyncMock(return_value=[self.session.id, "legacy"])
+
+        loaded = asyncio.run(self.repository.get_combat_session_by_channel("ch1"))
+
+        self.assertEqual(loaded.id, self.session.id)
+        self.assertIn(f"combat_session:{self.session.id}:meta", self.client.data)
+
+    def test_active_session_id_is_a_single_get(self):
+        asyncio.run(self.repository.save_combat_session(self.session))
+        self.client.commands.clear()
+        service = CombatService(Mock(), self.repository, Mock())
+
+        session_id = asyncio.run(service.get_active_session_id("g1", "ch1"))
+
+        self.assertEqual(session_id, self.session.id)
+        self.assertEqual(self.client.commands, [("GET", "combat_session:channel:ch1")])
+
+
+class TestCombatServiceAtomicMutations(unittest.TestCase):
+    def setUp(self):
+        self.session_repository = Mock()
+        self.service = CombatService(Mock(), self.session_repository, Mock())
+
+    def test_damage_returns_the_updated_entry(self):
+        entry = {"key": "k1", "name": "Orc", "hp": 900}
+        self.session_repository.apply_hp_change = AsyncMock(return_value=entry)
+
+        result = asyncio.run(self.service.apply_damage("s1", None, "Orc", 100, "hp", "p1"))
+
+        self.assertEqual(result, entry)
+        self.session_repository.apply_hp_change.assert_awaited_once_with(
+            "s1", "damage", 100, target_id=None, target_name="Orc"
+        )
+
+    def test_healing_unknown_target_raises_combat_error(self):
+        self.session_repository.apply_hp_change = AsyncMock(side_effect=KeyError("Orc"))
+
+        with self.assertRaises(CombatError):
+            asyncio.run(self.service.apply_healing("s1", None, "Orc", 10, "hp", "p1"))
+
+    def test_next_turn_uses_the_script_result(self):
+        self.session_repository.advance_turn = AsyncMock(
+            return_value={"entry": {"name": "Orc"}, "current_turn_index": 1, "turn_number": 2}
+        )
+
+        result = asyncio.run(self.service.next_turn("s1"))
+
+        self.assertEqual(result["current_character_name"], "Orc")
+        self.assertEqual(result["turn_number"], 2)
+
+    def test_missing_session_raises_not_found(self):
+        self.session_repository.advance_turn = AsyncMock(return_value=None)
+
+        with self.assertRaises(CombatSessionNotFoundError):
+            asyncio.run(self.service.next_turn("s1"))
+
+    def test_start_turn_writes_fields_through_the_refreshing_update(self):
+        session = CombatSession(guild_id="g1", channel_id="ch1")
+        session.add_npc_entry(name="Orc", initiative=12)
+        self.session_repository.get_combat_session = AsyncMock(return_value=session)
+        self.session_repository.update_session_fields = AsyncMock(return_value=True)
+
+        result = asyncio.run(self.service.start_combat_turn(session.id))
+
+        self.assertEqual(result["current_character_name"], "Orc")
+        fields = self.session_repository.update_session_fields.await_args.kwargs
+        self.assertEqual(fields["current_turn_index"], 0)
+
+    def test_start_turn_on_expired_session_raises_not_found(self):
+        session = CombatSession(guild_id="g1", channel_id="ch1")
+        session.add_npc_entry(name="Orc", initiative=12)
+        self.session_repository.get_combat_session = AsyncMock(return_value=session)
+        self.session_repository.update_session_fields = AsyncMock(return_value=False)
+
+        with self.assertRaises(CombatSessionNotFoundError):
+            asyncio.run(self.service.start_combat_turn(session.id))
+
+
+if __name__ == "__main__":
+    unittest.main()
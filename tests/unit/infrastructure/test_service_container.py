@@ -0,0 +1,120 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+
+import discord
+
+from config.settings.base_settings import BaseSettings
+from src.infrastructure.cache.class_registry import ClassRegistry
+from src.infrastructure.cache.transformation_catalog import TransformationCatalog
+from src.infrastructure.container import ServiceContainer
+from src.infrastructure.external.discord_bot import RPGDiscordBot
+from src.utils.exceptions.infrastructure_exceptions import CacheError, DatabaseConnectionError
+
+
+class _Settings(BaseSettings):
+    INSTRUMENTATION_ENABLED = False
+    REDIS_SESSION_SWEEP_INTERVAL_SECONDS = 30
+
+
+class TestServiceContainer(unittest.TestCase):
+    def setUp(self):
+        self.mongodb_repository = Mock()
+        self.mongodb_repository.connect = AsyncMock()
+        self.mongodb_repository.disconnect = AsyncMock()
+        self.redis_repository = Mock()
+        self.redis_repository.connect = AsyncMock()
+        self.redis_repository.disconnect = AsyncMock()
+        self.redis_repository.sweep_expired_sessions = AsyncMock(return_value=0)
+        # Os catálogos em memória carregariam do MongoDB no connect
+        for loader in (patch.object(TransformationCatalog, "load", AsyncMock()),
+                       patch.object(ClassRegistry, "load", AsyncMock())):
+            loader.start()
+            self.addCleanup(loader.stop)
+
+    def _container(self, settings=_Settings):
+        return ServiceContainer(self.mongodb_repository, self.redis_repository, settings=settings)
+
+    def test_from_env_reads_base_settings(self):
+        container = ServiceContainer.from_env(_Settings)
+
+        self.assertIsNone(container.metrics)
+        self.assertEqual(container.redis_repository.host, BaseSettings.REDIS_HOST)
+        self.assertEqual(container.redis_repository.max_connections, BaseSettings.REDIS_MAX_CONNECTIONS)
+
+    def test_connect_builds_once_and_close_stops_the_sweeper(self):
+        container = self._container()
+
+        async def scenario():
+            await container.connect()
+            character_service = container.character_service
+            await container.connect()
+            self.assertIs(container.character_service, character_service)
+            self.assertTrue(container.session_sweeper.running)
+            await container.close()
+
+        asyncio.run(scenario())
+
+        self.mongodb_repository.connect.assert_awaited_once()
+        self.redis_repository.connect.assert_awaited_once()
+        self.assertEqual(container.session_sweeper.interval_seconds, 30)
+        self.assertFalse(container.session_sweeper.running)
+        self.redis_repository.disconnect.assert_awaited_once()
+        self.mongodb_repository.disconnect.assert_awaited_once()
+        self.assertFalse(container.connected)
+
+    def test_redis_cache_error_disables_combat(self):
+        self.redis_repository.connect = AsyncMock(side_effect=CacheError("sem Redis"))
+        container = self._container()
+
+        asyncio.run(container.connect())
+
+        self.assertTrue(container.connected)
+        self.assertIsNone(container.redis_repository)
+        self.assertIsNone(container.combat_service)
+        self.assertIsNone(container.session_sweeper)
+        self.assertIsNotNone(container.character_service)
+        with self.assertRaises(CacheError):
+            container.require_combat_service()
+
+    def test_bot_loads_the_other_cogs_without_redis(self):
+        self.redis_repository.connect = AsyncMock(side_effect=CacheError("sem Redis"))
+
+        async def scenario():
+            bot = RPGDiscordBot(command_prefix="!", intents=discord.Intents.default())
+            bot.container = self._container()
+            await bot.setup_hook()
+            return bot
+
+        bot = asyncio.run(scenario())
+
+        self.assertNotIn("CombatCommands", bot.cogs)
+        self.assertIsNone(bot.get_command("startcombat"))
+        for cog in ("CharacterCommands", "PointsCommands", "ReportCommands", "DiceCommands", "TestCommands"):
+            self.assertIn(cog, bot.cogs)
+        self.assertEqual(len(bot.extensions), len(bot.initial_extensions))
+
+    def test_sweep_interval_zero_disables_the_sweeper(self):
+        class NoSweep(_Settings):
+            REDIS_SESSION_SWEEP_INTERVAL_SECONDS = 0
+
+        container = self._container(NoSweep)
+
+        asyncio.run(container.connect())
+
+        self.assertIsNotNone(container.combat_service)
+        self.assertIsNone(container.session_sweeper)
+
+    def test_mongodb_failure_releases_redis(self):
+        self.mongodb_repository.connect = AsyncMock(side_effect=DatabaseConnectionError("sem MongoDB"))
+        container = self._container()
+
+        with self.assertRaises(DatabaseConnectionError):
+            asyncio.run(container.connect())
+
+        self.redis_repository.disconnect.assert_awaited_once()
+        self.assertFalse(container.connected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+import asyncio
+import importlib.util
+import os
+import time
+import unittest
+from unittest.mock import AsyncMock, Mock
+
+from src.core.entities.combat_session import CombatSession
+from src.infrastructure.cache.combat_scripts import CombatScripts
+from src.infrastructure.cache.redis_repository import RedisRepository
+from src.infrastructure.cache.session_sweeper import SWEEP_METRIC, CombatSessionSweeper
+from src.infrastructure.monitoring.instrumentation import MetricsRegistry
+from tests.unit.infrastructure.redis_support import FakeAsyncRedis
+
+try:
+    import fakeredis
+    import lupa  # noqa: F401  (EVAL no fakeredis)
+except ImportError:
+    fakeredis = None
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+
+def _load_cleanup_script():
+    path = os.path.join(ROOT, "scripts", "maintenance", "cleanup_sessions.py")
+    spec = importlib.util.spec_from_file_location("cleanup_sessions", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class SweeperTestCase(unittest.TestCase):
+    def setUp(self):
+        self.client = FakeAsyncRedis()
+        self.repository = RedisRepository()
+        self.repository.redis_client = self.client
+
+    def _save(self, channel_id: str, ttl_seconds: int = 600) -> CombatSession:
+        session = CombatSession(guild_id="g1", channel_id=channel_id)
+        session.add_npc_entry(name="Goblin", initiative=10)
+        asyncio.run(self.repository.save_combat_session(session, ttl_seconds=ttl_seconds))
+        return session
+
+    def _expire(self, session: CombatSession):
+        """Marca a sessão como vencida no índice (as chaves ainda existem, como no instante da expiração)."""
+        self.client.data["combat_sessions:expiry"][session.id] = time.time() - 1
+
+
+@unittest.skipIf(fakeredis is None, "Sem fakeredis[lua]")
+class LuaSweeperTestCase(SweeperTestCase):
+    """A limpeza executa o script RELEASE_CHANNELS, então esses testes rodam no fakeredis com Lua."""
+
+    def setUp(self):
+        self.client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        self.repository = RedisRepository()
+        self.repository.redis_client = self.client
+        self.repository.scripts = CombatScripts(self.client)
+        # Comandos enviados fora de pipelines (KEYS, SSCAN, ZRANGEBYSCORE, EVALSHA...)
+        self.commands = []
+        execute_command = self.client.execute_command
+
+        async def record(*args, **kwargs):
+            self.commands.append(args[0])
+            return await execute_command(*args, **kwargs)
+
+        self.client.execute_command = record
+
+    def _expire(self, session: CombatSession):
+        asyncio.run(self.client.zadd("combat_sessions:expiry", {session.id: time.time() - 1}))
+
+    def _read(self, coroutine):
+        return asyncio.run(coroutine)
+
+
+class TestExpiryIndex(SweeperTestCase):
+    def test_save_scores_the_session_by_its_expiry(self):
+        before = time.time()
+        session = self._save("ch1", ttl_seconds=600)
+
+        score = self.client.data["combat_sessions:expiry"][session.id]
+        self.assertGreaterEqual(score, before + 600)
+        self.assertLessEqual(score, time.time() + 600)
+
+    def test_scripts_receive_the_expiry_index_and_new_score(self):
+        self.repository.scripts = Mock()
+        self.repository.scripts.advance_turn = AsyncMock(return_value='{"entry": null}')
+
+        asyncio.run(self.repository.advance_turn("s1", ttl_seconds=300))
+
+        kwargs = self.repository.scripts.advance_turn.await_args.kwargs
+        self.assertEqual(kwargs["keys"][2], "combat_sessions:expiry")
+        self.assertEqual(kwargs["args"][3], "s1")
+        self.assertAlmostEqual(kwargs["args"][4], time.time() + 300, delta=5)
+
+    def test_rebuild_index_scores_sessions_from_their_ttl(self):
+        session = CombatSession(guild_id="g1", channel_id="ch-legacy")
+        self.client.data[f"combat_session:{session.id}"] = "{}"
+        self.client.ttls[f"combat_session:{session.id}"] = 120
+
+        asyncio.run(self.repository.rebuild_session_index())
+
+        self.assertAlmostEqual(self.client.data["combat_sessions:expiry"][session.id], time.time() + 120, delta=5)
+
+
+class TestSweepExpiredSessions(LuaSweeperTestCase):
+    def test_only_expired_sessions_are_removed(self):
+        expired, active = self._save("ch1"), self._save("ch2")
+        self._expire(expired)
+        self.commands.clear()
+
+        removed = asyncio.run(self.repository.sweep_expired_sessions())
+
+        self.assertEqual(removed, 1)
+        self.assertEqual(self._read(self.client.zrange("combat_sessions:expiry", 0, -1)), [active.id])
+        self.assertEqual(self._read(self.client.smembers("combat_sessions:active")), {active.id})
+        self.assertFalse(self._read(self.client.exists("combat_session:channel:ch1")))
+        self.assertFalse(self._read(self.client.exists(f"combat_session:{expired.id}:meta")))
+        self.assertIsNotNone(asyncio.run(self.repository.get_combat_session(active.id)))
+        self.assertNotIn("KEYS", self.commands)
+        self.assertNotIn("SSCAN", self.commands)
+
+    def test_channel_mapping_of_a_newer_session_is_kept(self):
+        expired = self._save("ch1")
+        self._expire(expired)
+        newer = self._save("ch1")
+
+        asyncio.run(self.repository.sweep_expired_sessions())
+
+        self.assertFalse(self._read(self.client.exists(f"combat_session:{expired.id}:meta")))
+        self.assertEqual(self._read(self.client.get("combat_session:channel:ch1")), newer.id)
+
+    def test_session_started_during_the_sweep_keeps_its_channel(self):
+        expired = self._save("ch1")
+        self._expire(expired)
+        release_channels = self.repository.scripts.release_channels
+        started = []
+
+        async def start_then_release(keys, args):
+            # !iniciar no mesmo canal depois que a limpeza leu o canal da sessão expirada
+            session = CombatSession(guild_id="g1", channel_id="ch1")
+            await self.repository.save_combat_session(session)
+            started.append(session)
+            return await release_channels(keys=keys, args=args)
+
+        self.repository.scripts.release_channels = start_then_release
+
+        asyncio.run(self.repository.sweep_expired_sessions())
+
+        self.assertEqual(self._read(self.client.get("combat_session:channel:ch1")), started[0].id)
+
+    def test_nothing_to_sweep_is_a_single_command(self):
+        self._save("ch1")
+        self.commands.clear()
+
+        self.assertEqual(asyncio.run(self.repository.sweep_expired_sessions()), 0)
+        self.assertEqual(self.commands, ["ZRANGEBYSCORE"])
+
+
+class TestCombatSessionSweeper(LuaSweeperTestCase):
+    def test_sweep_once_drains_in_batches_and_records_metrics(self):
+        for index in range(5):
+            self._expire(self._save(f"ch{index}"))
+        metrics = MetricsRegistry()
+        sweeper = CombatSessionSweeper(self.repository, batch_size=2, metrics=metrics)
+
+        swept = asyncio.run(sweeper.sweep_once())
+
+        self.assertEqual(swept, 5)
+        self.assertEqual(self._read(self.client.dbsize()), 0)
+        self.assertEqual(sweeper.stats["runs"], 1)
+        self.assertEqual(sweeper.stats["swept_total"], 5)
+        self.assertEqual(metrics.snapshot()[SWEEP_METRIC]["count"], 1)
+
+    def test_background_task_survives_errors_and_stops(self):
+        repository = Mock()
+        failures = [ConnectionError("redis fora")]
+
+        async def sweep(limit):
+            if failures:
+                raise failures.pop()
+            return 0
+
+        repository.sweep_expired_sessions = sweep
+        sweeper = CombatSessionSweeper(repository, interval_seconds=0.01)
+
+        async def scenario():
+            sweeper.start()
+            await asyncio.sleep(0.05)
+            await sweeper.stop()
+
+        asyncio.run(scenario())
+
+        self.assertFalse(sweeper.running)
+        self.assertEqual(sweeper.stats["errors"], 1)
+        self.assertGreaterEqual(sweeper.stats["runs"], 2)
+
+
+class TestCleanupScript(LuaSweeperTestCase):
+    def test_cleanup_rebuilds_index_and_removes_expired_sessions(self):
+        cleanup = _load_cleanup_script()
+        expired = self._save("ch1")
+        self._expire(expired)
+        active = self._save("ch2")
+
+        removed = asyncio.run(cleanup.cleanup_expired_combat_sessions(self.repository, rebuild_index=True))
+
+        self.assertEqual(removed, 1)
+        self.assertEqual(self._read(self.client.smembers("combat_sessions:active")), {active.id})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import asyncio
+from unittest import TestCase
+from unittest.mock import AsyncMock, Mock
+
+from src.core.entities.transformation import Transformation
+from src.infrastructure.cache.transformation_catalog import TransformationCatalog
+
+
+class TestTransformationCatalog(TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.sannin = Transformation(name="Modo Sábio", description="", attribute_modifiers={"strength": 2})
+        self.kyuubi = Transformation(name="Manto da Raposa", description="", attribute_modifiers={"hp": "10%"})
+        self.repository = Mock()
+        self.repository.get_all_transformations = AsyncMock(return_value=[self.sannin, self.kyuubi])
+        self.repository.get_transformation = AsyncMock(return_value=None)
+        self.repository.get_transformation_by_name = AsyncMock(return_value=None)
+        self.repository.save_transformation = AsyncMock(return_value="id")
+        self.repository.update_transformation = AsyncMock(return_value=True)
+        self.repository.delete_transformation = AsyncMock(return_value=True)
+        self.catalog = TransformationCatalog(self.repository, ttl_seconds=60, clock=lambda: self.now)
+        asyncio.run(self.catalog.load())
+
+    def test_reads_are_served_from_memory(self):
+        async def scenario():
+            for _ in range(5):
+                self.assertEqual(await self.catalog.get_transformation(str(self.sannin.id)), self.sannin)
+            self.assertEqual(await self.catalog.get_transformation_by_name("Manto da Raposa"), self.kyuubi)
+        asyncio.run(scenario())
+
+        self.repository.get_transformation.assert_not_called()
+        self.repository.get_all_transformations.assert_called_once()
+        self.assertEqual(self.catalog.stats()["hits"], 6)
+        self.assertEqual(self.catalog.stats()["misses"], 0)
+
+    def test_unknown_id_falls_back_to_repository_and_counts_miss(self):
+        self.assertIsNone(asyncio.run(self.catalog.get_transformation("desconhecida")))
+
+        self.repository.get_transformation.assert_called_once_with("desconhecida")
+        self.assertEqual(self.catalog.misses, 1)
+
+    def test_writes_refresh_catalog_and_bump_generation(self):
+        generation = self.catalog.generation
+        novo = Transformation(name="Sharingan", description="")
+
+        async def scenario():
+            await self.catalog.save_transformation(novo)
+            self.sannin.name = "Modo Sábio Perfeito"
+            await self.catalog.update_transformation(self.sannin)
+            await self.catalog.delete_transformation(str(self.kyuubi.id))
+            return (
+                await self.catalog.get_transformation_by_name("Sharingan"),
+                await self.catalog.get_transformation_by_name("Modo Sábio Perfeito"),
+                await self.catalog.get_transformation(str(self.kyuubi.id)),
+                await self.catalog.get_transformation_by_name("Modo Sábio"),
+            )
+        saved, renamed, deleted, old_name = asyncio.run(scenario())
+
+        self.assertEqual(saved, novo)
+        self.assertEqual(renamed, self.sannin)
+        self.assertIsNone(deleted)
+        self.assertIsNone(old_name)
+        self.assertEqual(self.catalog.generation, generation + 3)
+
+    def test_failed_update_keeps_the_cached_values(self):
+        self.repository.update_transformation = AsyncMock(side_effect=RuntimeError("MongoDB fora"))
+
+        async def scenario():
+            edited = await self.catalog.get_transformation(str(self.sannin.id))
+            edited.name = "Modo Sábio Perfeito"
+            edited.attribute_modifiers["strength"] = 99
+            with self.assertRaises(RuntimeError):
+                await self.catalog.update_transformation(edited)
+            return (
+                await self.catalog.get_transformation(str(self.sannin.id)),
+                await self.catalog.get_transformation_by_name("Modo Sábio Perfeito"),
+            )
+        cached, renamed = asyncio.run(scenario())
+
+        self.assertEqual(cached.name, "Modo Sábio")
+        self.assertEqual(cached.attribute_modifiers, {"strength": 2})
+        self.assertIsNone(renamed)
+
+    def test_ttl_expiry_reloads(self):
+        self.now = 61.0
+        asyncio.run(self.catalog.get_transformation(str(self.sannin.id)))
+
+        self.assertEqual(self.repository.get_all_transformations.call_count, 2)
+        self.assertEqual(self.catalog.stats()["reloads"], 2)
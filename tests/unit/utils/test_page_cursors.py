@@ -0,0 +1,24 @@
+from unittest import TestCase
+
+from src.utils.helpers.page_cursors import PageCursors
+
+
+class TestPageCursors(TestCase):
+    def test_least_recently_used_key_is_evicted(self):
+        cursors = PageCursors(max_entries=2)
+        cursors.store("a", 1)
+        cursors.store("b", 2)
+        cursors.store("a", 3)
+        cursors.store("c", 4)
+
+        self.assertEqual(len(cursors), 2)
+        self.assertIsNone(cursors.get("b"))
+        self.assertEqual((cursors.get("a"), cursors.get("c")), (3, 4))
+
+    def test_storing_none_drops_the_key(self):
+        cursors = PageCursors()
+        cursors.store(("1", "abc"), "cursor")
+        cursors.store(("1", "abc"), None)
+
+        self.assertIsNone(cursors.get(("1", "abc")))
+        self.assertEqual(len(cursors), 0)